@@ -1,38 +1,65 @@
 #!/usr/bin/env python3
 
 import sys
-import json
-import zipfile
 
-from universal_main.universal_constants import\
-    PROGRAM_DIR, IS_ZIPFILE, ZIPAPP_FILE
-from universal_main.universal_main import main, pyside6_splash_main
+from universal_main import (
+    app_env, daemon, installers, metrics, tracing, updates, wheel_installer
+)
+from universal_main.manifest import LaunchManifest, get_manifest
+from universal_main.universal_main import main, pyside6_splash_main, warm_up
 
 
-def run_main():
-    """Load startup configuration from file.
+def _launch(manifest: LaunchManifest):
+    """Check requirements & run main function of the program.
     """
-    if IS_ZIPFILE:
-        with zipfile.ZipFile(ZIPAPP_FILE) as main_zip:
-            with main_zip.open('launch.json', 'r') as splash_file:
-                config = json.load(splash_file)
-    else:
-        with open(
-            PROGRAM_DIR + 'launch.json', 'r', encoding='utf-8'
-        ) as file:
-            config = json.load(file)
-    if not config['show_splash']:
+    if not manifest.show_splash:
         return main(
-            config['main_module'], config['main_func'],
-            config['min_py_ver'], config['requirements']
+            manifest.main_module, manifest.main_func,
+            manifest.min_py_ver, manifest.requirements,
+            preload=manifest.preload,
+            use_import_index=manifest.import_index,
+            startup_tasks=manifest.startup_tasks
         )
-    pre_main_name = config['pre_main']
     return pyside6_splash_main(
-        config['main_module'], config['main_func'],
-        config['min_py_ver'], config['requirements'],
-        config['program_name'], pre_main_name
+        manifest.main_module, manifest.main_func,
+        manifest.min_py_ver, manifest.requirements,
+        manifest.program_name, manifest.pre_main,
+        preload=manifest.preload,
+        use_import_index=manifest.import_index,
+        early_splash=manifest.early_splash,
+        startup_tasks=manifest.startup_tasks,
+        pre_main_process=manifest.pre_main_process,
+        pre_main_worker=manifest.pre_main_worker
     )
 
 
+def run_main():
+    """Load startup configuration from file.
+    """
+    with tracing.phase('load_manifest'):
+        manifest = get_manifest()
+    if not manifest.has_launch_config:
+        raise FileNotFoundError('launch.json is not found')
+    tracing.configure(manifest.trace)
+    metrics.configure(manifest.program_name, manifest.metrics)
+    wheel_installer.configure(manifest.wheel_dir)
+    installers.configure(manifest.installer)
+    if manifest.app_env:
+        app_env.activate(manifest.program_name)
+        updates.configure(
+            manifest.update_source, manifest.requirements,
+            manifest.update_interval
+        )
+    if manifest.daemon:
+        return daemon.run_with_daemon(
+            manifest, lambda: _launch(manifest),
+            lambda: warm_up(
+                manifest.main_module, manifest.show_splash,
+                manifest.preload
+            )
+        )
+    return _launch(manifest)
+
+
 if __name__ == '__main__':
     sys.exit(run_main())
@@ -1,6 +1,39 @@
+from importlib import import_module
+
 from .program_informations import (  # noqa: F401
     get_license, get_opensource_notice,
     get_name, get_description, get_license_summary, get_icon
 )
-from .universal_constants import *  # noqa: F401, F403
-from .universal_main import main, pyside6_splash_main  # noqa: F401
+from .manifest import LaunchManifest, get_manifest  # noqa: F401
+from . import universal_constants
+
+# Launcher (with its imports) is loaded on first access,
+# so `get_*` helpers stay cheap to import.
+_LAZY_ATTRS = {
+    'main': 'universal_main',
+    'pyside6_splash_main': 'universal_main',
+    'SplashProgress': 'universal_main',
+}
+_LAZY_ATTRS.update(
+    (name, 'universal_constants') for name in universal_constants.__all__
+)
+
+__all__ = [
+    'get_license', 'get_opensource_notice',
+    'get_name', 'get_description', 'get_license_summary', 'get_icon',
+    'LaunchManifest', 'get_manifest',
+] + list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    """Forward launcher functions & constants. (loaded lazily)"""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}'
+        )
+    return getattr(import_module(f'.{module_name}', __name__), name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
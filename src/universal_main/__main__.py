@@ -0,0 +1,254 @@
+"""Command line tools of universal_main.
+
+Usage:
+    python -m universal_main bench [options]
+    python -m universal_main build SOURCE_DIR -o OUTPUT [options]
+    python -m universal_main stats [options]
+    python -m universal_main provision PROGRAM [PROGRAM ...] [options]
+"""
+
+import sys
+import json
+import argparse
+
+
+def _bench(args: argparse.Namespace) -> int:
+    # pylint: disable = import-outside-toplevel
+    from .benchmark import check_budget, measure_import, run_benchmark
+
+    results = run_benchmark(
+        args.layouts, [splash == 'splash' for splash in args.splash],
+        args.requirements, args.modes, args.runs
+    )
+    result = results['import/universal_main'] = measure_import(
+        runs=args.runs
+    )
+    print(
+        f'{"import/universal_main":<32} median {result["median_ms"]:9.2f} ms'
+        f'   p95 {result["p95_ms"]:9.2f} ms'
+    )
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+    failures = check_budget(
+        results, args.budget_ms, baseline, args.tolerance,
+        args.import_budget_ms
+    )
+    for failure in failures:
+        print('FAIL', failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+def _build(args: argparse.Namespace) -> int:
+    # pylint: disable = import-outside-toplevel
+    from .build import build
+
+    output = build(
+        args.source_dir, args.output,
+        None if args.python == '' else args.python,
+        compile_pyc=not args.no_compile,
+        include_sources=args.include_sources,
+        compress=not args.no_compress,
+        optimize=args.optimize,
+        wheelhouse=args.wheelhouse,
+        wheel_python=args.wheel_python,
+        wheel_platforms=args.wheel_platform
+    )
+    print('Built', output)
+    return 0
+
+
+def _stats(args: argparse.Namespace) -> int:
+    # pylint: disable = import-outside-toplevel
+    import time
+    from .metrics import METRICS_FILE, read_records, summarize
+
+    since = None if args.days is None else time.time() - args.days * 86400
+    summary = summarize(
+        read_records(args.file or METRICS_FILE), since, args.app, args.daily
+    )
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    if not summary:
+        print('No launch is recorded.')
+        return 0
+
+    print(
+        f'{"app":<32} {"phase":<24} {"count":>6}'
+        f' {"p50 ms":>10} {"p95 ms":>10} {"p99 ms":>10}'
+    )
+    for name, phases in summary.items():
+        for phase, stat in phases.items():
+            print(
+                f'{name:<32} {phase:<24} {stat["count"]:>6}'
+                f' {stat["p50_ms"]:>10.2f} {stat["p95_ms"]:>10.2f}'
+                f' {stat["p99_ms"]:>10.2f}'
+            )
+    return 0
+
+
+def _provision(args: argparse.Namespace) -> int:
+    # pylint: disable = import-outside-toplevel
+    from .provision import provision
+
+    result = provision(args.programs, args.dry_run)
+    print(json.dumps(result, indent=2))
+    return 0 if result['ok'] else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build parser of command line arguments.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    # pylint: disable = import-outside-toplevel
+    from .benchmark import IMPORT_BUDGET_MS
+
+    parser = argparse.ArgumentParser(prog='python -m universal_main')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    bench = commands.add_parser(
+        'bench', help='Measure startup time with stub pip & PySide6.'
+    )
+    bench.add_argument(
+        '--layouts', nargs='+', choices=('directory', 'zipapp'),
+        default=['directory', 'zipapp']
+    )
+    bench.add_argument(
+        '--splash', nargs='+', choices=('nosplash', 'splash'),
+        default=['nosplash', 'splash']
+    )
+    bench.add_argument(
+        '--requirements', nargs='+', type=int, default=[0, 10, 100],
+        metavar='COUNT'
+    )
+    bench.add_argument(
+        '--modes', nargs='+', choices=('cold', 'warm'),
+        default=['cold', 'warm']
+    )
+    bench.add_argument('--runs', type=int, default=10)
+    bench.add_argument(
+        '--budget-ms', type=float,
+        help='Fail if median of any scenario exceeds this.'
+    )
+    bench.add_argument(
+        '--import-budget-ms', type=float, default=IMPORT_BUDGET_MS,
+        help='Fail if median import time of the package exceeds this.'
+    )
+    bench.add_argument(
+        '--baseline', metavar='FILE',
+        help='Fail if median regresses more than tolerance from baseline.'
+    )
+    bench.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='Allowed regression ratio from baseline. (default: 0.2)'
+    )
+    bench.add_argument(
+        '--save-baseline', metavar='FILE', help='Save results as baseline.'
+    )
+    bench.set_defaults(handler=_bench)
+
+    build = commands.add_parser(
+        'build', help='Build zipapp with precompiled bytecode.'
+    )
+    build.add_argument('source_dir', help='Directory has __main__.py.')
+    build.add_argument('-o', '--output', required=True)
+    build.add_argument(
+        '-p', '--python', default='/usr/bin/env python3',
+        help='Interpreter of shebang line. Empty string for no shebang.'
+    )
+    build.add_argument(
+        '--no-compile', action='store_true',
+        help='Pack sources without precompiled bytecode.'
+    )
+    build.add_argument(
+        '--include-sources', action='store_true',
+        help='Pack sources with precompiled bytecode.'
+    )
+    build.add_argument(
+        '--no-compress', action='store_true',
+        help='Store all members uncompressed.'
+    )
+    build.add_argument(
+        '--optimize', type=int, default=-1, choices=(-1, 0, 1, 2),
+        help='Optimization level of compile. (default: -1)'
+    )
+    build.add_argument(
+        '--wheelhouse', metavar='DIR',
+        help='Wheels to pack for offline install.'
+        ' (default: SOURCE_DIR/wheelhouse if present)'
+    )
+    build.add_argument(
+        '--wheel-python', metavar='TAG',
+        help='Interpreter tag wheels are selected for. (ex: cp311)'
+    )
+    build.add_argument(
+        '--wheel-platform', metavar='TAG', action='append',
+        help='Platform tag wheels are selected for. (repeatable)'
+    )
+    build.set_defaults(handler=_build)
+
+    stats = commands.add_parser(
+        'stats', help='Summarize recorded launch metrics.'
+    )
+    stats.add_argument(
+        '--days', type=float, help='Only launches in recent days.'
+    )
+    stats.add_argument('--app', help='Only launches of this program.')
+    stats.add_argument(
+        '--daily', action='store_true', help='Summarize per day.'
+    )
+    stats.add_argument('--json', action='store_true', help='Print JSON.')
+    stats.add_argument(
+        '--file', metavar='FILE',
+        help='The metrics log. (default: launches.jsonl under DATADIR)'
+    )
+    stats.set_defaults(handler=_stats)
+
+    provision = commands.add_parser(
+        'provision',
+        help='Install requirements of many programs at once. (JSON output)',
+        description=(
+            'Install requirements of many programs at once. (JSON output)'
+            ' Programs using site-packages of the interpreter share one'
+            ' installer run. Programs with `app_env` get one run each, as'
+            ' their requirements may conflict; distributions installed for'
+            ' an earlier program are linked, not installed again.'
+        )
+    )
+    provision.add_argument(
+        'programs', nargs='+', metavar='PROGRAM',
+        help='Program directory (has launch.json) or zipapp.'
+    )
+    provision.add_argument(
+        '--dry-run', action='store_true',
+        help='Only report missing requirements.'
+    )
+    provision.set_defaults(handler=_provision)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """Run command line tool.
+
+    Args:
+        argv (List[str], optional): The arguments. Default is `sys.argv`.
+
+    Returns:
+        int: The exit code.
+    """
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,504 @@
+"""Per-app package environments, backed by a shared file store.
+
+If launch.json `app_env` is true, requirements of the program are
+installed into its own site directory under `DATADIR` (not into
+site-packages of the interpreter), which is added to `sys.path` at launch.
+So upgrading packages of one program never affects another program.
+
+Installed files are deduplicated with hardlinks to a content-addressed
+store (keyed by sha256 of `RECORD`). A distribution already installed
+for another program is linked from there instead of installed again,
+so programs sharing numpy or PySide6 keep one copy on disk.
+Files in the store are shared, so they must not be edited in place.
+"""
+
+import os
+import re
+import sys
+import csv
+import site
+import base64
+import time
+import shutil
+import tempfile
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .universal_constants import DATADIR
+from .extract_cache import interpreter_tag
+from .requirement_checker import (
+    Requirement, installed_distributions, normalize_name, parse_version
+)
+
+
+ENVS_DIR = DATADIR + 'universal_main/envs/'
+STORE_DIR = DATADIR + 'universal_main/store/'
+# Prepared site directory, swapped in at next launch. (See `updates`)
+PENDING_SUFFIX = '.next'
+# Unpublished (crashed) temporary directories are removed after this.
+STALE_TMP_SECONDS = 24 * 60 * 60
+# Replaced files while `merge`, made next to staging directory
+BACKUP_PREFIX = '.tmp-backup-'
+
+_active_site_dir = None
+
+
+def site_dir(program_name: str) -> str:
+    """Get site directory of the program environment.
+
+    Args:
+        program_name (str): The name of program.
+
+    Returns:
+        str: The site directory. (may be not exist yet)
+    """
+    name = re.sub(r'[^a-z0-9]+', '-', program_name.lower()).strip('-') \
+        or 'program'
+    return f'{ENVS_DIR}{name}-{interpreter_tag()}/site-packages'
+
+
+def activate(program_name: str) -> str:
+    """Create (if needed) & add the program environment to `sys.path`.
+
+    The environment is searched before site-packages of the interpreter.
+
+    Args:
+        program_name (str): The name of program.
+
+    Returns:
+        str: The site directory.
+    """
+    global _active_site_dir  # pylint: disable = global-statement
+    path = site_dir(program_name)
+    if os.path.isdir(path + PENDING_SUFFIX):
+        _apply_pending(path)
+    os.makedirs(path, exist_ok=True)
+    if path not in sys.path:
+        # After the program directory (sys.path[0])
+        sys.path.insert(1, path)
+        site.addsitedir(path)  # Process `.pth` files
+    _active_site_dir = path
+    return path
+
+
+def _apply_pending(path: str):
+    """Swap prepared site directory in, with renames. (no install work)"""
+    old = f'{os.path.dirname(path)}/.tmp-old-{os.getpid()}'
+    try:
+        if os.path.isdir(path):
+            os.rename(path, old)
+        os.rename(path + PENDING_SUFFIX, path)
+    except OSError:  # Ex: files are in use (Windows)
+        if os.path.isdir(old) and not os.path.exists(path):
+            os.rename(old, path)
+        return
+    # Not on critical path. (left one is removed by `cleanup_stale`)
+    threading.Thread(
+        target=shutil.rmtree, args=(old, True),
+        name='universal_main-remove-old-env', daemon=True
+    ).start()
+
+
+def cleanup_stale(path: str):
+    """Remove stale temporary directories next to the site directory.
+
+    Args:
+        path (str): The site directory.
+    """
+    parent = os.path.dirname(path)
+    try:
+        entries = list(os.scandir(parent))
+    except OSError:
+        return
+    now = time.time()
+    for entry in entries:
+        try:
+            # Swapped out environment is never used again.
+            if entry.name.startswith('.tmp-old-') or (
+                entry.name.startswith('.tmp-')
+                and now - entry.stat().st_mtime > STALE_TMP_SECONDS
+            ):
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def clone(source: str, destination: str):
+    """Copy site directory with hardlinks. (files are never edited)
+
+    Args:
+        source (str): The site directory.
+        destination (str): The directory to create.
+    """
+    shutil.copytree(source, destination, copy_function=_link_or_copy)
+
+
+def active_site_dir() -> Optional[str]:
+    """Get site directory of activated environment.
+
+    Returns:
+        Optional[str]: The site directory, or None if not activated.
+    """
+    return _active_site_dir
+
+
+def _dist_infos(path: str) -> Dict[str, Tuple[str, str]]:
+    """Get `.dist-info` directories in a site directory.
+
+    Returns:
+        Dict[str, Tuple[str, str]]:
+            The normalized name -> (version, path of `.dist-info`).
+    """
+    dists = {}
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return dists
+    with entries:
+        for entry in entries:
+            if not entry.name.endswith('.dist-info'):
+                continue
+            name, _, version = entry.name[:-10].partition('-')
+            if parse_version(version) is not None:
+                dists[normalize_name(name)] = (version, entry.path)
+    return dists
+
+
+def _record(dist_info: str) -> List[Tuple[str, Optional[str]]]:
+    """Read `RECORD` of a distribution.
+
+    Returns:
+        List[Tuple[str, Optional[str]]]:
+            The (path relative to site directory, sha256 in hex) pairs.
+            Hash is None if not recorded. Paths out of site directory
+            (ex: `../../bin/script`) are excluded.
+    """
+    try:
+        with open(
+            os.path.join(dist_info, 'RECORD'), 'r', encoding='utf-8',
+            newline=''
+        ) as file:
+            rows = list(csv.reader(file))
+    except OSError:
+        return []
+
+    files = []
+    for row in rows:
+        if not row or not row[0]:
+            continue
+        path = os.path.normpath(row[0])
+        if os.path.isabs(path) or path.split(os.sep)[0] == os.pardir:
+            continue
+        digest = None
+        algorithm, _, value = (row[1] if len(row) > 1 else '').partition('=')
+        if algorithm == 'sha256' and value:
+            digest = base64.urlsafe_b64decode(
+                value + '=' * (-len(value) % 4)
+            ).hex()
+        files.append((path, digest))
+    return files
+
+
+def _requires(dist_info: str, extras: Tuple[str, ...]) -> List[Requirement]:
+    """Read applicable `Requires-Dist` of a distribution."""
+    requires = []
+    try:
+        with open(
+            os.path.join(dist_info, 'METADATA'), 'r', encoding='utf-8'
+        ) as file:
+            for line in file:
+                if not line.strip():  # End of headers
+                    break
+                if line.startswith('Requires-Dist:'):
+                    requires.append(Requirement(line[14:].strip()))
+    except (OSError, ValueError):
+        return []
+    return [
+        requirement for requirement in requires
+        if requirement.is_applicable()
+        or any(requirement.is_applicable(extra) for extra in extras)
+    ]
+
+
+def _shared_dists(current: str) -> List[Dict[str, Tuple[str, str]]]:
+    """Get distributions installed for other programs."""
+    suffix = '-' + interpreter_tag()
+    try:
+        names = sorted(os.listdir(ENVS_DIR))
+    except OSError:
+        return []
+    return [
+        _dist_infos(ENVS_DIR + name + '/site-packages')
+        for name in names
+        if name.endswith(suffix)
+        and ENVS_DIR + name + '/site-packages' != current
+    ]
+
+
+def _resolve_shared(
+    requirement: Requirement, installed: Dict[str, str],
+    shared: List[Dict[str, Tuple[str, str]]], resolved: Dict[str, str]
+) -> bool:
+    """Find distributions of the requirement & its dependencies.
+
+    Args:
+        requirement (Requirement): The requirement.
+        installed (Dict[str, str]): The already installed distributions.
+        shared (List[Dict[str, Tuple[str, str]]]):
+            The distributions of other programs.
+        resolved (Dict[str, str]):
+            The name -> `.dist-info` path to link. (updated)
+
+    Returns:
+        bool: If all of them are found, return True.
+    """
+    if requirement.name in resolved:
+        return True
+    version = installed.get(requirement.name)
+    if version is not None and requirement.is_satisfied_by(version):
+        return True
+    for dists in shared:
+        version, dist_info = dists.get(requirement.name, (None, None))
+        if version is not None and requirement.is_satisfied_by(version):
+            resolved[requirement.name] = dist_info
+            return all(
+                _resolve_shared(dependency, installed, shared, resolved)
+                for dependency in _requires(dist_info, requirement.extras)
+            )
+    return False
+
+
+def _link_or_copy(source: str, destination: str):
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:  # Other device, or not supported
+        shutil.copy2(source, destination)
+
+
+def _link_shared(
+    to_install: List[str], target: str, staging: str
+) -> List[str]:
+    """Link distributions installed for other programs into staging.
+
+    Returns:
+        List[str]: The requirement strings which are not found.
+    """
+    installed = installed_distributions()
+    shared = _shared_dists(target)
+    missing = []
+    for raw in to_install:
+        resolved = {}
+        try:
+            requirement = Requirement(raw)
+        except ValueError:  # ex: URL or path, which pip only can parse
+            missing.append(raw)
+            continue
+        if not _resolve_shared(requirement, installed, shared, resolved):
+            missing.append(raw)
+            continue
+        for dist_info in resolved.values():
+            source_dir = os.path.dirname(dist_info)
+            for path, _ in _record(dist_info):
+                destination = os.path.join(staging, path)
+                if not os.path.exists(destination):
+                    _link_or_copy(
+                        os.path.join(source_dir, path), destination
+                    )
+        installed.update(
+            (name, os.path.basename(dist_info)[:-10].partition('-')[2])
+            for name, dist_info in resolved.items()
+        )
+    return missing
+
+
+def _prune_dirs(target: str, directories: Set[str]):
+    """Remove empty directories, up to the site directory."""
+    for directory in sorted(directories, key=len, reverse=True):
+        while directory.startswith(target + os.sep):
+            try:
+                os.rmdir(directory)  # Only if empty
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+
+def merge(staging: str, target: str) -> List[str]:
+    """Move installed files from staging to the site directory.
+
+    Older versions of the distributions are removed. Files are moved by
+    renames, so both must be on same file system. Replaced files are
+    moved into a backup directory (next to staging) first; if moving
+    fails partway (ex: disk full), every moved file is moved back, so
+    the site directory is unchanged.
+
+    Args:
+        staging (str): The directory that distributions are installed.
+        target (str): The site directory.
+
+    Returns:
+        List[str]: The `.dist-info` paths of merged distributions.
+    """
+    old = _dist_infos(target)
+    new = _dist_infos(staging)
+    backup = tempfile.mkdtemp(
+        prefix=BACKUP_PREFIX, dir=os.path.dirname(os.path.abspath(staging))
+    )
+    # Done renames (source, destination) & created directories, to undo
+    moved, created = [], []
+    removed_dirs = set()
+
+    def move(source: str, destination: str):
+        os.replace(source, destination)
+        moved.append((source, destination))
+
+    def back_up(path: str):
+        saved = os.path.join(backup, os.path.relpath(path, target))
+        os.makedirs(os.path.dirname(saved), exist_ok=True)
+        move(path, saved)
+
+    try:
+        for name in new:
+            if name not in old:
+                continue
+            dist_info = old[name][1]  # Upgrade/downgrade
+            for path, _ in _record(dist_info):
+                path = os.path.join(target, path)
+                if not path.startswith(dist_info + os.sep) \
+                        and os.path.lexists(path):
+                    back_up(path)
+                    removed_dirs.add(os.path.dirname(path))
+            back_up(dist_info)
+
+        for root, _, files in os.walk(staging):
+            relative = os.path.relpath(root, staging)
+            directory = os.path.normpath(os.path.join(target, relative))
+            if not os.path.isdir(directory):
+                os.mkdir(directory)  # Parent is made first (top-down)
+                created.append(directory)
+            for name in files:
+                destination = os.path.join(directory, name)
+                if os.path.lexists(destination):
+                    back_up(destination)
+                move(os.path.join(root, name), destination)
+    except BaseException:
+        for source, destination in reversed(moved):
+            os.replace(destination, source)
+        for directory in reversed(created):
+            os.rmdir(directory)
+        raise
+    finally:
+        shutil.rmtree(backup, ignore_errors=True)
+
+    _prune_dirs(target, removed_dirs)
+    return [
+        os.path.join(target, os.path.basename(dist_info))
+        for _, dist_info in new.values()
+    ]
+
+
+def _store_file(path: str, digest: str):
+    """Replace the file with hardlink of store. (or add it to store)"""
+    stored = f'{STORE_DIR}{digest[:2]}/{digest}'
+    try:
+        if not os.path.exists(stored):
+            os.makedirs(os.path.dirname(stored), exist_ok=True)
+            try:
+                os.link(path, stored)
+                return
+            except FileExistsError:  # Other process stored first
+                pass
+        if os.path.samefile(path, stored):
+            return
+        tmp_file = f'{path}.{os.getpid()}.tmp'
+        os.link(stored, tmp_file)
+        os.replace(tmp_file, path)
+    except OSError:  # Store is optional (ex: other device)
+        pass
+
+
+def dedupe(dist_infos: List[str]):
+    """Back files of distributions by the shared store.
+
+    Args:
+        dist_infos (List[str]): The `.dist-info` paths.
+    """
+    for dist_info in dist_infos:
+        site_path = os.path.dirname(dist_info)
+        for path, digest in _record(dist_info):
+            if digest is not None:
+                _store_file(os.path.join(site_path, path), digest)
+
+
+def _replaced_digests(staging: str, target: str) -> Set[str]:
+    """Get hashes of files which `merge` will remove from the target."""
+    old = _dist_infos(target)
+    return {
+        digest
+        for name in _dist_infos(staging) if name in old
+        for _, digest in _record(old[name][1]) if digest is not None
+    }
+
+
+def cleanup_store(digests: Optional[Iterable[str]] = None):
+    """Remove files of store which are not used by any environment.
+
+    Args:
+        digests (Iterable[str], optional):
+            The sha256 (in hex) of files to check.
+            Default is all files of store, which walks whole store.
+            (ex: after swapped out environments are removed)
+    """
+    if digests is None:
+        paths = (
+            os.path.join(root, name)
+            for root, _, files in os.walk(STORE_DIR) for name in files
+        )
+    else:
+        paths = (f'{STORE_DIR}{digest[:2]}/{digest}' for digest in digests)
+    for path in paths:
+        try:
+            if os.stat(path).st_nlink <= 1:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def install(
+    to_install: List[str], run_installer: Callable[[List[str], str], int],
+    target: Optional[str] = None
+) -> int:
+    """Install requirements into the program environment.
+
+    Distributions of other programs are linked first. Remaining ones
+    are installed by `run_installer`. Then files are moved into the site
+    directory & deduplicated. Store files of replaced distributions are
+    removed if no other environment uses them.
+
+    Args:
+        to_install (List[str]): The requirement strings to install.
+        run_installer (Callable[[List[str], str], int]):
+            Called with requirement strings & target directory,
+            and returns the return code of installer.
+        target (str, optional):
+            The site directory. Default is the activated one.
+
+    Returns:
+        int: The return code of installer. (0 if nothing is installed)
+    """
+    target = target or _active_site_dir
+    os.makedirs(target, exist_ok=True)
+    staging = tempfile.mkdtemp(
+        prefix='.tmp-', dir=os.path.dirname(os.path.abspath(target))
+    )
+    try:
+        to_install = _link_shared(to_install, target, staging)
+        return_code = run_installer(to_install, staging) \
+            if to_install else 0
+        if return_code == 0:
+            replaced = _replaced_digests(staging, target)
+            dedupe(merge(staging, target))
+            cleanup_store(replaced)
+        return return_code
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
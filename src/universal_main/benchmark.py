@@ -0,0 +1,371 @@
+"""Startup benchmark of the launcher.
+
+Cold & warm startup of `run_main` (`__main__.py` of program) is measured
+with stub pip & stub PySide6, so it runs headless & offline.
+
+Scenarios are combination of:
+    layout: program directory or zipapp
+    splash: `show_splash` is false or true
+    requirements: count of requirements (installed as stub distributions)
+    mode: cold (no launch cache & bytecode cache) or warm
+
+Import time of the package itself is measured too, and checked against
+a fixed budget (`IMPORT_BUDGET_MS`), so the `get_*` helpers stay cheap.
+`tests/test_import_budget.py` enforces the budget on every test run.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import zipapp
+import tempfile
+import subprocess
+from typing import Dict, Iterable, List, Optional
+
+from .metrics import percentile
+
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENTRY_FILE = os.path.join(os.path.dirname(PACKAGE_DIR), '__main__.py')
+
+LAYOUTS = ('directory', 'zipapp')
+SPLASH_MODES = (False, True)
+REQUIREMENT_COUNTS = (0, 10, 100)
+MODES = ('cold', 'warm')
+IMPORT_BUDGET_MS = 50.0
+
+_STUB_QT_COMMON = '''\
+class _StubMeta(type):
+    def __getattr__(cls, name):
+        return _stub_method
+
+
+class _Stub(metaclass=_StubMeta):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _stub_method
+
+    def __getitem__(self, key):
+        return _Stub()
+
+    def __iter__(self):
+        return iter(())
+
+    def __bool__(self):
+        return True
+
+    def toTuple(self):
+        return (1920, 1080)
+
+    def exec(self):
+        return 0
+
+
+def _stub_method(*args, **kwargs):
+    return _Stub()
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+    return type(name, (_Stub,), {})
+'''
+
+_STUB_PIP_MAIN = '''\
+import sys
+# Stub pip: nothing is installed, network is never used.
+print('stub pip:', *sys.argv[1:])
+'''
+
+_APP_MODULE = '''\
+def pre_main(*args):
+    if args:  # SplashProgress
+        args[0].set_text('Loading')
+        args[0].set_progress(1, 1)
+    return None
+
+
+def main(*args):
+    return 0
+'''
+
+
+def _write(path: str, contents: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(contents)
+
+
+def _make_stubs(stub_dir: str, requirement_count: int) -> List[str]:
+    """Make stub PySide6, stub pip and stub distributions.
+
+    Args:
+        stub_dir (str): The directory to make stubs. (added to PYTHONPATH)
+        requirement_count (int): The count of stub distributions.
+
+    Returns:
+        List[str]: The requirement strings of stub distributions.
+    """
+    _write(stub_dir + '/PySide6/__init__.py', '')
+    for module in ('QtCore', 'QtGui', 'QtWidgets'):
+        _write(f'{stub_dir}/PySide6/{module}.py', _STUB_QT_COMMON)
+    _write(stub_dir + '/pip/__init__.py', '')
+    _write(stub_dir + '/pip/__main__.py', _STUB_PIP_MAIN)
+
+    requirements = []
+    for num in range(requirement_count):
+        name = f'benchpkg{num:03d}'
+        _write(
+            f'{stub_dir}/{name}-1.0.0.dist-info/METADATA',
+            f'Metadata-Version: 2.1\nName: {name}\nVersion: 1.0.0\n'
+        )
+        requirements.append(f'{name}>=1.0')
+    return requirements
+
+
+def _make_app(
+    app_dir: str, layout: str, show_splash: bool, requirements: List[str]
+) -> str:
+    """Make benchmark program.
+
+    Args:
+        app_dir (str): The directory to make program.
+        layout (str): `directory` or `zipapp`.
+        show_splash (bool): The value of `show_splash`.
+        requirements (List[str]): The requirement strings.
+
+    Returns:
+        str: The path to run with python.
+    """
+    src_dir = app_dir + '/src'
+    shutil.copytree(
+        PACKAGE_DIR, src_dir + '/universal_main',
+        ignore=shutil.ignore_patterns('__pycache__', '*.whl')
+    )
+    shutil.copy(ENTRY_FILE, src_dir + '/__main__.py')
+    _write(src_dir + '/bench_app.py', _APP_MODULE)
+    _write(src_dir + '/launch.json', json.dumps({
+        'program_name': 'Benchmark',
+        'main_module': 'bench_app',
+        'main_func': 'main',
+        'show_splash': show_splash,
+        'pre_main': 'pre_main',
+        'min_py_ver': [3, 8],
+        'requirements': requirements
+    }))
+    _write(src_dir + '/programinfo.json', json.dumps({
+        'description': '', 'license_summary': ''
+    }))
+
+    if layout == 'directory':
+        return src_dir + '/__main__.py'
+    target = app_dir + '/app.pyz'
+    zipapp.create_archive(src_dir, target)
+    return target
+
+
+def _clear_caches(app_dir: str, home_dir: str):
+    """Remove launch caches & bytecode caches, for cold start."""
+    shutil.rmtree(home_dir, ignore_errors=True)
+    os.makedirs(home_dir)
+    for root, dirs, _ in os.walk(app_dir):
+        if '__pycache__' in dirs:
+            shutil.rmtree(os.path.join(root, '__pycache__'))
+            dirs.remove('__pycache__')
+
+
+def run_scenario(
+    layout: str, show_splash: bool, requirement_count: int, mode: str,
+    runs: int = 10
+) -> Dict[str, float]:
+    """Measure startup time of a scenario.
+
+    Args:
+        layout (str): `directory` or `zipapp`.
+        show_splash (bool): The value of `show_splash`.
+        requirement_count (int): The count of requirements.
+        mode (str): `cold` or `warm`.
+        runs (int, optional): The count of measured runs. Default is 10.
+
+    Returns:
+        Dict[str, float]: The median & p95 time. (in milliseconds)
+
+    Raises:
+        RuntimeError: If the program exits with non-zero code.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        stub_dir = tmp_dir + '/stubs'
+        home_dir = tmp_dir + '/home'
+        app_dir = tmp_dir + '/app'
+        os.makedirs(home_dir)
+        requirements = _make_stubs(stub_dir, requirement_count)
+        target = _make_app(app_dir, layout, show_splash, requirements)
+
+        env = dict(os.environ)
+        env.pop('UNIVERSAL_MAIN_TRACE', None)
+        # Warm runs use bytecode cache, which cold runs remove in app_dir
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        env.pop('PYTHONPYCACHEPREFIX', None)
+        env['PYTHONPATH'] = stub_dir
+        env['HOME'] = env['USERPROFILE'] = home_dir
+        env['LOCALAPPDATA'] = home_dir
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+
+        times = []
+        for num in range(runs + (mode == 'warm')):
+            if mode == 'cold':
+                _clear_caches(app_dir, home_dir)
+            start = time.perf_counter()
+            result = subprocess.run(
+                [sys.executable, target], env=env, cwd=tmp_dir,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                check=False
+            )
+            elapsed = (time.perf_counter() - start) * 1000
+            if result.returncode != 0:
+                raise RuntimeError(
+                    f'Benchmark program exited with {result.returncode}:\n'
+                    + result.stdout.decode(errors='replace')
+                )
+            if mode == 'cold' or num > 0:  # First warm run fills caches
+                times.append(elapsed)
+
+    return {
+        'median_ms': round(percentile(times, 50), 3),
+        'p95_ms': round(percentile(times, 95), 3),
+    }
+
+
+def scenario_name(
+    layout: str, show_splash: bool, requirement_count: int, mode: str
+) -> str:
+    """Get name of scenario. (ex: `zipapp/splash/req10/warm`)"""
+    return '/'.join((
+        layout, 'splash' if show_splash else 'nosplash',
+        f'req{requirement_count}', mode
+    ))
+
+
+def run_benchmark(
+    layouts: Iterable[str] = LAYOUTS,
+    splash_modes: Iterable[bool] = SPLASH_MODES,
+    requirement_counts: Iterable[int] = REQUIREMENT_COUNTS,
+    modes: Iterable[str] = MODES,
+    runs: int = 10,
+    report=print
+) -> Dict[str, Dict[str, float]]:
+    """Run all combination of scenarios.
+
+    Args:
+        layouts, splash_modes, requirement_counts, modes:
+            The values of scenarios. (See `run_scenario`.)
+        runs (int, optional): The count of measured runs. Default is 10.
+        report (Callable[[str], Any], optional):
+            Called with result line of each scenario. Default is `print`.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The scenario name -> result.
+    """
+    results = {}
+    for layout in layouts:
+        for show_splash in splash_modes:
+            for requirement_count in requirement_counts:
+                for mode in modes:
+                    name = scenario_name(
+                        layout, show_splash, requirement_count, mode
+                    )
+                    result = run_scenario(
+                        layout, show_splash, requirement_count, mode, runs
+                    )
+                    results[name] = result
+                    report(
+                        f'{name:<32} median {result["median_ms"]:9.2f} ms'
+                        f'   p95 {result["p95_ms"]:9.2f} ms'
+                    )
+    return results
+
+
+def measure_import(
+    module: str = 'universal_main', runs: int = 10
+) -> Dict[str, float]:
+    """Measure import time of a module, in fresh interpreters.
+
+    Bytecode cache is warmed by an unmeasured run first.
+
+    Args:
+        module (str, optional): The module name. Default is the package.
+        runs (int, optional): The count of measured runs. Default is 10.
+
+    Returns:
+        Dict[str, float]:
+            The median & p95 time. (in milliseconds)
+    """
+    code = (
+        'import time\n'
+        'start = time.perf_counter()\n'
+        f'import {module}\n'
+        'print((time.perf_counter() - start) * 1000)\n'
+    )
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.dirname(PACKAGE_DIR)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # Warm-up run writes cache
+    times = []
+    for num in range(runs + 1):
+        output = subprocess.run(
+            [sys.executable, '-c', code], env=env,
+            stdout=subprocess.PIPE, check=True
+        ).stdout
+        if num > 0:
+            times.append(float(output))
+    return {
+        'median_ms': round(percentile(times, 50), 3),
+        'p95_ms': round(percentile(times, 95), 3),
+    }
+
+
+def check_budget(
+    results: Dict[str, Dict[str, float]],
+    budget_ms: Optional[float] = None,
+    baseline: Optional[Dict[str, Dict[str, float]]] = None,
+    tolerance: float = 0.2,
+    import_budget_ms: Optional[float] = IMPORT_BUDGET_MS
+) -> List[str]:
+    """Check results against regression budget.
+
+    Args:
+        results (Dict[str, Dict[str, float]]): The benchmark results.
+        budget_ms (float, optional):
+            The maximum median time. Import results (`import/...`)
+            are checked against `import_budget_ms` instead.
+        import_budget_ms (float, optional):
+            The maximum median import time. Default is `IMPORT_BUDGET_MS`.
+        baseline (Dict[str, Dict[str, float]], optional):
+            The baseline results to compare.
+        tolerance (float, optional):
+            The allowed ratio of regression from baseline median.
+            Default is 0.2. (20%)
+
+    Returns:
+        List[str]: The failure messages. Empty if budget is not exceeded.
+    """
+    failures = []
+    for name, result in results.items():
+        median = result['median_ms']
+        budget = import_budget_ms if name.startswith('import/') \
+            else budget_ms
+        if budget is not None and median > budget:
+            failures.append(
+                f'{name}: median {median:.2f} ms > budget {budget:.2f} ms'
+            )
+        if baseline and name in baseline:
+            limit = baseline[name]['median_ms'] * (1 + tolerance)
+            if median > limit:
+                failures.append(
+                    f'{name}: median {median:.2f} ms > '
+                    f'baseline limit {limit:.2f} ms'
+                )
+    return failures
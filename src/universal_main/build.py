@@ -0,0 +1,265 @@
+"""Build optimized zipapp of a program.
+
+The built zipapp has:
+    - Precompiled bytecode (`.pyc`) for the building interpreter,
+      so modules are not compiled again on every run.
+    - Hot resources (`launch.json`, `programinfo.json`, logos etc.)
+      stored uncompressed, right after the resource index.
+    - Resource index (`__resources__.json`) as first member, which
+      has data offsets of hot resources. So the runtime can read them
+      without parsing central directory of the archive.
+    - Precompiled launch manifest (`__manifest__.marshal`).
+    - Optionally, offline wheelhouse (`wheelhouse/`): wheels of
+      requirements compatible with the target interpreter, stored
+      uncompressed (wheels are compressed already), with their sha256.
+"""
+
+import os
+import json
+import stat
+import hashlib
+import marshal
+import zipfile
+import importlib.util
+from typing import Dict, List, Optional, Tuple
+
+from .manifest import COMPILED_FILE, INFO_FILE, LAUNCH_FILE, LaunchManifest
+from .resources import INDEX_FILE, INDEX_VERSION, LOCAL_HEADER
+from .wheel_installer import Wheel, compatible_tags
+from .wheelhouse import HASHES_FILE, HASHES_VERSION, WHEELHOUSE_DIR
+
+
+HOT_RESOURCES = (
+    LAUNCH_FILE, INFO_FILE, COMPILED_FILE,
+    'logo.png', 'logo.jpg', 'LICENSE', 'NOTICE'
+)
+# Executed as script (not imported), so source is kept.
+SCRIPT_FILES = ('package_installer.py',)
+EXCLUDED_DIRS = ('__pycache__', '.git', '.venv', 'venv')
+EXCLUDED_SUFFIXES = ('.pyc', '.pyo', '.pyz')
+# Fixed timestamp of members, to make build reproducible.
+_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def compile_source(source: bytes, filename: str, optimize: int = -1) -> bytes:
+    """Compile python source to unchecked hash-based pyc. (PEP 552)
+
+    Args:
+        source (bytes): The python source.
+        filename (str): The file name shown in traceback.
+        optimize (int, optional): The optimization level of `compile`.
+
+    Returns:
+        bytes: The contents of pyc file.
+    """
+    code = compile(
+        source, filename, 'exec', dont_inherit=True, optimize=optimize
+    )
+    return (
+        importlib.util.MAGIC_NUMBER
+        + (0b01).to_bytes(4, 'little')  # hash-based, unchecked
+        + importlib.util.source_hash(source)
+        + marshal.dumps(code)
+    )
+
+
+def _collect_files(source_dir: str, output: str) -> List[Tuple[str, str]]:
+    """Collect files to pack.
+
+    Returns:
+        List[Tuple[str, str]]: The (path on disk, name in archive) pairs.
+    """
+    output = os.path.abspath(output)
+    files = []
+    for root, dirs, names in os.walk(source_dir):
+        dirs[:] = sorted(name for name in dirs if name not in EXCLUDED_DIRS)
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            if name.endswith(EXCLUDED_SUFFIXES) \
+                    or os.path.abspath(path) == output:
+                continue
+            arcname = os.path.relpath(path, source_dir).replace(os.sep, '/')
+            files.append((path, arcname))
+    return files
+
+
+def _wheelhouse_members(
+    wheelhouse: str, python: Optional[str], platforms: Optional[List[str]]
+) -> Dict[str, bytes]:
+    """Get wheels compatible with the target, and their hashes.
+
+    Returns:
+        Dict[str, bytes]: The name in archive -> contents.
+    """
+    tags = compatible_tags(python, platforms)
+    members, hashes = {}, {}
+    for name in sorted(os.listdir(wheelhouse)):
+        try:
+            if Wheel(name).rank(tags) is None:
+                continue
+        except ValueError:  # Not a wheel
+            continue
+        with open(os.path.join(wheelhouse, name), 'rb') as file:
+            data = file.read()
+        members[WHEELHOUSE_DIR + name] = data
+        hashes[name] = hashlib.sha256(data).hexdigest()
+    members[HASHES_FILE] = json.dumps(
+        {'version': HASHES_VERSION, 'wheels': hashes}, indent=1
+    ).encode('utf-8')
+    return members
+
+
+def _read_json(path: str):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def _members(
+    source_dir: str, output: str, compile_pyc: bool,
+    include_sources: bool, optimize: int
+) -> Dict[str, bytes]:
+    """Get members of archive.
+
+    Returns:
+        Dict[str, bytes]: The name -> contents. (not ordered)
+    """
+    members = {}
+    for path, arcname in _collect_files(source_dir, output):
+        if arcname.startswith(WHEELHOUSE_DIR):  # Packed by build
+            continue
+        with open(path, 'rb') as file:
+            data = file.read()
+        if (
+            compile_pyc and arcname.endswith('.py')
+            and os.path.basename(arcname) not in SCRIPT_FILES
+        ):
+            members[arcname + 'c'] = compile_source(data, arcname, optimize)
+            if not include_sources:
+                continue
+        members[arcname] = data
+
+    manifest = LaunchManifest(
+        _read_json(os.path.join(source_dir, LAUNCH_FILE)),
+        _read_json(os.path.join(source_dir, INFO_FILE))
+    )
+    members[COMPILED_FILE] = manifest.dumps()
+    return members
+
+
+def _write_archive(
+    output: str, shebang: bytes, index: bytes,
+    members: List[Tuple[str, bytes]], compress: bool
+):
+    with open(output, 'wb') as file:
+        file.write(shebang)
+        with zipfile.ZipFile(file, 'w') as archive:
+            for name, data in [(INDEX_FILE, index)] + members:
+                info = zipfile.ZipInfo(name, _DATE_TIME)
+                info.external_attr = 0o644 << 16
+                if compress and name != INDEX_FILE \
+                        and name not in HOT_RESOURCES \
+                        and not name.endswith('.whl'):
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, data)
+
+
+def _data_offsets(output: str, names: List[str]) -> Dict[str, int]:
+    """Get absolute offsets of data of members."""
+    offsets = {}
+    with zipfile.ZipFile(output) as archive, open(output, 'rb') as file:
+        for name in names:
+            info = archive.getinfo(name)
+            file.seek(info.header_offset)
+            fields = LOCAL_HEADER.unpack(file.read(LOCAL_HEADER.size))
+            # fields[-2:] is length of file name & extra field
+            offsets[name] = info.header_offset + LOCAL_HEADER.size \
+                + fields[-2] + fields[-1]
+    return offsets
+
+
+def build(
+    source_dir: str, output: str,
+    interpreter: Optional[str] = '/usr/bin/env python3',
+    compile_pyc: bool = True, include_sources: bool = False,
+    compress: bool = True, optimize: int = -1,
+    wheelhouse: Optional[str] = None, wheel_python: Optional[str] = None,
+    wheel_platforms: Optional[List[str]] = None
+) -> str:
+    """Build optimized zipapp.
+
+    Bytecode is compiled for the interpreter running this function.
+    To target another interpreter version, run build with it.
+    Likewise, wheels for the wheelhouse are selected for it by default.
+
+    Args:
+        source_dir (str):
+            The program directory. (has `__main__.py` & `launch.json`)
+        output (str): The path of zipapp to write.
+        interpreter (str, optional):
+            The interpreter of shebang line. If None, no shebang.
+        compile_pyc (bool, optional): Whether to precompile modules.
+        include_sources (bool, optional):
+            Whether to pack `.py` files with precompiled `.pyc`.
+        compress (bool, optional):
+            Whether to compress members except hot resources.
+        optimize (int, optional): The optimization level of `compile`.
+        wheelhouse (str, optional):
+            The directory of wheels to pack as offline wheelhouse.
+            Default is `wheelhouse` in source_dir if present.
+        wheel_python (str, optional):
+            The interpreter tag (ex: `cp311`) which wheels are selected
+            for. Default is the interpreter running this function.
+        wheel_platforms (List[str], optional):
+            The platform tags (ex: `manylinux_2_17_x86_64`) which
+            wheels are selected for, from most specific one.
+            Default is the running platform.
+
+    Returns:
+        str: The path of written zipapp.
+
+    Raises:
+        FileNotFoundError: If `__main__.py` is not in source_dir.
+    """
+    if not os.path.isfile(os.path.join(source_dir, '__main__.py')):
+        raise FileNotFoundError(f'{source_dir}/__main__.py is not found')
+
+    members = _members(
+        source_dir, output, compile_pyc, include_sources, optimize
+    )
+    if wheelhouse is None \
+            and os.path.isdir(os.path.join(source_dir, WHEELHOUSE_DIR)):
+        wheelhouse = os.path.join(source_dir, WHEELHOUSE_DIR)
+    if wheelhouse is not None:
+        members.update(
+            _wheelhouse_members(wheelhouse, wheel_python, wheel_platforms)
+        )
+    hot = [name for name in HOT_RESOURCES if name in members]
+    ordered = [(name, members[name]) for name in hot] + sorted(
+        (name, data) for name, data in members.items() if name not in hot
+    )
+    shebang = b'' if interpreter is None \
+        else b'#!' + interpreter.encode('utf-8') + b'\n'
+
+    # Index has its own size; reserve it with the largest offsets,
+    # then fill real offsets with same size. (so offsets are unchanged)
+    def make_index(offsets: Dict[str, int]) -> bytes:
+        return json.dumps({
+            'version': INDEX_VERSION,
+            'stored': {
+                name: [offsets[name], len(members[name])] for name in hot
+            },
+            'names': sorted(members),
+        }, separators=(',', ':')).encode('utf-8')
+
+    size = len(make_index({name: 10 ** 15 for name in hot}))
+    _write_archive(output, shebang, b' ' * size, ordered, compress)
+    index = make_index(_data_offsets(output, hot))
+    _write_archive(output, shebang, index.ljust(size), ordered, compress)
+
+    if interpreter is not None:
+        mode = os.stat(output).st_mode
+        os.chmod(output, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return output
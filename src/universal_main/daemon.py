@@ -0,0 +1,425 @@
+"""Warm launcher daemon (fork server). (POSIX only)
+
+If launch.json `daemon` is true, a resident launcher process per program
+& user keeps the interpreter, preloaded modules and main module warm.
+It listens on a local Unix socket. Later launches connect to it,
+pass their stdio/argv/cwd/environment, and the daemon forks a ready child
+which runs the main function. So repeat launches take milliseconds.
+
+The daemon exits after idle timeout, or when launch.json or installed
+packages are changed (then the launch falls back to normal path).
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import socket
+import struct
+import signal
+import hashlib
+import subprocess
+from typing import Callable, List, Optional
+
+from .universal_constants import IS_WINDOWS
+from .resources import find_file
+from .manifest import LAUNCH_FILE, LaunchManifest
+from .requirement_checker import check_to_install
+from . import launch_cache, tracing, universal_constants
+
+
+SERVE_ENV = 'UNIVERSAL_MAIN_DAEMON_SERVE'
+DISABLE_ENV = 'UNIVERSAL_MAIN_NO_DAEMON'
+ACCEPT_INTERVAL = 1.0
+
+_LENGTH = struct.Struct('!I')
+# (kind, value): b'P' + pid of child, b'E' + exit code, b'S' (stale)
+_REPLY = struct.Struct('!ci')
+_FORWARDED_SIGNALS = ('SIGINT', 'SIGTERM', 'SIGHUP', 'SIGQUIT')
+
+
+def is_supported() -> bool:
+    """Check daemon can be used on this platform.
+
+    Returns:
+        bool: If supported, return True. Otherwise, return False.
+    """
+    return (
+        not IS_WINDOWS and hasattr(os, 'fork')
+        and hasattr(socket, 'AF_UNIX') and hasattr(socket, 'SCM_RIGHTS')
+        and not os.environ.get(DISABLE_ENV)
+    )
+
+
+def _program_path() -> str:
+    """Get path of program to run. (zipapp or `__main__.py`)"""
+    if universal_constants.IS_ZIPFILE:
+        return os.path.abspath(universal_constants.ZIPAPP_FILE)
+    return os.path.abspath(sys.argv[0])
+
+
+def socket_path() -> str:
+    """Get path of Unix socket of the daemon for this program & user.
+
+    Returns:
+        str: The socket path.
+    """
+    base = os.environ.get('XDG_RUNTIME_DIR') \
+        or universal_constants.DATADIR + 'universal_main'
+    key = hashlib.sha256(
+        f'{sys.executable}\n{_program_path()}'.encode('utf-8')
+    ).hexdigest()[:16]
+    return os.path.join(base, 'universal_main-daemons', key + '.sock')
+
+
+def _program_sources() -> List[str]:
+    """Get files of program, which are loaded by the daemon."""
+    if universal_constants.IS_ZIPFILE:
+        return [universal_constants.ZIPAPP_FILE]
+    program_dir = os.path.abspath(universal_constants.PROGRAM_DIR)
+    sources = [find_file(LAUNCH_FILE, search_parent=True)]
+    for module in list(sys.modules.values()):
+        path = getattr(module, '__file__', None)
+        if path and os.path.abspath(path).startswith(program_dir):
+            sources.append(path)
+    return sorted(sources, key=str)
+
+
+def fingerprint() -> str:
+    """Get fingerprint of program & installed packages.
+
+    Returns:
+        str:
+            The fingerprint. Changed if launch.json, loaded modules
+            of the program or installed packages are changed.
+    """
+    stats = []
+    for path in _program_sources():
+        try:
+            stat = os.stat(path)
+            stats.append((path, stat.st_size, stat.st_mtime_ns))
+        except (OSError, TypeError):
+            stats.append((path, None, None))
+    return json.dumps(
+        [sys.executable, stats, launch_cache.paths_fingerprint()]
+    )
+
+
+def _recv_exact(conn: socket.socket, size: int) -> bytes:
+    """Receive exactly `size` bytes."""
+    data = b''
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('connection closed')
+        data += chunk
+    return data
+
+
+# Client
+
+
+def connect_and_run() -> Optional[int]:
+    """Run the program on the daemon, if it is running & up to date.
+
+    Stdio of this process is passed to the forked child.
+    Signals are forwarded to the child, until it exits.
+
+    Returns:
+        Optional[int]:
+            The exit code of the program.
+            If the daemon is not available, return None.
+    """
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(socket_path())
+    except OSError:
+        conn.close()
+        return None
+
+    with conn:
+        payload = json.dumps({
+            'argv': sys.argv, 'cwd': os.getcwd(), 'env': dict(os.environ)
+        }).encode('utf-8')
+        fds = [sys.stdin.fileno(), sys.stdout.fileno(), sys.stderr.fileno()]
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            conn.sendmsg(
+                [_LENGTH.pack(len(payload)) + payload],
+                [(socket.SOL_SOCKET, socket.SCM_RIGHTS,
+                  struct.pack(f'{len(fds)}i', *fds))]
+            )
+            kind, pid = _REPLY.unpack(_recv_exact(conn, _REPLY.size))
+        except OSError:
+            return None
+        if kind != b'P':  # Stale daemon: it exits by itself
+            return None
+
+        def forward(signum, _):
+            try:
+                os.kill(pid, signum)
+            except OSError:
+                pass
+        for name in _FORWARDED_SIGNALS:
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), forward)
+
+        try:
+            kind, code = _REPLY.unpack(_recv_exact(conn, _REPLY.size))
+        except OSError:  # Child is killed without reply
+            return 1
+        return code if kind == b'E' else 1
+
+
+def spawn():
+    """Start the daemon in background, for later launches."""
+    env = dict(os.environ)
+    env[SERVE_ENV] = '1'
+    env.pop(tracing.TRACE_ENV, None)
+    with open(os.devnull, 'r+b') as devnull:
+        subprocess.Popen(  # pylint: disable = consider-using-with
+            [sys.executable, _program_path()], env=env,
+            stdin=devnull, stdout=devnull, stderr=devnull,
+            start_new_session=True, close_fds=True
+        )
+
+
+# Server
+
+
+def _make_private_dir(path: str) -> bool:
+    """Make directory only the current user can access.
+
+    `mode` of `os.makedirs` is applied only on creation, so existing one
+    is checked & fixed.
+
+    Returns:
+        bool: If the directory is owned by the current user, return True.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    stat = os.stat(path)
+    if stat.st_uid != os.getuid():
+        return False
+    if stat.st_mode & 0o077:  # Group or others can access
+        os.chmod(path, 0o700)
+    return True
+
+
+def _acquire_lock(path: str, retry: int = 20):
+    """Lock to make sure only one daemon serves the socket.
+
+    Returns:
+        Optional[BinaryIO]: The locked file, or None if failed.
+    """
+    import fcntl  # pylint: disable = import-outside-toplevel
+    file = open(path, 'wb')  # pylint: disable = consider-using-with
+    for _ in range(retry):  # Stale daemon may be exiting
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return file
+        except OSError as exc:
+            if exc.errno not in (errno.EAGAIN, errno.EACCES):
+                raise
+            time.sleep(0.1)
+    file.close()
+    return None
+
+
+def _run_child(
+    conn: socket.socket, listener: socket.socket, request: dict,
+    fds: list, manifest: LaunchManifest, launch: Callable[[], int],
+    ready_fd: int
+):
+    """Run the program in forked child. (never returns)
+
+    It starts after the daemon replied pid (`ready_fd` is closed by the
+    daemon then), so exit code is never sent before pid.
+    """
+    code = 1
+    try:
+        listener.close()
+        os.read(ready_fd, 1)  # EOF when the daemon closed its end
+        os.close(ready_fd)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for target, fd in enumerate(fds[:3]):
+            os.dup2(fd, target)
+        for fd in fds:
+            os.close(fd)
+        os.chdir(request['cwd'])
+        os.environ.clear()
+        os.environ.update(request['env'])
+        sys.argv[:] = request['argv']
+        tracing.reset()
+        tracing.configure(manifest.trace)
+
+        code = launch()
+        code = code if isinstance(code, int) else (0 if code is None else 1)
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else \
+            (0 if exc.code is None else 1)
+    except BaseException:  # pylint: disable = broad-except
+        import traceback  # pylint: disable = import-outside-toplevel
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            conn.sendall(_REPLY.pack(b'E', code))
+        except BaseException:  # pylint: disable = broad-except
+            pass
+        os._exit(code)  # pylint: disable = protected-access
+
+
+def serve(
+    manifest: LaunchManifest, launch: Callable[[], int],
+    warm_up: Callable[[], None]
+) -> int:
+    """Run as the daemon.
+
+    Args:
+        manifest (LaunchManifest): The manifest of program.
+        launch (Callable[[], int]):
+            Run the program in forked child, and return exit code.
+        warm_up (Callable[[], None]):
+            Import modules to keep warm. (main module, PySide6 etc.)
+
+    Returns:
+        int: The exit code of the daemon.
+    """
+    if check_to_install(manifest.requirements):
+        return 1  # Only satisfied environment is served
+    warm_up()
+    start_fingerprint = fingerprint()
+
+    path = socket_path()
+    if not _make_private_dir(os.path.dirname(path)):
+        return 1  # Others could replace the socket
+    lock = _acquire_lock(path + '.lock')
+    if lock is None:  # Other daemon is serving
+        return 0
+
+    with lock:
+        try:
+            os.unlink(path)  # Left by crashed daemon
+        except FileNotFoundError:
+            pass
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        os.chmod(path, 0o600)
+        listener.listen(16)
+        listener.settimeout(ACCEPT_INTERVAL)
+        try:
+            _serve_forever(listener, start_fingerprint, manifest, launch)
+        finally:
+            listener.close()
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+    return 0
+
+
+def _serve_forever(
+    listener: socket.socket, start_fingerprint: str,
+    manifest: LaunchManifest, launch: Callable[[], int]
+):
+    """Accept launches & fork children, until idle or stale."""
+    children = set()
+    last_active = time.monotonic()
+    while True:
+        while children:  # Reap exited children
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                children.clear()
+                break
+            if pid == 0:
+                break
+            children.discard(pid)
+        if children:
+            last_active = time.monotonic()
+        elif time.monotonic() - last_active > manifest.daemon_idle_timeout:
+            return
+
+        try:
+            conn, _ = listener.accept()
+        except socket.timeout:
+            continue
+        last_active = time.monotonic()
+
+        with conn:
+            conn.settimeout(None)
+            try:
+                fds = []
+                data, ancdata, _, _ = conn.recvmsg(
+                    _LENGTH.size, socket.CMSG_SPACE(3 * 4)
+                )
+                for level, kind, cmsg_data in ancdata:
+                    if level == socket.SOL_SOCKET \
+                            and kind == socket.SCM_RIGHTS:
+                        fds += struct.unpack(
+                            f'{len(cmsg_data) // 4}i',
+                            cmsg_data[:len(cmsg_data) // 4 * 4]
+                        )
+                data += _recv_exact(conn, _LENGTH.size - len(data))
+                request = json.loads(_recv_exact(
+                    conn, _LENGTH.unpack(data)[0]
+                ))
+            except (OSError, ValueError):
+                for fd in fds:
+                    os.close(fd)
+                continue
+
+            if fingerprint() != start_fingerprint:
+                conn.sendall(_REPLY.pack(b'S', 0))
+                for fd in fds:
+                    os.close(fd)
+                return
+
+            ready_fd, ready_write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(ready_write_fd)
+                _run_child(
+                    conn, listener, request, fds, manifest, launch, ready_fd
+                )
+            os.close(ready_fd)
+            children.add(pid)
+            for fd in fds:
+                os.close(fd)
+            try:
+                conn.sendall(_REPLY.pack(b'P', pid))
+            except OSError:
+                pass
+            finally:
+                os.close(ready_write_fd)  # Let the child run
+
+
+def run_with_daemon(
+    manifest: LaunchManifest, launch: Callable[[], int],
+    warm_up: Callable[[], None]
+) -> int:
+    """Run the program on the daemon if possible, otherwise run normally.
+
+    Args:
+        manifest (LaunchManifest): The manifest of program.
+        launch (Callable[[], int]): Run the program, return exit code.
+        warm_up (Callable[[], None]):
+            Import modules to keep warm. (called by the daemon)
+
+    Returns:
+        int: The exit code of the program.
+    """
+    if not is_supported():
+        return launch()
+    if os.environ.get(SERVE_ENV):
+        return serve(manifest, launch, warm_up)
+
+    with tracing.phase('daemon_connect'):
+        code = connect_and_run()
+    if code is not None:
+        return code
+    spawn()
+    return launch()
@@ -0,0 +1,118 @@
+"""Lightweight splash shown before Qt is ready.
+
+Importing PySide6 (or installing it on first run) takes long,
+so a tkinter window with program name & logo is shown first.
+It is closed when Qt splash is shown.
+
+tkinter is optional: if it is missing (or no display),
+nothing is shown and the launch continues.
+"""
+
+import base64
+from typing import Optional
+
+from .resources import read_bytes
+from . import tracing
+
+
+WIDTH = 400
+HEIGHT = 200
+MAX_LOGO_WIDTH = 360
+MAX_LOGO_HEIGHT = 120
+
+
+class EarlySplash:
+    """The tkinter splash window.
+
+    It must be used in the thread which created it. (GUI thread)
+    """
+
+    def __init__(self, text: str):
+        """Create & show splash window.
+
+        Args:
+            text (str): The text displayed. (ex: program name)
+
+        Raises:
+            ImportError: If tkinter is not available.
+            tkinter.TclError: If the window cannot be created.
+        """
+        # pylint: disable = import-outside-toplevel
+        import tkinter
+
+        self.__tkinter = tkinter
+        self.__root = tkinter.Tk()
+        self.__root.overrideredirect(True)
+        x = (self.__root.winfo_screenwidth() - WIDTH) // 2
+        y = (self.__root.winfo_screenheight() - HEIGHT) // 2
+        self.__root.geometry(f'{WIDTH}x{HEIGHT}+{x}+{y}')
+
+        self.__logo = self.__load_logo()
+        if self.__logo is not None:
+            tkinter.Label(self.__root, image=self.__logo).pack(
+                expand=True
+            )
+        self.__label = tkinter.Label(
+            self.__root, text=text, font=('Helvetica', 20)
+        )
+        self.__label.pack(expand=True)
+        self.update()
+
+    def __load_logo(self):
+        """Load `logo.png`. (JPEG is not supported by tkinter)"""
+        data = read_bytes('logo.png')
+        if data is None:
+            return None
+        try:
+            image = self.__tkinter.PhotoImage(
+                data=base64.b64encode(data).decode('ascii')
+            )
+        except self.__tkinter.TclError:  # Not supported format
+            return None
+        factor = max(
+            -(-image.width() // MAX_LOGO_WIDTH),
+            -(-image.height() // MAX_LOGO_HEIGHT), 1
+        )
+        return image.subsample(factor) if factor > 1 else image
+
+    def set_text(self, text: str):
+        """Change the text.
+
+        Args:
+            text (str): The text displayed.
+        """
+        self.__label.configure(text=text)
+        self.update()
+
+    def update(self):
+        """Process pending window events."""
+        try:
+            self.__root.update()
+        except self.__tkinter.TclError:  # Already destroyed
+            pass
+
+    def close(self):
+        """Close the window."""
+        try:
+            self.__root.destroy()
+        except self.__tkinter.TclError:
+            pass
+
+
+def show_early_splash(text: str) -> Optional[EarlySplash]:
+    """Show early splash, if possible.
+
+    Args:
+        text (str): The text displayed. (ex: program name)
+
+    Returns:
+        Optional[EarlySplash]:
+            The shown splash, or None if tkinter is not available.
+    """
+    with tracing.phase('early_splash') as trace_args:
+        try:
+            return EarlySplash(text)
+        except Exception as exc:  # pylint: disable = broad-except
+            # ImportError, or TclError (ex: no display)
+            trace_args['error'] = f'{type(exc).__name__}: {exc}'
+            return None
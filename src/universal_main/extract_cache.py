@@ -0,0 +1,164 @@
+"""Persistent, content-addressed cache of extracted files.
+
+Files embedded in zipapp (or wheel), like helper scripts and native
+modules, are extracted once and reused by later runs.
+Entries are keyed by content hash & interpreter tag, published atomically
+(so concurrent launches are safe), and removed in LRU order. Entries used
+recently are kept, as running launches may be using them.
+"""
+
+import os
+import sys
+import time
+import shutil
+import hashlib
+import tempfile
+import zipfile
+import sysconfig
+from typing import Callable, Iterable
+
+from .universal_constants import DATADIR
+
+
+CACHE_DIR = DATADIR + 'universal_main/extracted/'
+MAX_ENTRIES = 16
+# Unpublished (crashed) temporary directories are removed after this.
+STALE_TMP_SECONDS = 24 * 60 * 60
+# Entries used within this are never removed. (may be in use)
+IN_USE_SECONDS = 24 * 60 * 60
+
+
+def interpreter_tag() -> str:
+    """Get tag of current interpreter. (ex: `cp311-win_amd64`)
+
+    Returns:
+        str: The tag.
+    """
+    impl = {'cpython': 'cp', 'pypy': 'pp'}.get(
+        sys.implementation.name, sys.implementation.name
+    )
+    platform_tag = sysconfig.get_platform().replace('-', '_')\
+        .replace('.', '_')
+    return f'{impl}{sys.version_info[0]}{sys.version_info[1]}-{platform_tag}'
+
+
+def member_fingerprint(
+    archive: zipfile.ZipFile, names: Iterable[str]
+) -> str:
+    """Get content fingerprint of archive members, without reading them.
+
+    Args:
+        archive (zipfile.ZipFile): The archive.
+        names (Iterable[str]): The member names.
+
+    Returns:
+        str: The fingerprint made with name, CRC32 and size of members.
+    """
+    parts = []
+    for name in names:
+        info = archive.getinfo(name)
+        parts.append(f'{name}:{info.CRC:08x}:{info.file_size}')
+    return ';'.join(parts)
+
+
+def file_fingerprint(paths: Iterable[str]) -> str:
+    """Get fingerprint of files on disk.
+
+    Args:
+        paths (Iterable[str]): The file paths.
+
+    Returns:
+        str: The fingerprint made with path, size and mtime of files.
+    """
+    parts = []
+    for path in paths:
+        stat = os.stat(path)
+        parts.append(
+            f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'
+        )
+    return ';'.join(parts)
+
+
+def get_directory(key: str, populate: Callable[[str], None]) -> str:
+    """Get cached directory. If not cached, populate & publish it.
+
+    Args:
+        key (str): The content key. (ex: from `member_fingerprint`)
+            Interpreter tag is added to this automatically.
+        populate (Callable[[str], None]):
+            Called with empty temporary directory, to extract files into.
+
+    Returns:
+        str: The path of cached directory. (ends with `/`)
+    """
+    digest = hashlib.sha256(
+        f'{interpreter_tag()}\n{key}'.encode('utf-8')
+    ).hexdigest()[:32]
+    path = CACHE_DIR + digest
+
+    if os.path.isdir(path):
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return path + '/'
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=CACHE_DIR)
+    try:
+        populate(tmp_dir)
+        try:
+            os.rename(tmp_dir, path)
+        except OSError:  # Other process published first
+            if not os.path.isdir(path):
+                raise
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    cleanup(keep=digest)
+    return path + '/'
+
+
+def cleanup(max_entries: int = MAX_ENTRIES, keep: str = ''):
+    """Remove least recently used entries & stale temporary directories.
+
+    Entries used within `IN_USE_SECONDS` are kept, even if there are
+    more than max_entries.
+
+    Args:
+        max_entries (int, optional):
+            The count of entries to keep. Default is `MAX_ENTRIES`.
+        keep (str, optional): The entry never removed.
+    """
+    try:
+        entries = list(os.scandir(CACHE_DIR))
+    except OSError:
+        return
+
+    now = time.time()
+    published = []
+    for entry in entries:
+        try:
+            mtime = entry.stat().st_mtime
+        except OSError:
+            continue
+        if entry.name.startswith('.tmp-'):
+            if now - mtime > STALE_TMP_SECONDS:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        elif entry.name != keep:
+            published.append((mtime, entry.path))
+
+    published.sort(reverse=True)
+    for mtime, path in published[max(max_entries - bool(keep), 0):]:
+        if now - mtime < IN_USE_SECONDS:
+            continue
+        # Rename first, so half-removed entry is never used.
+        # It fails if the entry is in use (ex: loaded native module).
+        trash = CACHE_DIR + '.tmp-' + os.path.basename(path)
+        try:
+            os.rename(path, trash)
+        except OSError:
+            continue
+        shutil.rmtree(trash, ignore_errors=True)
@@ -0,0 +1,187 @@
+"""Cached index of top-level module locations.
+
+Normally, importing a top-level module scans every `sys.path` entry
+until the module is found. With many installed packages (or zipapp
+entries) this is many `stat`/`listdir` calls on every launch.
+
+If launch.json `import_index` is true, locations of top-level modules
+found on previous run are persisted. The index is valid while
+`sys.path` and mtimes of its entries are unchanged (adding or removing
+a module changes mtime of the directory), and imports go straight to
+the recorded entry. Unknown modules fall back to the normal finders.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import threading
+from importlib.machinery import PathFinder
+from typing import Dict, List, Optional, Tuple
+
+from .universal_constants import DATADIR
+
+
+INDEX_DIR = DATADIR + 'universal_main/import_index/'
+INDEX_VERSION = 1
+
+_lock = threading.Lock()
+_finder = None
+
+
+def _entry_mtimes(entries: List[str]) -> List[Optional[int]]:
+    """Get mtime (in ns) of `sys.path` entries. (None if not exist)"""
+    mtimes = []
+    for entry in entries:
+        try:
+            mtimes.append(os.stat(entry or os.curdir).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return mtimes
+
+
+def _index_file(entries: List[str]) -> str:
+    # Relative entries (ex: `''`) depend on current directory.
+    cwd = None if all(map(os.path.isabs, entries)) else os.getcwd()
+    key = hashlib.sha256(json.dumps([
+        sys.executable, sys.version, cwd, entries
+    ]).encode('utf-8')).hexdigest()[:32]
+    return INDEX_DIR + key + '.json'
+
+
+class IndexFinder:
+    """Meta path finder which looks up the index first.
+
+    Attributes:
+        entries (List[str]): The `sys.path` when the index is loaded.
+        modules (Dict[str, int]):
+            The top-level module name -> index of entry.
+        hits (int): The count of imports resolved by the index.
+    """
+
+    def __init__(self, entries: List[str], modules: Dict[str, int]):
+        """
+        Args:
+            entries (List[str]): The `sys.path` entries.
+            modules (Dict[str, int]):
+                The top-level module name -> index of entry.
+        """
+        self.entries = entries
+        self.modules = modules
+        self.hits = 0
+
+    def find_spec(self, fullname: str, path=None, target=None):
+        """Find spec of top-level module from the recorded entry.
+
+        Returns:
+            Optional[ModuleSpec]:
+                The spec. If not indexed (or moved), return None.
+        """
+        if path is not None or fullname not in self.modules:
+            return None
+        entry = self.entries[self.modules[fullname]]
+        spec = PathFinder.find_spec(fullname, [entry], target)
+        if spec is not None:
+            self.hits += 1
+        return spec
+
+    def invalidate_caches(self):
+        """Forget the index. (called by `importlib.invalidate_caches`)"""
+        self.modules = {}
+
+
+def _entry_of(module, entries: List[str]) -> Optional[int]:
+    """Get index of `sys.path` entry which the module was found in."""
+    spec = getattr(module, '__spec__', None)
+    # Namespace packages can span many entries, so they are not indexed.
+    if spec is None or not spec.has_location or not spec.origin:
+        return None
+    if spec.submodule_search_locations:  # Package
+        parent = os.path.dirname(os.path.dirname(spec.origin))
+    else:
+        parent = os.path.dirname(spec.origin)
+
+    parent = os.path.normcase(os.path.abspath(parent))
+    for index, entry in enumerate(entries):
+        if os.path.normcase(os.path.abspath(entry or os.curdir)) == parent:
+            return index
+    return None
+
+
+def _load(entries: List[str]) -> Tuple[Dict[str, int], bool]:
+    """Load index of current `sys.path`.
+
+    Returns:
+        Tuple[Dict[str, int], bool]:
+            The module name -> index of entry, and whether it is valid.
+    """
+    try:
+        with open(_index_file(entries), 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        if data['version'] == INDEX_VERSION \
+                and data['entries'] == entries \
+                and data['mtimes'] == _entry_mtimes(entries):
+            return data['modules'], True
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return {}, False
+
+
+def install() -> IndexFinder:
+    """Install finder with index of current `sys.path` to `sys.meta_path`.
+
+    Returns:
+        IndexFinder: The installed finder. (empty if no valid index)
+    """
+    global _finder  # pylint: disable = global-statement
+    with _lock:
+        if _finder is None:
+            entries = list(sys.path)
+            modules, _ = _load(entries)
+            _finder = IndexFinder(entries, modules)
+            sys.meta_path.insert(0, _finder)
+        return _finder
+
+
+def uninstall():
+    """Remove the installed finder from `sys.meta_path`."""
+    global _finder  # pylint: disable = global-statement
+    with _lock:
+        if _finder is not None and _finder in sys.meta_path:
+            sys.meta_path.remove(_finder)
+        _finder = None
+
+
+def save():
+    """Record locations of imported top-level modules.
+
+    Nothing is written if the index is unchanged.
+    """
+    entries = list(sys.path)
+    modules, valid = _load(entries)
+    if not valid:
+        modules = {}
+    mtimes = _entry_mtimes(entries)
+    changed = not valid
+    for name, module in list(sys.modules.items()):
+        if '.' in name or name == '__main__' or name in modules:
+            continue
+        index = _entry_of(module, entries)
+        if index is not None:
+            modules[name] = index
+            changed = True
+    if not changed:
+        return
+
+    path = _index_file(entries)
+    try:
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        tmp_file = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            json.dump({
+                'version': INDEX_VERSION, 'entries': entries,
+                'mtimes': mtimes, 'modules': modules
+            }, file)
+        os.replace(tmp_file, path)
+    except OSError:  # Index is optional
+        pass
@@ -0,0 +1,401 @@
+"""Installer backends.
+
+Missing requirements are installed by a backend:
+    - `wheels`: installs from local wheels (wheelhouse of the zipapp &
+      `wheel_dir` of launch.json) in-process, without pip. Only if all
+      requirements are resolved to local wheels; otherwise next backend
+      is tried.
+    - `uv`: runs `uv pip install`, if `uv` is on PATH.
+    - `pip`: runs pip. (always available)
+
+Interactively, `uv` & `pip` run in the package installer, which asks the
+user first & shows progress. Otherwise (ex: `provision`), their output
+goes to stderr.
+
+Available backends are tried in order of measured install time: median
+milliseconds per package of recent successful installs, recorded in
+`INSTALLS_FILE`. Until measured, expected time of backend is used.
+`installer` of launch.json puts the backend first.
+"""
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import tempfile
+import subprocess
+from abc import ABC, abstractmethod
+from typing import Dict, FrozenSet, List, Optional
+
+from .universal_constants import IS_WINDOWS
+from .resources import get_zipapp, zipapp_index
+from .metrics import METRICS_DIR, append, percentile, read_records
+from . import (
+    extract_cache, tracing, universal_constants, wheel_installer, wheelhouse
+)
+
+
+FILE_DIR = os.path.abspath(os.path.dirname(__file__)) + '/'
+
+INSTALLS_FILE = METRICS_DIR + 'installs.jsonl'
+# Installs per backend, which the estimated time is from
+HISTORY_SIZE = 20
+
+# Capabilities of backends
+IN_PROCESS = 'in_process'  # Without subprocess
+INDEX = 'index'  # Downloads from package index
+LOCAL_WHEELS = 'local_wheels'  # Installs from directory of wheels
+SDIST = 'sdist'  # Builds source distributions
+PROGRESS_UI = 'progress_ui'  # Interactive install shows progress
+
+# Return code of package installer if the user declined install
+# (same as `CANCELED` of package_installer)
+CANCELED = 10
+
+_preferred = None
+
+
+def _wincurses_wheel_name() -> str:
+    """
+    Get file name of wincurses wheel for current interpreter.
+
+    Returns:
+        str: The file name. (ex: `curses-cp311_64.whl`)
+    """
+    major, minor = sys.version_info[:2]
+    return (
+        f'curses-cp{major}{minor}_'
+        + ('64.whl' if sys.maxsize == 2 ** 63 - 1 else '32.whl')
+    )
+
+
+def _installer_dir() -> str:
+    """
+    Get directory that package installer (and wincurses) presents.
+
+    In zipapp (or on Windows), files are extracted into persistent cache
+    once, then reused by later runs.
+
+    Returns:
+        str: The directory. (ends with `/`)
+
+    Raises:
+        FileNotFoundError: If the zipapp has no package installer.
+    """
+    is_zipfile = universal_constants.IS_ZIPFILE
+    if not is_zipfile and not IS_WINDOWS:
+        return FILE_DIR
+
+    if is_zipfile:
+        main_zip = get_zipapp()
+        for name in zipapp_index():
+            if name.endswith('package_installer.py'):
+                installer_name = name
+                break
+        else:
+            raise FileNotFoundError(
+                f'package_installer.py is not found in {main_zip.filename}'
+            )
+        wheel_name = os.path.dirname(installer_name) + '/wincurses/' \
+            + _wincurses_wheel_name()
+        names = [installer_name] + ([wheel_name] if IS_WINDOWS else [])
+        key = extract_cache.member_fingerprint(main_zip, names)
+    else:
+        wheel_name = FILE_DIR + 'wincurses/' + _wincurses_wheel_name()
+        key = extract_cache.file_fingerprint(
+            [FILE_DIR + 'package_installer.py', wheel_name]
+        )
+
+    def populate(tmp_dir):
+        if is_zipfile:
+            with open(tmp_dir + '/package_installer.py', 'wb') as file:
+                file.write(main_zip.read(installer_name))
+        else:
+            shutil.copy(FILE_DIR + 'package_installer.py', tmp_dir)
+
+        if IS_WINDOWS:
+            curses_dir = tmp_dir + '/wincurses/'
+            os.mkdir(curses_dir)
+            with zipfile.ZipFile(
+                main_zip.open(wheel_name) if is_zipfile else wheel_name
+            ) as curses_pyd:
+                for name in curses_pyd.namelist():
+                    if name.endswith('.pyd'):
+                        with open(
+                            curses_dir + os.path.basename(name), 'wb'
+                        ) as file:
+                            file.write(curses_pyd.read(name))
+
+    return extract_cache.get_directory(key, populate)
+
+
+def _record(backend: str, packages: int, seconds: float):
+    """Append successful install to the history."""
+    append({
+        'ts': round(time.time(), 3),
+        'backend': backend,
+        'packages': packages,
+        'ms': round(seconds * 1000, 3),
+    }, INSTALLS_FILE)
+
+
+class Backend(ABC):
+    """Installer backend.
+
+    Attributes:
+        name (str): The name. (`installer` of launch.json)
+        capabilities (FrozenSet[str]):
+            The capabilities. (`IN_PROCESS`, `INDEX` etc.)
+        expected_ms (float):
+            The expected milliseconds per package, until measured.
+    """
+    name = ''
+    capabilities: FrozenSet[str] = frozenset()
+    expected_ms = 0.0
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Check the backend can be used.
+
+        Returns:
+            bool: If it can be used, return True.
+        """
+
+    @abstractmethod
+    def install(
+        self, to_install: List[str], target: Optional[str] = None,
+        interactive: bool = True
+    ) -> Optional[int]:
+        """Install requirements.
+
+        Args:
+            to_install (List[str]): The requirement strings to install.
+            target (str, optional):
+                The directory to install into.
+                Default is site-packages of the interpreter.
+            interactive (bool, optional):
+                Whether to ask the user & show progress. Default is True.
+
+        Returns:
+            Optional[int]: The return code, or None if the backend
+                cannot install them. (then the next backend is tried)
+        """
+
+
+class WheelBackend(Backend):
+    """Install from local wheels in-process."""
+    name = 'wheels'
+    capabilities = frozenset((IN_PROCESS, LOCAL_WHEELS))
+    expected_ms = 10.0
+
+    def is_available(self) -> bool:
+        return wheelhouse.get_wheelhouse() is not None \
+            or wheel_installer.get_wheel_dir() is not None
+
+    def install(
+        self, to_install: List[str], target: Optional[str] = None,
+        interactive: bool = True
+    ) -> Optional[int]:
+        start = time.perf_counter()
+        for wheel_dir in (
+            wheelhouse.get_wheelhouse(), wheel_installer.get_wheel_dir()
+        ):
+            if wheel_dir is not None \
+                    and wheel_installer.install(to_install, target, wheel_dir):
+                seconds = time.perf_counter() - start
+                _record(self.name, len(to_install), seconds)
+                return 0
+        return None
+
+
+class PipBackend(Backend):
+    """Run pip."""
+    name = 'pip'
+    capabilities = frozenset((INDEX, LOCAL_WHEELS, SDIST, PROGRESS_UI))
+    expected_ms = 1000.0
+
+    def is_available(self) -> bool:
+        return True
+
+    def _command(self) -> List[str]:
+        """Get non-interactive install command."""
+        return [
+            sys.executable, '-m', 'pip', 'install',
+            '--disable-pip-version-check', '--no-input'
+        ]
+
+    def _installer_args(self) -> List[str]:
+        """Get options of package installer to use this backend."""
+        return []
+
+    def install(
+        self, to_install: List[str], target: Optional[str] = None,
+        interactive: bool = True
+    ) -> Optional[int]:
+        wheelhouse_dir = wheelhouse.get_wheelhouse()
+        if interactive:
+            return self._run_package_installer(
+                to_install, target, wheelhouse_dir
+            )
+        start = time.perf_counter()
+        return_code = subprocess.run(
+            [
+                *self._command(),
+                *(['--target', target] if target else []),
+                *(['--find-links', wheelhouse_dir] if wheelhouse_dir else []),
+                *to_install
+            ],
+            stdin=subprocess.DEVNULL, stdout=sys.stderr, check=False
+        ).returncode
+        if return_code == 0:
+            _record(self.name, len(to_install), time.perf_counter() - start)
+        return return_code
+
+    def _run_package_installer(
+        self, to_install: List[str], target: Optional[str] = None,
+        wheelhouse_dir: Optional[str] = None
+    ) -> int:
+        """
+        Run the package installer.
+
+        Args:
+            to_install (List[str]): The requirement strings to install.
+            target (str, optional):
+                The directory to install into. (`pip install --target`)
+                Default is site-packages of the interpreter.
+            wheelhouse_dir (str, optional):
+                The directory of wheels, which is tried without index first.
+
+        Returns:
+            int: The return code from popened process.
+        """
+        # Installer writes the time taken without prompt.
+        fd, time_file = tempfile.mkstemp(prefix='universal_main-')
+        os.close(fd)
+        try:
+            return_code = subprocess.run([
+                sys.executable, _installer_dir() + 'package_installer.py',
+                *(['--target', target] if target else []),
+                *(['--wheelhouse', wheelhouse_dir] if wheelhouse_dir else []),
+                *self._installer_args(), '--time-file', time_file,
+                *to_install
+            ], check=False).returncode
+            with open(time_file, 'r', encoding='utf-8') as file:
+                seconds = file.read()
+            if return_code == 0 and seconds:  # Not canceled
+                _record(self.name, len(to_install), float(seconds))
+        finally:
+            os.remove(time_file)
+        return return_code
+
+
+class UvBackend(PipBackend):
+    """Run `uv pip`."""
+    name = 'uv'
+    expected_ms = 200.0
+
+    def is_available(self) -> bool:
+        return shutil.which('uv') is not None
+
+    def _command(self) -> List[str]:
+        return [
+            shutil.which('uv'), 'pip', 'install', '--python', sys.executable
+        ]
+
+    def _installer_args(self) -> List[str]:
+        return ['--uv', shutil.which('uv')]
+
+
+BACKENDS = (WheelBackend(), UvBackend(), PipBackend())
+
+
+def configure(preferred: Optional[str]):
+    """Set the backend tried first.
+
+    Args:
+        preferred (Optional[str]):
+            The name of backend. If None, selected automatically.
+    """
+    global _preferred  # pylint: disable = global-statement
+    _preferred = preferred
+
+
+def estimates() -> Dict[str, float]:
+    """Get estimated milliseconds per package of backends.
+
+    Returns:
+        Dict[str, float]:
+            The backend name -> median of recent installs, or expected
+            time of backend if not measured.
+    """
+    samples = {backend.name: [] for backend in BACKENDS}
+    for record in read_records(INSTALLS_FILE):
+        try:
+            per_package = float(record['ms']) / max(int(record['packages']), 1)
+            history = samples[record['backend']]
+        except (KeyError, TypeError, ValueError):
+            continue
+        history.append(per_package)
+        del history[:-HISTORY_SIZE]
+    return {
+        backend.name: percentile(samples[backend.name], 50)
+        if samples[backend.name] else backend.expected_ms
+        for backend in BACKENDS
+    }
+
+
+def select(capabilities: FrozenSet[str] = frozenset()) -> List[Backend]:
+    """Get available backends, in order to try.
+
+    Args:
+        capabilities (FrozenSet[str], optional):
+            The capabilities backends must have.
+
+    Returns:
+        List[Backend]: The backends. Configured one is first,
+            then from the fastest one.
+    """
+    durations = estimates()
+    return sorted(
+        (
+            backend for backend in BACKENDS
+            if capabilities <= backend.capabilities and backend.is_available()
+        ),
+        key=lambda backend: (
+            backend.name != _preferred, durations[backend.name]
+        )
+    )
+
+
+def install(
+    to_install: List[str], target: Optional[str] = None,
+    interactive: bool = True
+) -> int:
+    """Install requirements with the first backend which can do it.
+
+    If a backend fails (nonzero return code), the next one is tried,
+    unless the user declined install. (`CANCELED`)
+
+    Args:
+        to_install (List[str]): The requirement strings to install.
+        target (str, optional):
+            The directory to install into.
+            Default is site-packages of the interpreter.
+        interactive (bool, optional):
+            Whether to ask the user & show progress. Default is True.
+
+    Returns:
+        int: The return code. If all backends failed, return code of
+            the last failed one. (1 if no backend can install them,
+            `CANCELED` if the user declined install)
+    """
+    last_code = 1
+    for backend in select():
+        with tracing.phase(f'installer/{backend.name}'):
+            return_code = backend.install(to_install, target, interactive)
+        if return_code in (0, CANCELED):
+            return return_code
+        if return_code is not None:
+            last_code = return_code
+    return last_code
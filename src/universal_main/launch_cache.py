@@ -0,0 +1,134 @@
+"""Persistent cache of "requirements satisfied" fingerprints.
+
+If nothing is changed since last successful check,
+the requirement check is skipped on warm launch.
+"""
+
+import os
+import sys
+import json
+import site
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import universal_constants
+
+
+CACHE_FILE = 'universal_main/launch_cache.json'  # Relative to DATADIR
+MAX_ENTRIES = 64
+
+
+def _site_dirs() -> List[str]:
+    """Get directories that distributions can be installed to.
+
+    Returns:
+        List[str]: The directories. (may be not exist yet)
+    """
+    dirs = [path for path in sys.path if path and os.path.isdir(path)]
+    try:
+        dirs += site.getsitepackages()
+    except AttributeError:  # Old virtualenv does not have this function
+        pass
+    if site.ENABLE_USER_SITE:
+        dirs.append(site.getusersitepackages())
+    return sorted(set(map(os.path.abspath, dirs)))
+
+
+def paths_fingerprint() -> List[Tuple[str, Optional[int]]]:
+    """Get cheap fingerprint of site directories.
+
+    Installing/removing a distribution adds/removes metadata directory,
+    so mtime of the site directory is changed.
+
+    Returns:
+        List[Tuple[str, Optional[int]]]:
+            The (directory, mtime in ns) pairs.
+            mtime is None if the directory does not exist.
+    """
+    fingerprint = []
+    for path in _site_dirs():
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        fingerprint.append((path, mtime))
+    return fingerprint
+
+
+def _cache_key(
+    requirements: Iterable[str], fingerprint: List[Tuple[str, Optional[int]]]
+) -> str:
+    """Get key of cache entry.
+
+    Args:
+        requirements (Iterable[str]): The requirement strings.
+        fingerprint (List[Tuple[str, Optional[int]]]):
+            The result of `paths_fingerprint`.
+
+    Returns:
+        str:
+            The key made with interpreter, site directories
+            & requirements. (so programs sharing requirements
+            but not import paths have own entries)
+    """
+    return hashlib.sha256(json.dumps([
+        sys.executable, sys.version, sorted(requirements),
+        [path for path, _ in fingerprint]
+    ]).encode('utf-8')).hexdigest()
+
+
+def _cache_file() -> str:
+    """Get path of the cache file."""
+    return universal_constants.DATADIR + CACHE_FILE
+
+
+def _load() -> Dict[str, list]:
+    try:
+        with open(_cache_file(), 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def is_satisfied(requirements: Iterable[str]) -> bool:
+    """Check the requirements were satisfied on same environment.
+
+    Args:
+        requirements (Iterable[str]): The requirement strings.
+
+    Returns:
+        bool:
+            If fingerprint matches to cached one, return True.
+            Otherwise, return False.
+    """
+    fingerprint = paths_fingerprint()
+    cached = _load().get(_cache_key(requirements, fingerprint))
+    if cached is None:
+        return False
+    return [tuple(item) for item in cached] == fingerprint
+
+
+def mark_satisfied(requirements: Iterable[str]):
+    """Save fingerprint of current environment for the requirements.
+
+    Args:
+        requirements (Iterable[str]): The requirement strings.
+    """
+    cache = _load()
+    fingerprint = paths_fingerprint()
+    key = _cache_key(requirements, fingerprint)
+    cache.pop(key, None)
+    cache[key] = fingerprint
+    while len(cache) > MAX_ENTRIES:
+        del cache[next(iter(cache))]
+
+    cache_file = _cache_file()
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_file = f'{cache_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as file:
+            json.dump(cache, file)
+        os.replace(tmp_file, cache_file)
+    except OSError:  # Cache is optional
+        pass
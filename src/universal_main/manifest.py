@@ -0,0 +1,357 @@
+"""Typed launch manifest, combined from `launch.json` & `programinfo.json`.
+
+The manifest is parsed & validated once, then shared by the launcher and
+the `get_*` helpers. It can be precompiled to a marshal blob
+(`__manifest__.marshal`), which is loaded faster than JSON files.
+"""
+
+import os
+import marshal
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import universal_constants
+from .resources import find_file, read_bytes, read_json
+
+
+LAUNCH_FILE = 'launch.json'
+INFO_FILE = 'programinfo.json'
+COMPILED_FILE = '__manifest__.marshal'
+COMPILED_VERSION = 4
+
+# (key, expected types, default) of `launch.json`
+_LAUNCH_FIELDS = (
+    ('program_name', (str,), None),
+    ('main_module', (str,), None),
+    ('main_func', (str,), None),
+    ('show_splash', (bool,), True),
+    ('early_splash', (bool,), False),
+    ('pre_main', (str, type(None)), None),
+    ('pre_main_process', (bool,), False),
+    ('pre_main_worker', (bool,), False),
+    ('startup_tasks', (dict,), {}),
+    ('min_py_ver', (list, tuple), (3, 8)),
+    ('requirements', (list, tuple), ()),
+    ('trace', (str, bool, type(None)), None),
+    ('metrics', (bool,), True),
+    ('preload', (list, tuple), ()),
+    ('daemon', (bool,), False),
+    ('import_index', (bool,), False),
+    ('app_env', (bool,), False),
+    ('update_source', (str, type(None)), None),
+    ('wheel_dir', (str, type(None)), None),
+    ('installer', (str, type(None)), None),
+    ('update_interval', (int, float), 24 * 60 * 60),
+    ('daemon_idle_timeout', (int, float), 600),
+)
+_REQUIRED_LAUNCH_KEYS = ('program_name', 'main_module', 'main_func')
+# Names of installer backends (`installers.BACKENDS`, not imported here
+# so the package stays cheap to import; they are compared by tests)
+INSTALLER_NAMES = ('wheels', 'uv', 'pip')
+# (key, expected types, default) of `programinfo.json`
+_INFO_FIELDS = (
+    ('description', (str,), None),
+    ('license_summary', (str,), None),
+)
+
+_lock = threading.Lock()
+_manifest = None
+
+
+class LaunchManifest:
+    """The launch manifest.
+
+    Attributes of `launch.json` are None (or default)
+    if `launch.json` is not present. Likewise for `programinfo.json`.
+
+    Attributes:
+        program_name (Optional[str]): The name of program.
+        main_module (Optional[str]): The module that main function exists.
+        main_func (Optional[str]): The name of main function.
+        show_splash (bool): Whether to show PySide6 splash.
+        early_splash (bool):
+            Whether to show tkinter splash until PySide6 splash is shown.
+        pre_main (Optional[str]): The function run before main function.
+        pre_main_process (bool): Whether to run pre_main in worker process.
+        pre_main_worker (bool):
+            Whether to run pre_main without argument in worker thread.
+            (otherwise, it runs in GUI thread)
+        startup_tasks (Tuple[Tuple[str, str, Tuple[str, ...], bool], ...]):
+            The (name, function, names of dependencies, whether to run
+            in worker process) of tasks run in thread pool
+            before main function.
+        min_py_ver (Tuple[int, ...]): The minimum python version.
+        requirements (Tuple[str, ...]): The requirement strings.
+        trace (Union[str, bool, None]):
+            The path of trace file, or whether to write trace file.
+        metrics (bool): Whether to append launch metrics to history.
+        preload (Tuple[str, ...]):
+            The modules imported in thread pool while launching.
+        daemon (bool):
+            Whether to launch via warm launcher daemon. (POSIX only)
+        daemon_idle_timeout (Union[int, float]):
+            The seconds the daemon waits for next launch before exit.
+        import_index (bool):
+            Whether to use cached index of top-level module locations.
+        app_env (bool):
+            Whether to install requirements into per-program environment.
+        update_source (Optional[str]):
+            The directory of wheels or package index URL, which updates
+            are staged from in background. (requires `app_env`)
+        update_interval (Union[int, float]):
+            The minimum seconds between update checks.
+        wheel_dir (Optional[str]):
+            The directory of wheels (relative to the program directory),
+            which requirements are installed from without pip.
+        installer (Optional[str]):
+            The installer backend tried first. (`wheels`, `uv` or `pip`)
+            If None, the fastest one measured is tried first.
+        description (Optional[str]): The description of program.
+        license_summary (Optional[str]): The license summary of program.
+        has_launch_config (bool): Whether `launch.json` is present.
+    """
+    __slots__ = tuple(
+        key for key, _, _ in _LAUNCH_FIELDS + _INFO_FIELDS
+    ) + ('has_launch_config',)
+
+    def __init__(
+        self, launch: Optional[Dict[str, Any]],
+        info: Optional[Dict[str, Any]]
+    ):
+        """Validate & build manifest from parsed JSON files.
+
+        Args:
+            launch (Optional[Dict[str, Any]]):
+                The contents of `launch.json`. (None if not present)
+            info (Optional[Dict[str, Any]]):
+                The contents of `programinfo.json`. (None if not present)
+
+        Raises:
+            ValueError: If the contents are not valid.
+        """
+        self.has_launch_config = launch is not None
+        if launch is not None:
+            for key in _REQUIRED_LAUNCH_KEYS:
+                if key not in launch:
+                    raise ValueError(f'{LAUNCH_FILE}: `{key}` is missing')
+        _fill(self, LAUNCH_FILE, _LAUNCH_FIELDS, launch or {})
+        _fill(self, INFO_FILE, _INFO_FIELDS, info or {})
+
+        if not all(isinstance(part, int) for part in self.min_py_ver):
+            raise ValueError(f'{LAUNCH_FILE}: `min_py_ver` must be integers')
+        self.min_py_ver = tuple(self.min_py_ver)
+        for requirement in self.requirements:
+            if not isinstance(requirement, str):
+                raise ValueError(
+                    f'{LAUNCH_FILE}: `requirements` must be strings'
+                )
+        self.requirements = tuple(self.requirements)
+        if not all(isinstance(module, str) for module in self.preload):
+            raise ValueError(f'{LAUNCH_FILE}: `preload` must be strings')
+        self.preload = tuple(self.preload)
+        self.startup_tasks = _parse_startup_tasks(self.startup_tasks)
+        if self.update_source is not None and not self.app_env:
+            raise ValueError(
+                f'{LAUNCH_FILE}: `update_source` requires `app_env`'
+            )
+        if self.installer is not None \
+                and self.installer not in INSTALLER_NAMES:
+            raise ValueError(
+                f'{LAUNCH_FILE}: `installer` must be one of '
+                + ', '.join(INSTALLER_NAMES)
+            )
+        if isinstance(self.daemon_idle_timeout, bool) \
+                or self.daemon_idle_timeout <= 0:
+            raise ValueError(
+                f'{LAUNCH_FILE}: `daemon_idle_timeout` must be positive'
+            )
+
+    def __repr__(self) -> str:
+        return f'LaunchManifest(program_name={self.program_name!r})'
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, key) for key in self.__slots__)
+
+    @classmethod
+    def _from_values(cls, values: tuple) -> 'LaunchManifest':
+        manifest = cls.__new__(cls)
+        for key, value in zip(cls.__slots__, values):
+            setattr(manifest, key, value)
+        return manifest
+
+    def dumps(self, sources: List[Tuple[str, Optional[int]]] = ()) -> bytes:
+        """Serialize manifest to the compiled (marshal) form.
+
+        Args:
+            sources (List[Tuple[str, Optional[int]]], optional):
+                The (file name, mtime in ns) of source JSON files.
+                If given, compiled manifest is ignored when they are changed.
+
+        Returns:
+            bytes: The compiled manifest.
+        """
+        return marshal.dumps((
+            COMPILED_VERSION, self.__slots__, tuple(sources), self._values()
+        ))
+
+
+def _fill(manifest: LaunchManifest, file_name: str, fields: tuple, data):
+    if not isinstance(data, dict):
+        raise ValueError(f'{file_name}: must be an object')
+    for key, types, default in fields:
+        value = data.get(key, default)
+        if value is not default and not isinstance(value, types):
+            raise ValueError(
+                f'{file_name}: `{key}` must be '
+                + ' or '.join(type_.__name__ for type_ in types)
+            )
+        setattr(manifest, key, value)
+
+
+def _parse_startup_tasks(
+    config: Dict[str, Any]
+) -> Tuple[Tuple[str, str, Tuple[str, ...], bool], ...]:
+    """Validate & normalize launch.json `startup_tasks`.
+
+    Args:
+        config (Dict[str, Any]):
+            The task name -> function name, or object with `func`,
+            `after` (names of dependencies) and `process`.
+            (whether to run in worker process)
+
+    Returns:
+        Tuple[Tuple[str, str, Tuple[str, ...], bool], ...]:
+            The (name, function, names of dependencies,
+            whether to run in worker process) of tasks.
+
+    Raises:
+        ValueError: If the tasks are not valid, or have cyclic dependency.
+    """
+    tasks = []
+    for name, spec in config.items():
+        if isinstance(spec, str):
+            spec = {'func': spec}
+        deps = spec.get('after', []) if isinstance(spec, dict) else None
+        if not isinstance(deps, list) \
+                or not isinstance(spec.get('func'), str) \
+                or not isinstance(spec.get('process', False), bool) \
+                or not all(isinstance(dep, str) for dep in deps):
+            raise ValueError(
+                f'{LAUNCH_FILE}: `startup_tasks.{name}` must be function name'
+                ' or object with `func`, `after` (list of task names)'
+                ' & `process` (bool)'
+            )
+        for dep in deps:
+            if dep not in config:
+                raise ValueError(
+                    f'{LAUNCH_FILE}: `startup_tasks.{name}` is after'
+                    f' unknown task `{dep}`'
+                )
+        tasks.append((
+            name, spec['func'], tuple(dict.fromkeys(deps)),
+            spec.get('process', False)
+        ))
+
+    # Depth-first search for cycle (0: not visited, 1: visiting, 2: done)
+    after = {name: deps for name, _, deps, _ in tasks}
+    states = dict.fromkeys(after, 0)
+
+    def visit(name: str, path: Tuple[str, ...]):
+        if states[name] == 1:
+            cycle = ' -> '.join(path[path.index(name):] + (name,))
+            raise ValueError(
+                f'{LAUNCH_FILE}: `startup_tasks` has cycle ({cycle})'
+            )
+        if states[name] == 0:
+            states[name] = 1
+            for dep in after[name]:
+                visit(dep, path + (name,))
+            states[name] = 2
+
+    for name in after:
+        visit(name, ())
+    return tuple(tasks)
+
+
+def _source_mtimes() -> List[Tuple[str, Optional[int]]]:
+    sources = []
+    for name in (LAUNCH_FILE, INFO_FILE):
+        path = find_file(name, search_parent=True)
+        sources.append((
+            name, None if path is None else os.stat(path).st_mtime_ns
+        ))
+    return sources
+
+
+def _load_compiled() -> Optional[LaunchManifest]:
+    """Load compiled manifest, if it is present and up to date.
+
+    Returns:
+        Optional[LaunchManifest]: The loaded manifest or None.
+    """
+    raw = read_bytes(COMPILED_FILE)
+    if raw is None:
+        return None
+    try:
+        version, slots, sources, values = marshal.loads(raw)
+    except (EOFError, ValueError, TypeError):
+        return None
+    if version != COMPILED_VERSION or slots != LaunchManifest.__slots__:
+        return None
+    # Sources in program directory can be edited after compile.
+    if not universal_constants.IS_ZIPFILE and sources \
+            and list(sources) != _source_mtimes():
+        return None
+    return LaunchManifest._from_values(values)  # pylint: disable = W0212
+
+
+def load_manifest() -> LaunchManifest:
+    """Load manifest from files. (not cached)
+
+    Returns:
+        LaunchManifest: The loaded manifest.
+    """
+    manifest = _load_compiled()
+    if manifest is not None:
+        return manifest
+    return LaunchManifest(
+        read_json(LAUNCH_FILE, search_parent=True),
+        read_json(INFO_FILE, search_parent=True)
+    )
+
+
+def get_manifest() -> LaunchManifest:
+    """Get the shared manifest. It is loaded on first call.
+
+    Returns:
+        LaunchManifest: The manifest.
+
+    Raises:
+        ValueError: If the contents are not valid.
+    """
+    global _manifest  # pylint: disable = global-statement
+    if _manifest is None:
+        with _lock:
+            if _manifest is None:
+                _manifest = load_manifest()
+    return _manifest
+
+
+def compile_manifest(output_path: str, check_sources: bool = True):
+    """Precompile manifest of the program into marshal blob.
+
+    Args:
+        output_path (str): The path of compiled file to write.
+        check_sources (bool, optional):
+            If True, the compiled manifest is ignored
+            when source JSON files are changed (in program directory).
+            Default is True.
+    """
+    manifest = LaunchManifest(
+        read_json(LAUNCH_FILE, search_parent=True),
+        read_json(INFO_FILE, search_parent=True)
+    )
+    sources = _source_mtimes() \
+        if check_sources and not universal_constants.IS_ZIPFILE else ()
+    with open(output_path, 'wb') as file:
+        file.write(manifest.dumps(sources))
@@ -0,0 +1,203 @@
+"""Rolling history of launch metrics.
+
+Each launch appends a compact JSON line (phase durations, install,
+package count, layout, import time of preloaded modules) to a log under
+`DATADIR`. The log is rotated
+by size, so it never grows unbounded.
+`python -m universal_main stats` summarizes the history.
+"""
+
+import os
+import json
+import time
+import platform
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .universal_constants import DATADIR
+from . import tracing, universal_constants
+
+
+METRICS_DIR = DATADIR + 'universal_main/metrics/'
+METRICS_FILE = METRICS_DIR + 'launches.jsonl'
+MAX_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+TOTAL = 'total'
+# Prefix of summarized phases from import time of preloaded modules
+PRELOAD_PREFIX = 'preload/'
+
+_app_name = None
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Get percentile with nearest-rank method.
+
+    Args:
+        values (List[float]): The values.
+        percent (float): The percentile. (0 ~ 100)
+
+    Returns:
+        float: The percentile value.
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def configure(app_name: str, enabled: bool = True):
+    """Enable recording launches of the program.
+
+    Args:
+        app_name (str): The name of program.
+        enabled (bool, optional): Whether to record. Default is True.
+    """
+    global _app_name  # pylint: disable = global-statement
+    _app_name = app_name if enabled else None
+
+
+def _rotate(path: str, backup_count: int):
+    """Rotate log files. (`file` -> `file.1` -> ... `file.N`)"""
+    for num in range(backup_count - 1, 0, -1):
+        try:
+            os.replace(f'{path}.{num}', f'{path}.{num + 1}')
+        except FileNotFoundError:
+            pass
+    os.replace(path, f'{path}.1')
+
+
+def append(record: dict, path: str = METRICS_FILE):
+    """Append a record to the log, and rotate it if it is too large.
+
+    Args:
+        record (dict): The record.
+        path (str, optional): The log file. Default is `METRICS_FILE`.
+    """
+    line = json.dumps(record, separators=(',', ':')) + '\n'
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One write in append mode, so concurrent launches never mix lines.
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(line)
+            size = file.tell()
+        if size > MAX_BYTES:
+            _rotate(path, BACKUP_COUNT)
+    except OSError:  # Metrics are optional
+        pass
+
+
+def record_launch(
+    packages: int, main_module: Optional[str] = None,
+    preload_ms: Optional[Dict[str, float]] = None
+):
+    """Record the launch, with phases traced until now.
+
+    Nothing is recorded if not configured.
+
+    Args:
+        packages (int): The count of requirements.
+        main_module (str, optional): The module that main function exists.
+        preload_ms (Dict[str, float], optional):
+            The module name -> import time in milliseconds, of preloaded
+            modules. (See `preload.Preloader.timings`)
+    """
+    if _app_name is None:
+        return
+    phases = tracing.durations()
+    append({
+        'ts': round(time.time(), 3),
+        'app': _app_name,
+        'main_module': main_module,
+        'mode': 'zipapp' if universal_constants.IS_ZIPFILE else 'directory',
+        'python': platform.python_version(),
+        'total_ms': round(tracing.elapsed() * 1000, 3),
+        'phases': {name: round(ms, 3) for name, ms in phases.items()},
+        'installed': 'install' in phases,
+        'packages': packages,
+        'preload_ms': dict(preload_ms or {}),
+    })
+
+
+def read_records(path: str = METRICS_FILE) -> Iterator[dict]:
+    """Read records, from oldest one. (rotated files are included)
+
+    Args:
+        path (str, optional): The log file. Default is `METRICS_FILE`.
+
+    Yields:
+        dict: The record. Broken lines are skipped.
+    """
+    for num in range(BACKUP_COUNT, -1, -1):
+        try:
+            file = open(  # pylint: disable = consider-using-with
+                f'{path}.{num}' if num else path, 'r', encoding='utf-8'
+            )
+        except OSError:
+            continue
+        with file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:  # Partially written line
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+
+def summarize(
+    records: Iterable[dict], since: Optional[float] = None,
+    app: Optional[str] = None, daily: bool = False
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Summarize startup time per program & phase.
+
+    Args:
+        records (Iterable[dict]): The records.
+        since (float, optional): Only records after this. (unix time)
+        app (str, optional): Only records of this program.
+        daily (bool, optional):
+            Whether to group by date too. (key: `<app> <YYYY-MM-DD>`)
+
+    Returns:
+        Dict[str, Dict[str, Dict[str, float]]]:
+            The group -> phase (`total` for whole startup,
+            `preload/<module>` for import time of preloaded module)
+            -> statistics (`count`, `p50_ms`, `p95_ms`, `p99_ms`).
+    """
+    samples = {}
+    for record in records:
+        try:
+            timestamp = float(record['ts'])
+            name = str(record['app'])
+            values = {
+                str(phase): float(value)
+                for phase, value in dict(record.get('phases') or {}).items()
+            }
+            values.update(
+                (PRELOAD_PREFIX + str(module), float(value))
+                for module, value
+                in dict(record.get('preload_ms') or {}).items()
+            )
+            values[TOTAL] = float(record['total_ms'])
+        except (KeyError, TypeError, ValueError):  # Broken record
+            continue
+        if (since is not None and timestamp < since) \
+                or (app is not None and name != app):
+            continue
+        if daily:
+            name += time.strftime(' %Y-%m-%d', time.localtime(timestamp))
+        group = samples.setdefault(name, {})
+        for phase, value in values.items():
+            group.setdefault(phase, []).append(value)
+
+    return {
+        name: {
+            phase: {
+                'count': len(values),
+                'p50_ms': round(percentile(values, 50), 3),
+                'p95_ms': round(percentile(values, 95), 3),
+                'p99_ms': round(percentile(values, 99), 3),
+            }
+            for phase, values in sorted(
+                group.items(), key=lambda item: (item[0] != TOTAL, item[0])
+            )
+        }
+        for name, group in sorted(samples.items())
+    }
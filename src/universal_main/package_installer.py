@@ -1,8 +1,11 @@
 import os
+import re
 import sys
 import time
+import queue
 import locale
 import platform
+import threading
 import subprocess
 import importlib.util
 
@@ -45,13 +48,145 @@ else:
 IS_WINDOWS = sys.platform == 'win32'
 ENCODING = locale.getpreferredencoding()
 
+# Return code if the user declined install (pip & uv do not use it)
+# (same as `CANCELED` of installers)
+CANCELED = 10
+
+SPINNER = ('\\', '|', '/', '-')
+_SIZE_UNITS = {
+    'b': 1, 'kb': 1000, 'mb': 1000 ** 2, 'gb': 1000 ** 3,
+    'kib': 1024, 'mib': 1024 ** 2, 'gib': 1024 ** 3
+}
+_COLLECTING_RE = re.compile(r'^\s*Collecting (\S+)')
+_DOWNLOADING_RE = re.compile(
+    r'^\s*(Downloading|Using cached) (\S+)(?: \(([\d.]+) ?([kMG]i?B)\))?'
+)
+_INSTALLING_RE = re.compile(r'^\s*Installing collected packages: (.+)')
+_DONE_RE = re.compile(r'^\s*Successfully installed (.+)')
+# Output of `uv pip install`
+_UV_RESOLVED_RE = re.compile(r'^\s*Resolved (\d+) packages?')
+_UV_INSTALLED_RE = re.compile(r'^\s*\+ (\S+)')
+
+
+def _parse_size(number: str, unit: str) -> int:
+    return int(float(number) * _SIZE_UNITS.get(unit.lower(), 1))
+
+
+def _format_size(size: int) -> str:
+    for unit in ('GB', 'MB', 'kB'):
+        if size >= _SIZE_UNITS[unit.lower()]:
+            return f'{size / _SIZE_UNITS[unit.lower()]:.1f} {unit}'
+    return f'{size} B'
+
+
+class PipProgress:
+    """Progress of pip (or uv), parsed from its output lines."""
+
+    def __init__(self):
+        self.phase = 'Starting'
+        self.current = ''
+        self.resolved = 0
+        self.collected = []
+        self.downloaded_files = 0
+        self.downloaded_bytes = 0
+        self.to_install = []
+        self.errors = []
+
+    def feed(self, line):
+        """Update progress with an output line of pip.
+
+        Returns:
+            bool: If progress is changed, return True.
+        """
+        match = _COLLECTING_RE.match(line)
+        if match:
+            self.phase = 'Collecting'
+            self.current = match[1]
+            self.collected.append(match[1])
+            return True
+
+        match = _DOWNLOADING_RE.match(line)
+        if match:
+            self.phase = 'Downloading'
+            self.current = match[2].rsplit('/', 1)[-1]
+            self.downloaded_files += 1
+            if match[3]:
+                self.downloaded_bytes += _parse_size(match[3], match[4])
+            return True
+
+        match = _INSTALLING_RE.match(line)
+        if match:
+            self.phase = 'Installing'
+            self.to_install = [
+                name.strip() for name in match[1].split(',')
+            ]
+            self.current = ', '.join(self.to_install)
+            return True
+
+        match = _DONE_RE.match(line)
+        if match:
+            self.phase = 'Installed'
+            self.current = match[1]
+            return True
+
+        match = _UV_RESOLVED_RE.match(line)
+        if match:
+            self.phase = 'Resolved'
+            self.resolved = int(match[1])
+            return True
+
+        match = _UV_INSTALLED_RE.match(line)
+        if match:
+            self.phase = 'Installed'
+            self.to_install.append(match[1])
+            self.current = ', '.join(self.to_install)
+            return True
+
+        if line.startswith(('ERROR', 'error:')):
+            self.errors.append(line.strip())
+            return True
+        return False
+
+    def lines(self):
+        """Get lines to display.
+
+        Returns:
+            List[str]: The lines.
+        """
+        if self.phase == 'Resolved':
+            detail = f'{self.resolved} package(s) resolved'
+        elif self.phase == 'Collecting':
+            detail = f'{len(self.collected)} package(s) collected'
+        elif self.phase == 'Downloading':
+            detail = (
+                f'{self.downloaded_files} file(s), '
+                + _format_size(self.downloaded_bytes)
+            )
+        elif self.phase in ('Installing', 'Installed'):
+            detail = f'{len(self.to_install)} package(s)'
+        else:
+            detail = ''
+        return [
+            f'{self.phase}: {detail}',
+            self.current,
+            self.errors[-1] if self.errors else '',
+        ]
+
 
 class Installer:
-    def __init__(self, to_install):
+    def __init__(
+        self, to_install, target=None, wheelhouse=None, uv=None,
+        time_file=None
+    ):
         self.__to_install = to_install
+        self.__target = target
+        self.__wheelhouse = wheelhouse
+        self.__uv = uv
+        self.__time_file = time_file
         self.__pg_status = 0
-        self.__is_running = lambda: False
-        self.__install_output = None
+        self.__progress = PipProgress()
+        self.__output = []
+        self.__canceled = True
 
     def run(self):
         try:
@@ -69,12 +204,9 @@ class Installer:
             curses.endwin()
 
             if DEBUG:
-                if self.__install_output:
-                    print('stdout')
-                    print(self.__install_output.stdout.read())
-                    print()
-                    print('stderr')
-                    print(self.__install_output.stderr.read())
+                if not self.__canceled:
+                    print('output')
+                    print(''.join(self.__output))
                     input('Press ENTER to exit')
                 else:
                     print('Install is canceled')
@@ -101,47 +233,108 @@ class Installer:
         key = self.__screen.getkey()
         while True:
             if key == 'y':
-                self.__install()
-                while self.__is_running():
-                    self.__progress()
-                    time.sleep(0.25)
-                self.__is_running = lambda: False
-                return 0
+                self.__canceled = False
+                start = time.perf_counter()
+                return_code = self.__install()
+                if return_code == 0 and self.__time_file:
+                    self.__write_time(time.perf_counter() - start)
+                if return_code != 0:
+                    self.__show_line(-2, 'Install failed. Press any key.')
+                    self.__screen.getkey()
+                return return_code
             elif key == 'n':
-                return 1
+                return CANCELED
             else:
                 self.__screen.addstr(7, 2, 'Wrong input            ')
                 self.__screen.addstr(8, 2, 'Install packages? (y/n)')
                 key = self.__screen.getkey()
 
-    def __progress(self):
-        height, _ = self.__screen.getmaxyx()
+    def __write_time(self, seconds):
+        """Write seconds taken to install (without prompt) for launcher."""
+        try:
+            with open(self.__time_file, 'w', encoding='utf-8') as file:
+                file.write(repr(seconds))
+        except OSError:
+            pass
+
+    def __show_line(self, row, text):
+        height, width = self.__screen.getmaxyx()
+        if row < 0:
+            row += height
+        self.__screen.addstr(row, 2, text[:max(width - 4, 0)])
+        self.__screen.clrtoeol()
+
+    def __draw(self):
+        for row, text in enumerate(self.__progress.lines(), start=-5):
+            self.__show_line(row, text)
         self.__pg_status = (
             0 if self.__pg_status == 3 else self.__pg_status + 1
         )
-        self.__screen.addstr(
-            height - 2, 2,
-            'Installing ' + ('\\', '|', '/', '-')[self.__pg_status]
-        )
+        self.__show_line(-2, 'Installing ' + SPINNER[self.__pg_status])
         self.__screen.refresh()
 
     def __install(self):
-        if IS_WINDOWS:
-            popen = subprocess.Popen(
-                [sys.executable, '-m', 'pip', 'install', *self.__to_install],
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                creationflags=subprocess.CREATE_NO_WINDOW, encoding=ENCODING
-            )
-        else:
-            popen = subprocess.Popen(
-                [sys.executable, '-m', 'pip', 'install', *self.__to_install],
-                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                encoding=ENCODING
+        """Run pip. With wheelhouse, try it offline first.
+
+        Returns:
+            int: The return code of (last) pip.
+        """
+        if not self.__wheelhouse:
+            return self.__run_pip([])
+        find_links = ['--find-links', self.__wheelhouse]
+        return_code = self.__run_pip(['--no-index', *find_links])
+        if return_code != 0:  # Not all in wheelhouse: use index too
+            self.__progress = PipProgress()
+            return_code = self.__run_pip(find_links)
+        return return_code
+
+    def __run_pip(self, options):
+        """Run pip (or uv), and redraw progress whenever it writes output.
+
+        Returns:
+            int: The return code of pip.
+        """
+        env = dict(os.environ, PYTHONUNBUFFERED='1')
+        kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} \
+            if IS_WINDOWS else {}
+        target = ['--target', self.__target] if self.__target else []
+        pip = [self.__uv, 'pip', 'install', '--python', sys.executable] \
+            if self.__uv else [sys.executable, '-m', 'pip', 'install']
+        popen = subprocess.Popen(
+            [*pip, *target, *options, *self.__to_install],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            encoding=ENCODING, errors='replace', env=env, **kwargs
+        )
+
+        # Pipes are read by threads, so full pipe never blocks pip.
+        lines = queue.Queue()
+        readers = [
+            threading.Thread(
+                target=self.__read_stream, args=(stream, lines), daemon=True
             )
-        if DEBUG:
-            # pylint: disable=attribute-defined-outside-init
-            self.__install_output = popen
-        self.__is_running = lambda: popen.poll() is None
+            for stream in (popen.stdout, popen.stderr)
+        ]
+        for reader in readers:
+            reader.start()
+
+        self.__draw()
+        running = len(readers)
+        while running:
+            line = lines.get()
+            if line is None:
+                running -= 1
+                continue
+            self.__output.append(line)
+            if self.__progress.feed(line):
+                self.__draw()
+        return popen.wait()
+
+    @staticmethod
+    def __read_stream(stream, lines):
+        with stream:
+            for line in stream:
+                lines.put(line)
+        lines.put(None)
 
     def __split_text(self, to_install, width):
         width -= 5
@@ -165,5 +358,18 @@ if __name__ == '__main__':
         while '-d' in sys.argv:
             sys.argv.remove('-d')
 
-    installer = Installer(sys.argv[1:])
+    OPTIONS = {
+        '--target': None, '--wheelhouse': None, '--uv': None,
+        '--time-file': None
+    }
+    for option in OPTIONS:
+        if option in sys.argv:
+            index = sys.argv.index(option)
+            OPTIONS[option] = sys.argv[index + 1]
+            del sys.argv[index:index + 2]
+
+    installer = Installer(
+        sys.argv[1:], OPTIONS['--target'], OPTIONS['--wheelhouse'],
+        OPTIONS['--uv'], OPTIONS['--time-file']
+    )
     sys.exit(installer.run())
@@ -0,0 +1,88 @@
+"""Parallel import warm-up of heavy modules.
+
+Modules listed in launch.json `preload` are imported in a thread pool,
+while the launcher checks requirements and shows splash.
+Import is mostly file I/O, so it overlaps with other work.
+"""
+
+import time
+import threading
+from importlib import import_module
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+from . import tracing
+
+
+MAX_WORKERS = 8
+
+
+class Preloader:
+    """Import modules in a thread pool.
+
+    Attributes:
+        timings (Dict[str, float]):
+            The module name -> import time in milliseconds.
+        errors (Dict[str, str]):
+            The module name -> error message, of failed imports.
+    """
+
+    def __init__(self, modules: Iterable[str], max_workers: int = MAX_WORKERS):
+        """Start importing modules.
+
+        Args:
+            modules (Iterable[str]): The module names to import.
+            max_workers (int, optional):
+                The maximum count of threads. Default is `MAX_WORKERS`.
+        """
+        self.__modules = list(dict.fromkeys(modules))
+        self.__lock = threading.Lock()
+        self.timings = {}
+        self.errors = {}
+        self.__executor = None
+        if self.__modules:
+            self.__executor = ThreadPoolExecutor(
+                min(len(self.__modules), max_workers),
+                thread_name_prefix='universal_main-preload'
+            )
+            for module in self.__modules:
+                self.__executor.submit(self.__import, module)
+
+    def __import(self, module_name: str):
+        start = time.perf_counter()
+        with tracing.phase('preload', module=module_name) as trace_args:
+            try:
+                import_module(module_name)
+            except Exception as exc:  # pylint: disable = broad-except
+                # Not installed yet, or broken: imported normally later.
+                error = f'{type(exc).__name__}: {exc}'
+                trace_args['error'] = error
+                with self.__lock:
+                    self.errors[module_name] = error
+        with self.__lock:
+            self.timings[module_name] = round(
+                (time.perf_counter() - start) * 1000, 3
+            )
+
+    def wait(self) -> Dict[str, float]:
+        """Wait all imports.
+
+        Returns:
+            Dict[str, float]:
+                The module name -> import time in milliseconds.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+        return self.timings
+
+
+def start_preload(modules: Optional[Iterable[str]]) -> Preloader:
+    """Start importing modules in background.
+
+    Args:
+        modules (Optional[Iterable[str]]): The module names to import.
+
+    Returns:
+        Preloader: The started preloader.
+    """
+    return Preloader(modules or ())
@@ -0,0 +1,170 @@
+"""Run CPU-heavy startup functions in worker processes.
+
+If `pre_main_process` (or `process` of a startup task) is set in
+launch.json, the function runs in a process pool, so it does not hold
+the GIL of the launcher (splash, imports & other tasks) and uses other
+cores. (up to `CPU_CNT` processes)
+
+Functions are called in a fresh interpreter (`spawn`, also on POSIX:
+forking a launcher which runs threads is not safe), so functions must
+be module-level, and arguments & results must be picklable.
+Large results are not pickled: bytes-like objects & NumPy arrays are
+written to a memory-backed file once, and mapped by the launcher.
+(zero copy on the receiving side) Then the result is `memoryview` of
+the mapping (for bytes-like objects), or NumPy array backed by it.
+Such a result passed to another process function (ex: dependency of
+process task) is copied to `bytes`, since `memoryview` is not picklable.
+"""
+
+import os
+import mmap
+import threading
+from collections import namedtuple
+from typing import Any, Optional
+
+from .universal_constants import IS_WINDOWS
+from . import universal_constants
+
+
+# Smaller results are pickled (mapping has fixed cost)
+MIN_SHARED_BYTES = 64 * 1024
+# Memory-backed directory, if any. (page cache otherwise)
+SHM_DIR = '/dev/shm'
+
+# The result written to memory-backed file
+_Shared = namedtuple('_Shared', 'path size kind meta')
+
+_lock = threading.Lock()
+_executor = None
+
+
+def _shared_dir() -> Optional[str]:
+    if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+        return SHM_DIR
+    return None  # Default temporary directory
+
+
+def _buffer_of(value) -> Optional[tuple]:
+    """Get (bytes view, kind, meta) of large result, or None to pickle."""
+    try:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            view = memoryview(value).cast('B')
+            kind, meta = 'bytes', None
+        elif type(value).__module__ == 'numpy' \
+                and type(value).__name__ == 'ndarray':
+            if value.dtype.hasobject or not value.flags.c_contiguous:
+                return None
+            view = memoryview(value).cast('B')
+            kind, meta = 'ndarray', (value.dtype.str, value.shape)
+        else:
+            return None
+    except (TypeError, ValueError, BufferError):  # Not supported buffer
+        return None
+    if view.nbytes < MIN_SHARED_BYTES:
+        return None
+    return view, kind, meta
+
+
+def _share(value) -> Any:
+    """Write large result to memory-backed file. (worker process)"""
+    buffer = _buffer_of(value)
+    if buffer is None:
+        return value
+    view, kind, meta = buffer
+    import tempfile  # pylint: disable = import-outside-toplevel
+    fd, path = tempfile.mkstemp(prefix='universal_main-', dir=_shared_dir())
+    try:
+        with open(fd, 'wb') as file:
+            file.write(view)
+    except BaseException:
+        os.remove(path)
+        raise
+    return _Shared(path, view.nbytes, kind, meta)
+
+
+def _attach(shared: _Shared) -> Any:
+    """Map memory-backed file written by worker, and remove it."""
+    # File is deleted on close on Windows (mapping keeps a handle)
+    flags = os.O_RDWR | getattr(os, 'O_BINARY', 0) \
+        | getattr(os, 'O_TEMPORARY', 0)
+    try:
+        fd = os.open(shared.path, flags)
+        try:
+            mapping = mmap.mmap(fd, shared.size)
+        finally:
+            os.close(fd)
+    finally:
+        if not IS_WINDOWS:  # Mapping stays valid
+            os.remove(shared.path)
+    if shared.kind == 'ndarray':
+        import numpy  # pylint: disable = import-outside-toplevel
+        dtype, shape = shared.meta
+        return numpy.frombuffer(mapping, dtype=dtype).reshape(shape)
+    return memoryview(mapping)
+
+
+def _picklable(value) -> Any:
+    """Copy `memoryview` (also in dict values) to bytes for pickling."""
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    if isinstance(value, dict):
+        return {key: _picklable(item) for key, item in value.items()}
+    return value
+
+
+def _run(func, args: tuple) -> Any:
+    """Call the function. (worker process)"""
+    return _share(func(*args))
+
+
+def _get_executor():
+    """Get process pool. (multiprocessing is imported only if used)"""
+    # pylint: disable = global-statement
+    # pylint: disable = import-outside-toplevel
+    global _executor
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with _lock:
+        if _executor is None:
+            # Processes are started on demand (Python >= 3.9)
+            _executor = ProcessPoolExecutor(
+                universal_constants.CPU_CNT,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def call_in_process(func, *args) -> Any:
+    """Call function in worker process, and wait the result.
+
+    Args:
+        func (Callable): The module-level function.
+        *args: The arguments of the function. (must be picklable,
+            except `memoryview` which is copied to bytes)
+
+    Returns:
+        Any: The return value of the function.
+            (large bytes-like object or NumPy array is shared, see module
+            docstring)
+
+    Raises:
+        Exception: The exception raised by the function.
+    """
+    args = tuple(_picklable(arg) for arg in args)
+    result = _get_executor().submit(_run, func, args).result()
+    if isinstance(result, _Shared):
+        return _attach(result)
+    return result
+
+
+def shutdown():
+    """Stop worker processes. (without waiting them)
+
+    Call this when startup work is done. The pool is created again
+    if `call_in_process` is called after this.
+    """
+    global _executor  # pylint: disable = global-statement
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False)
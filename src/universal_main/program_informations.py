@@ -1,55 +1,15 @@
 """Get license, open source notice etc."""
 
-import os
-import json
-import zipfile
 from typing import Union
 
-from .universal_constants import IS_ZIPFILE, ZIPAPP_FILE, PROGRAM_DIR
+from .resources import read_bytes, read_text
+from .manifest import get_manifest
 
 
 QPixmap = None
 QIcon = None
 
 
-def _read_file_on_root(relpath: str, encoding: str = 'utf-8')\
-        -> Union[str, None]:
-    """Read file, stored in program directory or zipfile.
-
-    Args:
-        relpath:
-            (If not zipapp) Path of file, relative to program root.
-            (If zipapp) Path of file in zipapp archive.
-        encoding: The encoding of the file to read.
-    """
-    if IS_ZIPFILE:
-        try:
-            with zipfile.ZipFile(ZIPAPP_FILE, 'r') as zipapp:
-                raw = zipapp.read(relpath)
-        except KeyError:
-            return None
-        else:
-            return raw.decode(encoding)
-    else:
-        try:
-            with open(PROGRAM_DIR + relpath, 'r', encoding=encoding) as file:
-                contents = file.read()
-        except FileNotFoundError:
-            pass
-        else:
-            return contents
-
-        try:
-            with open(
-                PROGRAM_DIR + '../' + relpath, 'r', encoding=encoding
-            ) as file:
-                contents = file.read()
-        except FileNotFoundError:
-            return None
-        else:
-            return contents
-
-
 def get_license() -> Union[str, None]:
     """Get license of program.
     It must present on file `LICENSE` (relative to program directory).
@@ -59,7 +19,7 @@ def get_license() -> Union[str, None]:
             If file LICENSE is present, return the contents.
             Otherwise, return None.
     """
-    return _read_file_on_root('LICENSE')
+    return read_text('LICENSE', search_parent=True)
 
 
 def get_opensource_notice() -> Union[str, None]:
@@ -71,7 +31,7 @@ def get_opensource_notice() -> Union[str, None]:
             If file NOTICE is present, return the contents.
             Otherwise, return None.
     """
-    return _read_file_on_root('NOTICE')
+    return read_text('NOTICE', search_parent=True)
 
 
 def get_name() -> Union[str, None]:
@@ -84,10 +44,7 @@ def get_name() -> Union[str, None]:
             If the information is present, return the contents.
             Otherwise, return None.
     """
-    info_contents = _read_file_on_root('launch.json')
-    if info_contents is None:
-        return None
-    return json.loads(info_contents)['program_name']
+    return get_manifest().program_name
 
 
 def get_description() -> Union[str, None]:
@@ -100,10 +57,7 @@ def get_description() -> Union[str, None]:
             If the information is present, return the contents.
             Otherwise, return None.
     """
-    info_contents = _read_file_on_root('programinfo.json')
-    if info_contents is None:
-        return None
-    return json.loads(info_contents)['description']
+    return get_manifest().description
 
 
 def get_license_summary() -> Union[str, None]:
@@ -116,10 +70,7 @@ def get_license_summary() -> Union[str, None]:
             If the information is present, return the contents.
             Otherwise, return None.
     """
-    info_contents = _read_file_on_root('programinfo.json')
-    if info_contents is None:
-        return None
-    return json.loads(info_contents)['license_summary']
+    return get_manifest().license_summary
 
 
 def get_icon() -> Union['QIcon', None]:
@@ -139,25 +90,12 @@ def get_icon() -> Union['QIcon', None]:
         except ImportError:
             return None
 
-    if IS_ZIPFILE:
-        with zipfile.ZipFile(ZIPAPP_FILE) as main_zip:
-            names = main_zip.namelist()
-            if 'logo.png' in names:
-                data = main_zip.read('logo.png')
-            elif 'logo.jpg' in names:
-                data = main_zip.read('logo.jpg')
-            else:
-                return None
+    for name in ('logo.png', 'logo.jpg'):
+        data = read_bytes(name)
+        if data is not None:
+            break
     else:
-        names = os.listdir(PROGRAM_DIR)
-        if 'logo.png' in names:
-            with open(PROGRAM_DIR + 'logo.png', 'rb') as file:
-                data = file.read()
-        elif 'logo.jpg' in names:
-            with open(PROGRAM_DIR + 'logo.jpg', 'rb') as file:
-                data = file.read()
-        else:
-            return None
+        return None
 
     pixmap = QPixmap()
     pixmap.loadFromData(data)
@@ -0,0 +1,236 @@
+"""Bulk provisioning of many programs.
+
+Requirements of all programs are merged & deduplicated, and missing
+ones are installed by one installer run per target environment:
+one for site-packages of the interpreter, and one for each program with
+`app_env`. Programs have own environments so they can pin conflicting
+versions, which one resolver pass cannot satisfy. So they are not
+batched; distributions installed for an earlier program are linked
+from the shared store instead of installed again. (See `app_env`)
+Then launch caches (and bytecode caches of program directories)
+are filled, so every program starts warm on first launch.
+
+Run this with the interpreter which runs the programs.
+Requirements are checked & installed on the import paths the programs
+get when launched, which are read from a fresh interpreter. (so paths
+added to this process are not used)
+"""
+
+import os
+import sys
+import json
+import site
+import zipfile
+import compileall
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .manifest import LAUNCH_FILE, LaunchManifest
+from .requirement_checker import check_to_install
+from . import app_env, installers, launch_cache
+
+
+# Prints (whether program is not added to sys.path, sys.path after it)
+_PATHS_CODE = (
+    'import sys, json\n'
+    'safe = bool(getattr(sys.flags, "safe_path", False))\n'
+    'print(json.dumps([safe, sys.path if safe else sys.path[1:]]))\n'
+)
+
+_launch_paths = None
+
+
+def launch_paths() -> Tuple[bool, List[str]]:
+    """Get import paths of a launch, except the program itself.
+
+    They are read from a fresh interpreter (once), with the environment
+    of this process.
+
+    Returns:
+        Tuple[bool, List[str]]: Whether the program is not added to
+            `sys.path` (`-P`, `PYTHONSAFEPATH`), and the import paths.
+    """
+    global _launch_paths  # pylint: disable = global-statement
+    if _launch_paths is None:
+        output = subprocess.run(
+            [sys.executable, '-c', _PATHS_CODE],
+            stdout=subprocess.PIPE, check=True
+        ).stdout
+        safe, paths = json.loads(output)
+        _launch_paths = (safe, paths)
+    return _launch_paths
+
+
+class Program:
+    """A program to provision.
+
+    Attributes:
+        path (str): The program directory or zipapp.
+        manifest (LaunchManifest): The manifest of program.
+        site_dir (Optional[str]):
+            The site directory of program environment.
+            (None if `app_env` is false)
+    """
+
+    def __init__(self, path: str):
+        """Read `launch.json` of the program.
+
+        Args:
+            path (str): The program directory or zipapp.
+
+        Raises:
+            FileNotFoundError: If `launch.json` is not found.
+            ValueError: If `launch.json` is not valid.
+        """
+        self.path = os.path.abspath(path)
+        if os.path.isdir(path):
+            with open(
+                os.path.join(path, LAUNCH_FILE), 'r', encoding='utf-8'
+            ) as file:
+                launch = json.load(file)
+        else:
+            with zipfile.ZipFile(path) as archive:
+                try:
+                    launch = json.loads(archive.read(LAUNCH_FILE))
+                except KeyError:
+                    raise FileNotFoundError(
+                        f'{LAUNCH_FILE} is not found in {path}'
+                    ) from None
+        self.manifest = LaunchManifest(launch, None)
+        self.site_dir = app_env.site_dir(self.manifest.program_name) \
+            if self.manifest.app_env else None
+
+    def env_paths(self) -> List[str]:
+        """Get import paths of the program environment, when launched.
+
+        Returns:
+            List[str]: The import paths, except the program itself.
+        """
+        paths = list(launch_paths()[1])
+        if self.site_dir is not None:
+            paths.insert(0, self.site_dir)
+            if os.path.isdir(self.site_dir):
+                with _import_paths(paths):
+                    # Process `.pth` files, like `app_env.activate`
+                    site.addsitedir(self.site_dir)
+                    paths = sys.path[:]
+        return paths
+
+    def sys_path(self) -> List[str]:
+        """Get `sys.path` of the program, when it is launched.
+
+        Returns:
+            List[str]: The import paths.
+        """
+        safe, _ = launch_paths()
+        return ([] if safe else [self.path]) + self.env_paths()
+
+
+@contextmanager
+def _import_paths(paths: List[str]) -> Iterator[None]:
+    """Replace `sys.path` temporarily."""
+    original = sys.path[:]
+    sys.path[:] = paths
+    try:
+        yield
+    finally:
+        sys.path[:] = original
+
+
+def merge_requirements(programs: List[Program]) -> List[str]:
+    """Merge & deduplicate requirements of programs.
+
+    Requirement strings are kept (pip combines specifiers of same name).
+
+    Args:
+        programs (List[Program]): The programs.
+
+    Returns:
+        List[str]: The deduplicated requirement strings, in input order.
+    """
+    merged = {}
+    for program in programs:
+        for raw in program.manifest.requirements:
+            merged.setdefault(' '.join(raw.split()), raw)
+    return list(merged.values())
+
+
+def _install(to_install: List[str], target: Optional[str] = None) -> int:
+    """Install non-interactively. (output goes to stderr)"""
+    return installers.install(to_install, target, interactive=False)
+
+
+def provision(paths: List[str], dry_run: bool = False) -> Dict:
+    """Install requirements of programs, and fill their launch caches.
+
+    Args:
+        paths (List[str]): The program directories or zipapps.
+        dry_run (bool, optional): If True, nothing is installed.
+
+    Returns:
+        Dict: The machine-readable result:
+            `programs` (path, program name, target, missing requirements
+            and whether launch cache is filled), `installs` (target,
+            requirements and return code of each installer run),
+            and `ok`. (whether all programs are satisfied)
+    """
+    programs = [Program(path) for path in paths]
+
+    # Group by target environment. (None: site-packages of interpreter)
+    groups = {}
+    for program in programs:
+        groups.setdefault(program.site_dir, []).append(program)
+
+    installs = []
+    for site_dir, members in groups.items():
+        missing = []
+        for program in members:
+            with _import_paths(program.sys_path()):
+                missing += check_to_install(program.manifest.requirements)
+        missing = list(dict.fromkeys(' '.join(raw.split()) for raw in missing))
+        if not missing or dry_run:
+            continue
+        # Shared by programs of the group. (so without program itself)
+        with _import_paths(members[0].env_paths()):
+            if site_dir is None:
+                return_code = _install(missing)
+            else:
+                return_code = app_env.install(missing, _install, site_dir)
+        installs.append({
+            'target': site_dir or 'interpreter',
+            'requirements': missing,
+            'returncode': return_code,
+        })
+    if not dry_run and any(site_dir is not None for site_dir in groups):
+        # Not on launch path. (installs check replaced files only)
+        app_env.cleanup_store()
+
+    results = []
+    for program in programs:
+        if not dry_run:
+            # Created at launch otherwise, which changes mtime of
+            # directories in launch cache.
+            if program.site_dir is not None:
+                os.makedirs(program.site_dir, exist_ok=True)
+            if os.path.isdir(program.path):  # Bytecode cache
+                compileall.compile_dir(program.path, quiet=1)
+        with _import_paths(program.sys_path()):
+            requirements = list(program.manifest.requirements)
+            missing = check_to_install(requirements)
+            if not missing and not dry_run:
+                launch_cache.mark_satisfied(requirements)
+        results.append({
+            'path': program.path,
+            'program_name': program.manifest.program_name,
+            'target': program.site_dir or 'interpreter',
+            'missing': missing,
+            'launch_cache': not missing and not dry_run,
+        })
+
+    return {
+        'programs': results,
+        'requirements': merge_requirements(programs),
+        'installs': installs,
+        'ok': all(not result['missing'] for result in results),
+    }
@@ -0,0 +1,536 @@
+"""In-process requirement checker.
+
+Check requirement strings (PEP 508 subset) against installed distribution
+metadata, without starting a `pip` subprocess.
+"""
+
+import os
+import re
+import sys
+import platform
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+_NAME_RE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*')
+_NORMALIZE_RE = re.compile(r'[-_.]+')
+_SPEC_RE = re.compile(r'\s*(~=|===|==|!=|<=|>=|<|>)\s*([^\s,;]+)\s*')
+_VERSION_RE = re.compile(
+    r'^\s*v?'
+    r'(?:(?P<epoch>[0-9]+)!)?'
+    r'(?P<release>[0-9]+(?:\.[0-9]+)*)'
+    r'(?:[-_.]?(?P<pre_l>alpha|a|beta|b|preview|pre|c|rc)'
+    r'[-_.]?(?P<pre_n>[0-9]+)?)?'
+    r'(?:-(?P<post_n1>[0-9]+)|[-_.]?(?P<post_l>post|rev|r)'
+    r'[-_.]?(?P<post_n2>[0-9]+)?)?'
+    r'(?:[-_.]?(?P<dev_l>dev)[-_.]?(?P<dev_n>[0-9]+)?)?'
+    r'(?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?'
+    r'\s*$',
+    re.IGNORECASE
+)
+_PRE_ORDER = {
+    'a': 0, 'alpha': 0,
+    'b': 1, 'beta': 1,
+    'c': 2, 'rc': 2, 'pre': 2, 'preview': 2
+}
+_MARKER_TOKEN_RE = re.compile(
+    r'\s*(?:'
+    r'(?P<str>\'[^\']*\'|"[^"]*")'
+    r'|(?P<op>===|==|!=|<=|>=|~=|<|>|\(|\))'
+    r'|(?P<word>[A-Za-z_][A-Za-z0-9_.]*)'
+    r')'
+)
+_VERSION_MARKERS = frozenset((
+    'python_version', 'python_full_version', 'implementation_version'
+))
+
+# Each component of version key is (-1,), (0, value...) or (1,),
+# so missing components sort before/after the given ones.
+# (except local version label: empty tuple sorts before any label)
+_NEG_INF = (-1,)
+_POS_INF = (1,)
+_NO_LOCAL = ()
+
+Version = Tuple[tuple, ...]
+
+
+def normalize_name(name: str) -> str:
+    """Normalize distribution name. (PEP 503)
+
+    Args:
+        name (str): The distribution name.
+
+    Returns:
+        str: The normalized name. (ex: `Foo_Bar` -> `foo-bar`)
+    """
+    return _NORMALIZE_RE.sub('-', name).lower()
+
+
+def parse_version(version: str) -> Optional[Version]:
+    """Parse version string (PEP 440) to comparable key.
+
+    Args:
+        version (str): The version string.
+
+    Returns:
+        Optional[Version]:
+            The comparable key. If version is not valid, return None.
+    """
+    match = _VERSION_RE.match(version)
+    if match is None:
+        return None
+
+    epoch = int(match['epoch'] or 0)
+    release = [int(part) for part in match['release'].split('.')]
+    while len(release) > 1 and release[-1] == 0:
+        release.pop()
+
+    if match['pre_l']:
+        pre = (
+            0, _PRE_ORDER[match['pre_l'].lower()], int(match['pre_n'] or 0)
+        )
+    elif match['dev_l'] and not (match['post_n1'] or match['post_l']):
+        pre = _NEG_INF
+    else:
+        pre = _POS_INF
+
+    if match['post_n1']:
+        post = (0, int(match['post_n1']))
+    elif match['post_l']:
+        post = (0, int(match['post_n2'] or 0))
+    else:
+        post = _NEG_INF
+
+    dev = (0, int(match['dev_n'] or 0)) if match['dev_l'] else _POS_INF
+
+    if match['local']:
+        local = tuple(
+            (1, int(part)) if part.isdigit() else (0, part.lower())
+            for part in re.split(r'[-_.]', match['local'])
+        )
+    else:
+        local = _NO_LOCAL
+
+    return ((epoch,), tuple(release), pre, post, dev, local)
+
+
+def _release_of(version: str) -> Tuple[int, Tuple[int, ...]]:
+    match = _VERSION_RE.match(version)
+    return (
+        int(match['epoch'] or 0),
+        tuple(int(part) for part in match['release'].split('.'))
+    )
+
+
+def _is_prerelease(key: Version) -> bool:
+    return key[2] != _POS_INF or key[4] != _POS_INF
+
+
+def _public(key: Version) -> Version:
+    return key[:5] + (_NO_LOCAL,)
+
+
+def _match_specifier(operator: str, spec: str, version: str) -> bool:
+    """Check version matches single specifier clause.
+
+    Args:
+        operator (str): The comparison operator. (ex: `>=`)
+        spec (str): The version of specifier. (ex: `1.2.*`)
+        version (str): The version to check.
+
+    Returns:
+        bool: If the version matches, return True. Otherwise, return False.
+    """
+    if operator == '===':
+        return spec.strip().lower() == version.strip().lower()
+
+    key = parse_version(version)
+    if key is None:
+        return False
+
+    if spec.endswith('.*') and operator in ('==', '!='):
+        if parse_version(spec[:-2]) is None:
+            return False
+        spec_epoch, spec_release = _release_of(spec[:-2])
+        epoch, release = _release_of(version)
+        release += (0,) * (len(spec_release) - len(release))
+        matched = (
+            epoch == spec_epoch
+            and release[:len(spec_release)] == spec_release
+        )
+        return matched if operator == '==' else not matched
+
+    spec_key = parse_version(spec)
+    if spec_key is None:
+        return False
+
+    if operator in ('==', '!='):
+        if spec_key[5] == _NO_LOCAL:
+            key = _public(key)
+        return (key == spec_key) == (operator == '==')
+    if operator == '>=':
+        return _public(key) >= spec_key
+    if operator == '<=':
+        return _public(key) <= spec_key
+    if operator == '>':
+        if not _public(key) > spec_key:
+            return False
+        # `>1.7` must not match `1.7.post1` (unless spec is post release)
+        if spec_key[3] == _NEG_INF and key[3] != _NEG_INF:
+            return _release_of(version) != _release_of(spec)
+        return True
+    if operator == '<':
+        if not _public(key) < spec_key:
+            return False
+        # `<1.7` must not match `1.7rc1` (unless spec is pre release)
+        if not _is_prerelease(spec_key) and _is_prerelease(key):
+            return _release_of(version) != _release_of(spec)
+        return True
+    if operator == '~=':
+        epoch, release = _release_of(spec)
+        if len(release) < 2:
+            return False
+        prefix = (f'{epoch}!' if epoch else '') \
+            + '.'.join(map(str, release[:-1])) + '.*'
+        return (
+            _public(key) >= spec_key
+            and _match_specifier('==', prefix, version)
+        )
+    return False
+
+
+def _is_valid_spec(operator: str, spec: str) -> bool:
+    if operator == '===':  # Arbitrary string
+        return True
+    if spec.endswith('.*') and operator in ('==', '!='):
+        spec = spec[:-2]
+    return parse_version(spec) is not None
+
+
+class Requirement:
+    """The parsed requirement string. (PEP 508 subset)
+
+    Attributes:
+        raw (str): The original requirement string.
+        name (str): The normalized distribution name.
+        extras (Tuple[str, ...]): The requested extras.
+        specifiers (Tuple[Tuple[str, str], ...]):
+            The (operator, version) pairs. All of them must match.
+        marker (Optional[str]): The environment marker.
+    """
+    __slots__ = ('raw', 'name', 'extras', 'specifiers', 'marker')
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        requirement, _, marker = raw.partition(';')
+        self.marker = marker.strip() or None
+
+        match = _NAME_RE.match(requirement)
+        if match is None:
+            raise ValueError(f'Invalid requirement: {raw!r}')
+        self.name = normalize_name(match[1])
+        rest = requirement[match.end():]
+
+        extras = ()
+        if rest.startswith('['):
+            extras_text, _, rest = rest[1:].partition(']')
+            extras = tuple(
+                normalize_name(extra.strip())
+                for extra in extras_text.split(',') if extra.strip()
+            )
+        self.extras = extras
+
+        rest = rest.strip()
+        if rest.startswith('@'):  # Direct reference: only name is checked
+            rest = ''
+        if rest.startswith('(') and rest.endswith(')'):
+            rest = rest[1:-1]
+
+        specifiers = []
+        for clause in filter(None, (part.strip() for part in rest.split(','))):
+            spec_match = _SPEC_RE.fullmatch(clause)
+            if spec_match is None or not _is_valid_spec(*spec_match.groups()):
+                raise ValueError(f'Invalid requirement: {raw!r}')
+            specifiers.append((spec_match[1], spec_match[2]))
+        self.specifiers = tuple(specifiers)
+
+    def __repr__(self) -> str:
+        return f'Requirement({self.raw!r})'
+
+    def is_satisfied_by(self, version: str) -> bool:
+        """Check the version satisfies all specifiers.
+
+        Args:
+            version (str): The installed version.
+
+        Returns:
+            bool: If satisfied, return True. Otherwise, return False.
+        """
+        return all(
+            _match_specifier(operator, spec, version)
+            for operator, spec in self.specifiers
+        )
+
+    def is_applicable(self, extra: Optional[str] = None) -> bool:
+        """Evaluate environment marker of the requirement.
+
+        Args:
+            extra (str, optional): The value of `extra` marker variable.
+
+        Returns:
+            bool: If marker is absent or true, return True.
+        """
+        return self.marker is None or evaluate_marker(self.marker, extra)
+
+
+def default_environment() -> Dict[str, str]:
+    """Get values of environment marker variables. (PEP 508)
+
+    Returns:
+        Dict[str, str]: The marker variable name -> value.
+    """
+    impl = sys.implementation
+    impl_version = '.'.join(map(str, impl.version[:3]))
+    if impl.version.releaselevel != 'final':
+        impl_version += impl.version.releaselevel[0] \
+            + str(impl.version.serial)
+    return {
+        'implementation_name': impl.name,
+        'implementation_version': impl_version,
+        'os_name': os.name,
+        'platform_machine': platform.machine(),
+        'platform_release': platform.release(),
+        'platform_system': platform.system(),
+        'platform_version': platform.version(),
+        'python_full_version': platform.python_version(),
+        'platform_python_implementation': platform.python_implementation(),
+        'python_version': '.'.join(platform.python_version_tuple()[:2]),
+        'sys_platform': sys.platform,
+    }
+
+
+_ENVIRONMENT = None
+
+
+def evaluate_marker(marker: str, extra: Optional[str] = None) -> bool:
+    """Evaluate environment marker. (PEP 508)
+
+    Args:
+        marker (str): The marker expression. (ex: `python_version < "3.9"`)
+        extra (str, optional): The value of `extra` marker variable.
+
+    Returns:
+        bool: The evaluated result.
+    """
+    global _ENVIRONMENT  # pylint: disable = global-statement
+    if _ENVIRONMENT is None:
+        _ENVIRONMENT = default_environment()
+    environment = dict(_ENVIRONMENT, extra=normalize_name(extra or ''))
+
+    tokens = []
+    pos = 0
+    marker = marker.strip()
+    while pos < len(marker):
+        match = _MARKER_TOKEN_RE.match(marker, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f'Invalid marker: {marker!r}')
+        tokens.append((match.lastgroup, match[match.lastgroup]))
+        pos = match.end()
+    tokens.append(('end', ''))
+    return _MarkerParser(tokens, environment).parse()
+
+
+class _MarkerParser:
+    """Recursive descent parser & evaluator of marker expression."""
+    __slots__ = ('tokens', 'pos', 'environment')
+
+    def __init__(self, tokens: List[Tuple[str, str]], environment: dict):
+        self.tokens = tokens
+        self.pos = 0
+        self.environment = environment
+
+    def _peek(self) -> Tuple[str, str]:
+        return self.tokens[self.pos]
+
+    def _next(self) -> Tuple[str, str]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self) -> bool:
+        result = self._or()
+        if self._peek()[0] != 'end':
+            raise ValueError('Invalid marker: unexpected ' + self._peek()[1])
+        return result
+
+    def _or(self) -> bool:
+        result = self._and()
+        while self._peek() == ('word', 'or'):
+            self._next()
+            result = self._and() or result
+        return result
+
+    def _and(self) -> bool:
+        result = self._atom()
+        while self._peek() == ('word', 'and'):
+            self._next()
+            result = self._atom() and result
+        return result
+
+    def _atom(self) -> bool:
+        if self._peek() == ('op', '('):
+            self._next()
+            result = self._or()
+            if self._next() != ('op', ')'):
+                raise ValueError('Invalid marker: missing `)`')
+            return result
+
+        lhs_name, lhs = self._value()
+        kind, operator = self._next()
+        if kind == 'word' and operator == 'not':
+            if self._next() != ('word', 'in'):
+                raise ValueError('Invalid marker: expected `in`')
+            operator = 'not in'
+        elif kind == 'word' and operator == 'in':
+            pass
+        elif kind != 'op' or operator in ('(', ')'):
+            raise ValueError('Invalid marker: expected operator')
+        rhs_name, rhs = self._value()
+
+        if 'extra' in (lhs_name, rhs_name):  # Compared normalized (PEP 685)
+            lhs, rhs = normalize_name(lhs), normalize_name(rhs)
+        if operator == 'in':
+            return lhs in rhs
+        if operator == 'not in':
+            return lhs not in rhs
+        if (
+            (lhs_name in _VERSION_MARKERS or rhs_name in _VERSION_MARKERS)
+            and parse_version(lhs) is not None
+        ):
+            return _match_specifier(operator, rhs, lhs)
+        if operator == '==':
+            return lhs == rhs
+        if operator == '!=':
+            return lhs != rhs
+        if operator == '<':
+            return lhs < rhs
+        if operator == '<=':
+            return lhs <= rhs
+        if operator == '>':
+            return lhs > rhs
+        if operator == '>=':
+            return lhs >= rhs
+        return lhs == rhs
+
+    def _value(self) -> Tuple[Optional[str], str]:
+        kind, value = self._next()
+        if kind == 'str':
+            return None, value[1:-1]
+        if kind == 'word':
+            value = value.replace('.', '_')
+            if value in self.environment:
+                return value, self.environment[value]
+        raise ValueError(f'Invalid marker: unexpected {value!r}')
+
+
+def _dist_from_entry(
+    path: str, entry_name: str
+) -> Optional[Tuple[str, Optional[str]]]:
+    """Get (name, version) of distribution metadata directory/file.
+
+    Args:
+        path (str): The path of the metadata directory/file.
+        entry_name (str): The base name of path.
+
+    Returns:
+        Optional[Tuple[str, Optional[str]]]:
+            The normalized name & version (None if unknown).
+            If the entry is not a metadata, return None.
+    """
+    if entry_name.endswith('.dist-info'):
+        stem = entry_name[:-10]
+    elif entry_name.endswith('.egg-info'):
+        stem = entry_name[:-9]
+    else:
+        return None
+
+    name, _, version = stem.partition('-')
+    version = version.split('-', 1)[0]
+    if version and parse_version(version) is not None:
+        return normalize_name(name), version
+
+    # Metadata name without version: read metadata itself (slow path)
+    # pylint: disable = import-outside-toplevel
+    from pathlib import Path
+    from importlib.metadata import PathDistribution
+    try:
+        dist = PathDistribution(Path(path))
+        return normalize_name(dist.metadata['Name'] or name), dist.version
+    except Exception:  # pylint: disable = broad-except
+        return normalize_name(name), None
+
+
+def installed_distributions(
+    paths: Optional[Iterable[str]] = None
+) -> Dict[str, str]:
+    """Get installed distributions from metadata directories.
+
+    The name/version is read from name of metadata directory
+    (`<name>-<version>.dist-info`), so metadata file is rarely read.
+    If same distribution presents on many paths, the first one is used.
+
+    Args:
+        paths (Iterable[str], optional):
+            The directories to search. Default is `sys.path`.
+
+    Returns:
+        Dict[str, str]: The normalized name -> version.
+    """
+    distributions = {}
+    for path in sys.path if paths is None else paths:
+        try:
+            entries = os.scandir(path or '.')
+        except OSError:  # Not directory (ex: zipfile) or not exists
+            continue
+        with entries:
+            for entry in entries:
+                dist = _dist_from_entry(entry.path, entry.name)
+                if dist is not None and dist[1] is not None:
+                    distributions.setdefault(*dist)
+    return distributions
+
+
+def check_to_install(
+    requirements: Iterable[Union[str, Requirement]],
+    installed: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """Check which requirements are missing or out of date.
+
+    Args:
+        requirements (Iterable[Union[str, Requirement]]):
+            The requirement strings. (ex: `numpy>=1.20`)
+        installed (Dict[str, str], optional):
+            The normalized name -> version of installed distributions.
+            Default is result of `installed_distributions()`.
+
+    Returns:
+        List[str]: The requirement strings which is not satisfied.
+            Requirement strings which cannot be parsed here
+            (ex: URL or path, which pip accepts) are always included.
+    """
+    if installed is None:
+        installed = installed_distributions()
+
+    to_install = []
+    for requirement in requirements:
+        if not isinstance(requirement, Requirement):
+            try:
+                requirement = Requirement(requirement)
+            except ValueError:
+                to_install.append(requirement)
+                continue
+        if not requirement.is_applicable():
+            continue
+        version = installed.get(requirement.name)
+        if version is None or not requirement.is_satisfied_by(version):
+            to_install.append(requirement.raw)
+    return to_install
@@ -0,0 +1,261 @@
+"""Read resources, stored in program directory or zipapp.
+
+The zipapp archive is opened once and its members are indexed by name.
+If the zipapp is built by `build`, hot resources are read directly with
+the resource index, without parsing central directory.
+Decoded text/JSON is memoized with bounded (LRU) eviction.
+"""
+
+import os
+import json
+import struct
+import zipfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from . import universal_constants
+
+
+MAX_CACHED = 32
+
+# Resource index, written as first member by `build`.
+INDEX_FILE = '__resources__.json'
+INDEX_VERSION = 1
+LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+_LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+_lock = threading.RLock()
+_zipapp = None
+_index = None
+_resource_index = None
+_cache = OrderedDict()
+
+
+def get_zipapp() -> Optional[zipfile.ZipFile]:
+    """Get shared ZipFile of the running zipapp.
+
+    Returns:
+        Optional[zipfile.ZipFile]:
+            If running as zipapp, return opened ZipFile.
+            Otherwise, return None.
+    """
+    global _zipapp, _index  # pylint: disable = global-statement
+    if not universal_constants.IS_ZIPFILE:
+        return None
+    if _zipapp is None:
+        with _lock:
+            if _zipapp is None:
+                main_zip = zipfile.ZipFile(
+                    universal_constants.ZIPAPP_FILE, 'r'
+                )
+                _index = {info.filename: info for info in main_zip.infolist()}
+                _zipapp = main_zip
+    return _zipapp
+
+
+def zipapp_index() -> Dict[str, zipfile.ZipInfo]:
+    """Get name -> ZipInfo index of the running zipapp.
+
+    Returns:
+        Dict[str, zipfile.ZipInfo]:
+            The index. If not running as zipapp, return empty dict.
+    """
+    if get_zipapp() is None:
+        return {}
+    return _index
+
+
+def read_resource_index(file) -> Optional[dict]:
+    """Read resource index from start of the zipapp.
+
+    Args:
+        file (BinaryIO): The opened zipapp file.
+
+    Returns:
+        Optional[dict]:
+            The index `{'stored': {name: [offset, size]}, 'names': [...]}`.
+            If not present (not built by `build`), return None.
+    """
+    head = file.read(512 + LOCAL_HEADER.size)
+    offset = 0
+    if head.startswith(b'#!'):  # Shebang line
+        offset = head.find(b'\n') + 1
+        if offset == 0:
+            return None
+    header = head[offset:offset + LOCAL_HEADER.size]
+    if len(header) < LOCAL_HEADER.size \
+            or not header.startswith(_LOCAL_HEADER_SIGNATURE):
+        return None
+
+    fields = LOCAL_HEADER.unpack(header)
+    compression, size, name_length, extra_length = \
+        fields[4], fields[8], fields[10], fields[11]
+    offset += LOCAL_HEADER.size
+    file.seek(offset)
+    if compression != zipfile.ZIP_STORED \
+            or file.read(name_length) != INDEX_FILE.encode('ascii'):
+        return None
+    file.seek(offset + name_length + extra_length)
+    try:
+        index = json.loads(file.read(size))
+    except ValueError:
+        return None
+    if not isinstance(index, dict) or index.get('version') != INDEX_VERSION:
+        return None
+    return index
+
+
+def _get_resource_index() -> dict:
+    """Get resource index of the running zipapp. (Empty if not present)"""
+    global _resource_index  # pylint: disable = global-statement
+    if _resource_index is None:
+        with _lock:
+            if _resource_index is None:
+                try:
+                    with open(universal_constants.ZIPAPP_FILE, 'rb') as file:
+                        index = read_resource_index(file)
+                except OSError:
+                    index = None
+                if index is not None:
+                    index['names'] = frozenset(index['names'])
+                _resource_index = index or {}
+    return _resource_index
+
+
+def _candidates(relpath: str, search_parent: bool) -> Tuple[str, ...]:
+    """Get paths to search the file on, in order. (not zipapp)"""
+    program_dir = universal_constants.PROGRAM_DIR
+    if search_parent:
+        return (program_dir + relpath, program_dir + '../' + relpath)
+    return (program_dir + relpath,)
+
+
+def find_file(relpath: str, search_parent: bool = False) -> Optional[str]:
+    """Find file in program directory. (not zipapp)
+
+    Args:
+        relpath: Path of file, relative to program root.
+        search_parent (bool, optional):
+            Whether to search parent of program directory too,
+            if not present on program directory. Default is False.
+
+    Returns:
+        Optional[str]:
+            If the file is present, return the path.
+            Otherwise (or running as zipapp), return None.
+    """
+    if universal_constants.IS_ZIPFILE:
+        return None
+    for path in _candidates(relpath, search_parent):
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def read_bytes(
+    relpath: str, search_parent: bool = False
+) -> Optional[bytes]:
+    """Read file, stored in program directory or zipapp.
+
+    Args:
+        relpath:
+            (If not zipapp) Path of file, relative to program root.
+            (If zipapp) Path of file in zipapp archive.
+        search_parent (bool, optional):
+            (If not zipapp) Whether to search parent of program directory
+            too, if not present on program directory. Default is False.
+
+    Returns:
+        Optional[bytes]:
+            If the file is present, return the contents.
+            Otherwise, return None.
+    """
+    if universal_constants.IS_ZIPFILE:
+        resource_index = _get_resource_index()
+        if resource_index:
+            if relpath not in resource_index['names']:
+                return None
+            stored = resource_index['stored'].get(relpath)
+            if stored is not None:  # Read without parsing central directory
+                with open(universal_constants.ZIPAPP_FILE, 'rb') as file:
+                    file.seek(stored[0])
+                    return file.read(stored[1])
+
+    main_zip = get_zipapp()
+    if main_zip is not None:
+        info = _index.get(relpath)
+        if info is None:
+            return None
+        return main_zip.read(info)
+
+    for path in _candidates(relpath, search_parent):
+        try:
+            with open(path, 'rb') as file:
+                return file.read()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            pass
+    return None
+
+
+def _memoized(key: tuple, load) -> Any:
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    value = load()
+    with _lock:
+        _cache[key] = value
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+    return value
+
+
+def read_text(
+    relpath: str, encoding: str = 'utf-8', search_parent: bool = False
+) -> Optional[str]:
+    """Read text file, stored in program directory or zipapp. (memoized)
+
+    Args:
+        relpath: Path of file. (See `read_bytes`.)
+        encoding: The encoding of the file to read.
+        search_parent (bool, optional): See `read_bytes`.
+
+    Returns:
+        Optional[str]:
+            If the file is present, return the decoded contents.
+            Otherwise, return None.
+    """
+    def load():
+        raw = read_bytes(relpath, search_parent)
+        # Universal newline, like `open(..., 'r')`
+        return None if raw is None else raw.decode(encoding)\
+            .replace('\r\n', '\n').replace('\r', '\n')
+    return _memoized(('text', relpath, encoding, search_parent), load)
+
+
+def read_json(relpath: str, search_parent: bool = False) -> Any:
+    """Read JSON file, stored in program directory or zipapp. (memoized)
+
+    The returned object is shared between callers; do not modify it.
+
+    Args:
+        relpath: Path of file. (See `read_bytes`.)
+        search_parent (bool, optional): See `read_bytes`.
+
+    Returns:
+        Any:
+            If the file is present, return the parsed contents.
+            Otherwise, return None.
+    """
+    def load():
+        contents = read_text(relpath, search_parent=search_parent)
+        return None if contents is None else json.loads(contents)
+    return _memoized(('json', relpath, search_parent), load)
+
+
+def clear_cache():
+    """Drop memoized resources. (ex: after the files are changed)"""
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,151 @@
+"""Declarative startup tasks, run as a dependency graph in a thread pool.
+
+launch.json `startup_tasks` declares named initialization steps:
+
+    "startup_tasks": {
+        "config": "load_config",
+        "db": {"func": "open_db", "after": ["config"]},
+        "models": {"func": "my_app.models:warm_up", "after": ["config"]}
+    }
+
+`func` is a function of main module, or `module:function`.
+A task starts as soon as the tasks it is `after` are done,
+so startup takes the critical path, not the sum of all tasks.
+If the function accepts an argument, results of its dependencies
+(task name -> result) are passed. Results of all tasks are passed
+to main function as a mapping.
+
+CPU-heavy task can run in worker process with `"process": true`.
+(see `process_tasks`)
+"""
+
+import time
+import threading
+from importlib import import_module
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Tuple
+
+from .process_tasks import call_in_process
+from . import tracing
+
+
+MAX_WORKERS = 8
+
+
+def _resolve(main_module, func_name: str):
+    """Get function by name. (`function` of main module, or `module:function`)
+    """
+    module_name, _, attr = func_name.rpartition(':')
+    module = import_module(module_name) if module_name else main_module
+    return getattr(module, attr)
+
+
+def _call(func, deps: Dict[str, Any], in_process: bool = False):
+    """Call function, with results of dependencies if it accepts."""
+    import inspect  # pylint: disable = import-outside-toplevel
+    try:
+        inspect.signature(func).bind(deps)
+        args = (deps,)
+    except (TypeError, ValueError):
+        args = ()
+    if in_process:
+        return call_in_process(func, *args)
+    return func(*args)
+
+
+class TaskGraph:
+    """Run startup tasks in a thread pool, in order of dependencies.
+
+    Attributes:
+        timings (Dict[str, float]):
+            The task name -> run time in milliseconds.
+    """
+
+    def __init__(
+        self, tasks: Iterable[Tuple[str, str, Tuple[str, ...], bool]],
+        main_module, max_workers: int = MAX_WORKERS
+    ):
+        """Prepare tasks.
+
+        Args:
+            tasks (Iterable[Tuple[str, str, Tuple[str, ...], bool]]):
+                The (name, function, names of dependencies,
+                whether to run in worker process) of tasks.
+                (`LaunchManifest.startup_tasks`)
+            main_module (module): The module that main function exists.
+            max_workers (int, optional):
+                The maximum count of threads. Default is `MAX_WORKERS`.
+        """
+        self.__tasks = tuple(tasks)
+        self.__main_module = main_module
+        self.__max_workers = max_workers
+        self.__lock = threading.Lock()
+        self.timings = {}
+
+    def __run(
+        self, name: str, func_name: str, deps: Dict[str, Any],
+        in_process: bool
+    ):
+        start = time.perf_counter()
+        try:
+            with tracing.phase(
+                f'task/{name}', function=func_name, process=in_process
+            ):
+                return _call(
+                    _resolve(self.__main_module, func_name), deps, in_process
+                )
+        finally:
+            with self.__lock:
+                self.timings[name] = round(
+                    (time.perf_counter() - start) * 1000, 3
+                )
+
+    def run(self, progress=None) -> Dict[str, Any]:
+        """Run all tasks, and wait them.
+
+        Args:
+            progress (SplashProgress, optional):
+                The progress reporter, which count of done tasks is shown.
+
+        Returns:
+            Dict[str, Any]: The task name -> return value, in declared order.
+
+        Raises:
+            Exception: The exception raised by a task.
+                Tasks not started yet are not run.
+        """
+        if not self.__tasks:
+            return {}
+        funcs = {name: func_name for name, func_name, _, _ in self.__tasks}
+        waiting = {name: deps for name, _, deps, _ in self.__tasks}
+        in_process = {name: process for name, _, _, process in self.__tasks}
+        results = {}
+        running = {}
+
+        with tracing.phase('startup_tasks', tasks=len(funcs)), \
+                ThreadPoolExecutor(
+                    min(len(funcs), self.__max_workers),
+                    thread_name_prefix='universal_main-task'
+                ) as executor:
+            try:
+                while waiting or running:
+                    for name, deps in list(waiting.items()):
+                        if all(dep in results for dep in deps):
+                            del waiting[name]
+                            future = executor.submit(
+                                self.__run, name, funcs[name],
+                                {dep: results[dep] for dep in deps},
+                                in_process[name]
+                            )
+                            running[future] = name
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results[running.pop(future)] = future.result()
+                    if progress is not None:
+                        progress.set_progress(len(results), len(funcs))
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+        return {name: results[name] for name in funcs}
+
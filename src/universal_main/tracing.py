@@ -0,0 +1,181 @@
+"""Launch-phase tracing.
+
+Phases of the launcher are always timed (it is cheap).
+If tracing is enabled (env `UNIVERSAL_MAIN_TRACE` or launch.json `trace`),
+the phases are written to Chrome trace (JSON) file,
+which can be loaded by `chrome://tracing` or Perfetto.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+
+TRACE_ENV = 'UNIVERSAL_MAIN_TRACE'
+
+_lock = threading.Lock()
+_events = []
+_trace_path = None
+_origin = time.perf_counter()
+
+
+def _thread_time() -> float:
+    try:
+        return time.thread_time()
+    except (AttributeError, OSError):  # Not supported on some platforms
+        return time.process_time()
+
+
+def enable(path: Optional[str] = None):
+    """Enable writing trace file.
+
+    Args:
+        path (str, optional):
+            The path of trace file. If not given,
+            `universal_main_trace_<pid>.json` in current directory is used.
+    """
+    global _trace_path  # pylint: disable = global-statement
+    _trace_path = path or f'universal_main_trace_{os.getpid()}.json'
+
+
+def configure(config_value=None):
+    """Enable tracing by environment variable or launch.json value.
+
+    Environment variable `UNIVERSAL_MAIN_TRACE` has priority.
+    The value can be path of trace file or true (`1`/`true`/`yes`).
+
+    Args:
+        config_value (Union[str, bool, None], optional):
+            The value of launch.json key `trace`.
+    """
+    value = os.environ.get(TRACE_ENV) or config_value
+    if not value or str(value).lower() in ('0', 'false', 'no'):
+        return
+    if value is True or str(value).lower() in ('1', 'true', 'yes'):
+        enable()
+    else:
+        enable(str(value))
+
+
+def reset():
+    """Clear recorded events & disable writing trace file.
+
+    Used by forked process, which inherits events of its parent.
+    """
+    global _trace_path, _origin  # pylint: disable = global-statement
+    with _lock:
+        _events.clear()
+    _trace_path = None
+    _origin = time.perf_counter()
+
+
+def is_enabled() -> bool:
+    """Check trace file will be written.
+
+    Returns:
+        bool: If enabled, return True. Otherwise, return False.
+    """
+    return _trace_path is not None
+
+
+@contextmanager
+def phase(name: str, **args) -> Iterator[dict]:
+    """Time a launch phase.
+
+    Wall time, CPU time (of current thread)
+    and count of newly imported modules are recorded.
+
+    Args:
+        name (str): The name of phase.
+        **args: Additional information of the phase.
+
+    Yields:
+        dict: The `args` of the event. More information can be added.
+    """
+    imports = len(sys.modules)
+    cpu_start = _thread_time()
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        end = time.perf_counter()
+        args['cpu_ms'] = round((_thread_time() - cpu_start) * 1000, 3)
+        args['imports'] = len(sys.modules) - imports
+        add_event(name, start, end, args)
+
+
+def add_event(name: str, start: float, end: float, args: dict = None):
+    """Add a complete event.
+
+    Args:
+        name (str): The name of event.
+        start (float): The start time. (`time.perf_counter()`)
+        end (float): The end time. (`time.perf_counter()`)
+        args (dict, optional): Additional information of the event.
+    """
+    event = {
+        'name': name, 'cat': 'launch', 'ph': 'X',
+        'ts': round((start - _origin) * 1e6, 1),
+        'dur': round((end - start) * 1e6, 1),
+        'pid': os.getpid(), 'tid': threading.get_ident(),
+        'args': args or {}
+    }
+    with _lock:
+        _events.append(event)
+
+
+def elapsed() -> float:
+    """Get time since launcher start. (import of this module, or `reset`)
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    return time.perf_counter() - _origin
+
+
+def events() -> List[dict]:
+    """Get recorded events.
+
+    Returns:
+        List[dict]: The copy of recorded events. (Chrome trace format)
+    """
+    with _lock:
+        return list(_events)
+
+
+def durations() -> Dict[str, float]:
+    """Get total duration of each phase.
+
+    Returns:
+        Dict[str, float]: The phase name -> duration in milliseconds.
+    """
+    result = {}
+    for event in events():
+        result[event['name']] = result.get(event['name'], 0) \
+            + event['dur'] / 1000
+    return result
+
+
+def flush():
+    """Write trace file, if tracing is enabled."""
+    if _trace_path is None:
+        return
+    thread_names = [
+        {
+            'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(),
+            'tid': thread.ident, 'args': {'name': thread.name}
+        }
+        for thread in threading.enumerate()
+    ]
+    try:
+        with open(_trace_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'traceEvents': thread_names + events(),
+                'displayTimeUnit': 'ms'
+            }, file)
+    except OSError as exc:
+        print(f'Cannot write trace file: {exc}', file=sys.stderr)
@@ -1,41 +1,91 @@
 import os
 import sys
-from locale import getpreferredencoding
-from multiprocessing import cpu_count
 
 
+__all__ = [
+    'ENCODING', 'LINESEP', 'PATHSEP', 'USER_DIR', 'CPU_CNT', 'PLATFORM',
+    'IS_WINDOWS', 'IS_LINUX', 'IS_MACOS', 'DATADIR',
+    'PROGRAM_DIR', 'IS_ZIPFILE', 'ZIPAPP_FILE'
+]
+
 # system settings & information
-ENCODING = getpreferredencoding()
 LINESEP = os.linesep
 PATHSEP = os.path.sep
-USER_DIR = os.path.expanduser('~') + PATHSEP
-CPU_CNT = cpu_count()
 PLATFORM = sys.platform
-if PLATFORM == 'win32':
-    IS_WINDOWS = True
-    IS_LINUX = False
-    IS_MACOS = False
-    DATADIR = os.environ['localappdata'] + PATHSEP
-elif PLATFORM == 'linux':
-    IS_WINDOWS = False
-    IS_LINUX = True
-    IS_MACOS = False
-    DATADIR = USER_DIR + '/.local/share/'
-elif PLATFORM == 'darwin':
-    IS_WINDOWS = False
-    IS_LINUX = False
-    IS_MACOS = True
-    DATADIR = USER_DIR + '/Library/Application Support/'
+IS_WINDOWS = PLATFORM == 'win32'
+IS_LINUX = PLATFORM == 'linux'
+IS_MACOS = PLATFORM == 'darwin'
+
+
+# Another constants are computed on first access. (by `__getattr__`)
+def _encoding() -> dict:
+    # pylint: disable = import-outside-toplevel
+    from locale import getpreferredencoding
+    return {'ENCODING': getpreferredencoding()}
+
+
+def _user_dir() -> dict:
+    return {'USER_DIR': os.path.expanduser('~') + PATHSEP}
+
+
+def _cpu_cnt() -> dict:
+    return {'CPU_CNT': os.cpu_count() or 1}
+
+
+def _datadir() -> dict:
+    if IS_WINDOWS:
+        return {'DATADIR': os.environ['localappdata'] + PATHSEP}
+    user_dir = globals().get('USER_DIR') or __getattr__('USER_DIR')
+    if IS_LINUX:
+        return {'DATADIR': user_dir + '/.local/share/'}
+    if IS_MACOS:
+        return {'DATADIR': user_dir + '/Library/Application Support/'}
+    return {}
+
 
 # runtime info
-PROGRAM_DIR = os.path.dirname(
-    os.path.abspath(sys.modules['__main__'].__file__)
-)
-IS_ZIPFILE = os.path.isfile(PROGRAM_DIR)
-if IS_ZIPFILE:
-    ZIPAPP_FILE = PROGRAM_DIR
-    while not os.path.isdir(PROGRAM_DIR):
-        PROGRAM_DIR = os.path.dirname(os.path.abspath(PROGRAM_DIR))
-else:
-    ZIPAPP_FILE = ''
-PROGRAM_DIR += PATHSEP
+def _program_location() -> dict:
+    # `__main__` has no `__file__` in interactive mode or while `python -m`
+    program_dir = os.path.dirname(os.path.abspath(
+        getattr(sys.modules['__main__'], '__file__', None)
+        or os.path.join(os.getcwd(), '__main__')
+    ))
+    is_zipfile = os.path.isfile(program_dir)
+    if is_zipfile:
+        zipapp_file = program_dir
+        while not os.path.isdir(program_dir):
+            program_dir = os.path.dirname(os.path.abspath(program_dir))
+    else:
+        zipapp_file = ''
+    return {
+        'PROGRAM_DIR': program_dir + PATHSEP,
+        'IS_ZIPFILE': is_zipfile,
+        'ZIPAPP_FILE': zipapp_file
+    }
+
+
+_COMPUTE = {
+    'ENCODING': _encoding,
+    'USER_DIR': _user_dir,
+    'CPU_CNT': _cpu_cnt,
+    'DATADIR': _datadir,
+    'PROGRAM_DIR': _program_location,
+    'IS_ZIPFILE': _program_location,
+    'ZIPAPP_FILE': _program_location,
+}
+
+
+def __getattr__(name: str):
+    """Compute constant on first access, and cache it as global."""
+    compute = _COMPUTE.get(name)
+    values = {} if compute is None else compute()
+    if name not in values:
+        raise AttributeError(
+            f'module {__name__!r} has no attribute {name!r}'
+        )
+    globals().update(values)
+    return values[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,20 +1,21 @@
 """The package install automation tool.
 """
 
-import os
 import sys
-import shutil
-import zipfile
-import tempfile
-import subprocess
-from importlib import import_module
+import queue
+import threading
+from importlib import import_module, invalidate_caches
 from typing import Iterable, List, Optional
 
-from .universal_constants import ENCODING, IS_WINDOWS, IS_ZIPFILE, ZIPAPP_FILE
 from .program_informations import get_icon
-
-
-FILE_DIR = os.path.abspath(os.path.dirname(__file__)) + '/'
+from .requirement_checker import check_to_install
+from .preload import start_preload
+from .startup_tasks import TaskGraph
+from .early_splash import EarlySplash, show_early_splash
+from . import (
+    app_env, import_index, installers, launch_cache, metrics,
+    process_tasks, tracing, updates
+)
 
 
 Qt = None
@@ -24,8 +25,12 @@ QApplication = None
 QVBoxLayout = None
 QLabel = None
 QSplashScreen = None
+QProgressBar = None
 _Splash = None
 
+# Interval to process Qt events while waiting worker thread (in seconds)
+_EVENT_INTERVAL = 0.01
+
 
 def _check_py_ver(min_ver: Iterable) -> bool:
     """
@@ -50,152 +55,160 @@ def _check_py_ver(min_ver: Iterable) -> bool:
     return False
 
 
-def _nt_run_cmd(args: List[str]) -> subprocess.CompletedProcess:
+def _find_missing(requirements: List[str]) -> List[str]:
     """
-    Call subprocess.run with given args.
-
-    Call subprocess.run
-    with stdout/stderr PIPE redirect
-    and CREATE_NO_WINDOW flag.
+    Check packages, if environment is changed since last check.
 
     Args:
-        args (List[str]): The command to run.
+        requirements (List[str]):
+            The requirement strings that must be satisfied.
 
     Returns:
-        subprocess.CompletedProcess: The ran result.
+        List[str]: The requirement strings which is not satisfied.
     """
-    return subprocess.run(
-        args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-        creationflags=subprocess.CREATE_NO_WINDOW, check=False
-    )
+    with tracing.phase('check_requirements') as trace_args:
+        if launch_cache.is_satisfied(requirements):
+            trace_args['cached'] = True
+            return []
+        to_install = check_to_install(requirements)
+        trace_args['missing'] = len(to_install)
 
+    if not to_install:
+        launch_cache.mark_satisfied(requirements)
+    return to_install
 
-def _posix_run_cmd(args: List[str]) -> subprocess.CompletedProcess:
-    """
-    Call subprocess.run with given args.
 
-    Call subprocess.run with stdout/stderr PIPE redirect.
+def _install_missing(requirements: List[str], to_install: List[str]) -> int:
+    """
+    Install missing packages.
 
     Args:
-        args (List[str]): The command to run.
+        requirements (List[str]):
+            The requirement strings that must be satisfied.
+        to_install (List[str]):
+            The requirement strings which is not satisfied.
 
     Returns:
-        subprocess.CompletedProcess: The ran result.
+        int: The return code from installer. (0 if nothing to install.)
     """
-    return subprocess.run(
-        args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False
-    )
+    if not to_install:
+        return 0
 
+    with tracing.phase('install', packages=len(to_install)):
+        if app_env.active_site_dir() is None:
+            return_code = installers.install(to_install)
+        else:
+            return_code = app_env.install(to_install, installers.install)
+        invalidate_caches()  # Directories are changed
 
-if IS_WINDOWS:
-    run_cmd = _nt_run_cmd
-else:
-    run_cmd = _posix_run_cmd
+    # Installer can exit with 0 though pip is failed, so check again.
+    if return_code == 0 and not check_to_install(requirements):
+        launch_cache.mark_satisfied(requirements)
+    return return_code
 
 
-def _check_to_install(requirements: Iterable[str]) -> List[str]:
+def _install_found(requirements: List[str], wait_missing) -> int:
     """
-    Check which packages need to be installed.
+    Wait missing packages to be found, then install them.
 
     Args:
-        requirements (Iterable[str]):
-            The pypi package names that must be installed.
+        requirements (List[str]):
+            The requirement strings that must be satisfied.
+        wait_missing (Callable[[], List[str]]):
+            Wait & get the requirement strings which is not satisfied.
 
     Returns:
-        List[str]: The package names.
+        int: The return code from installer. (0 if nothing to install.)
     """
-    installed = run_cmd(
-        [sys.executable, '-m', 'pip', 'list']
-    ).stdout.decode(ENCODING)
-    return [
-        package for package in requirements
-        if not package + ' ' in installed
-    ]
+    return _install_missing(requirements, wait_missing())
 
 
-def _zipapp_package_installer(requirements) -> int:
+def _install_requirements(requirements: Iterable[str]) -> int:
     """
-    The package checker and installer (Python zipapp version.)
+    Check & install packages, if environment is changed since last check.
+
+    Args:
+        requirements (Iterable[str]):
+            The requirement strings that must be satisfied.
 
     Returns:
-        int: The return code from popened process.
+        int: The return code from installer. (0 if nothing to install.)
     """
-    with zipfile.ZipFile(ZIPAPP_FILE) as main_zip:
-        to_install = _check_to_install(requirements)
+    requirements = list(requirements)
+    return _install_missing(requirements, _find_missing(requirements))
 
-        if not to_install:
-            return 0
 
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            installer_path = tmp_dir + '/package_installer.py'
-
-            for name in main_zip.namelist():
-                if name.endswith('package_installer.py'):
-                    extracted_path = main_zip.extract(name, tmp_dir)
-                    break
-            if extracted_path != installer_path:
-                os.rename(extracted_path, installer_path)
-
-            if IS_WINDOWS:
-                curses_dir = tmp_dir + '/wincurses'
-                wincurses_dir = os.path.dirname(installer_path) + '/wincurses/'
-                os.mkdir(curses_dir)
-                major, minor = sys.version_info[:2]
-                with main_zip.open(
-                    wincurses_dir
-                    + f"wincurses/curses-cp{major}{minor}_"
-                    + '64.whl' if sys.maxsize == 2 ** 63 - 1 else '32.whl',
-                    'rb'
-                ) as curses_pyd:
-                    for name in curses_pyd.namelist():
-                        if name.endswith('.pyd'):
-                            curses_pyd.extract(name, curses_dir)
-
-            return subprocess.run([
-                sys.executable, installer_path, *to_install
-            ], check=False).returncode
-
-
-def _normal_package_checker(requirements) -> int:
+class _BackgroundCall:
     """
-    The package checker and installer (non-zipapp version.)
+    Call function in background thread.
 
-    Returns:
-        int: The return code from popened process.
+    Exception raised by the function is re-raised by `result`.
     """
-    to_install = _check_to_install(requirements)
-
-    if not to_install:
-        return 0
 
-    if IS_WINDOWS:
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            shutil.copy(FILE_DIR + 'package_installer.py', tmp_dir)
-
-            curses_dir = tmp_dir + '/wincurses'
-            os.mkdir(curses_dir)
-            major, minor = sys.version_info[:2]
-            with zipfile.ZipFile(
-                FILE_DIR
-                + f"wincurses/curses-cp{major}{minor}_"
-                + '64.whl' if sys.maxsize == 2 ** 63 - 1 else '32.whl'
-            ) as curses_pyd:
-                for name in curses_pyd.namelist():
-                    if name.endswith('.pyd'):
-                        curses_pyd.extract(name, curses_dir)
+    def __init__(self, func, *args):
+        self.__result = {}
+        self.__thread = threading.Thread(
+            target=self.__run, args=(func, args),
+            name=f'universal_main-{func.__name__}', daemon=True
+        )
+        self.__thread.start()
+
+    def __run(self, func, args):
+        try:
+            self.__result['value'] = func(*args)
+        except BaseException as exc:  # pylint: disable = broad-except
+            self.__result['error'] = exc
+
+    def is_alive(self) -> bool:
+        """Check the function is running."""
+        return self.__thread.is_alive()
+
+    def join(self, timeout: Optional[float] = None):
+        """Wait the function to finish, at most timeout seconds."""
+        self.__thread.join(timeout)
+
+    def result(self, early_splash: Optional[EarlySplash] = None):
+        """
+        Wait & get return value of the function.
+
+        Args:
+            early_splash (EarlySplash, optional):
+                The splash which events are processed while waiting.
+
+        Returns:
+            Any: The return value of the function.
+        """
+        if early_splash is not None:
+            while self.__thread.is_alive():
+                early_splash.update()
+                self.__thread.join(_EVENT_INTERVAL)
+        self.__thread.join()
+        if 'error' in self.__result:
+            raise self.__result['error']
+        return self.__result['value']
+
+
+def _install_import_index(enabled: bool):
+    """Install finder with cached index of module locations, if enabled.
+    """
+    if enabled:
+        with tracing.phase('load_import_index') as trace_args:
+            trace_args['modules'] = len(import_index.install().modules)
 
-            return subprocess.run([
-                sys.executable, tmp_dir + '/package_installer.py', *to_install
-            ], check=False).returncode
 
-    return subprocess.run([
-        sys.executable, FILE_DIR + 'package_installer.py', *to_install
-    ], check=False).returncode
+def _save_import_index(enabled: bool):
+    """Record locations of imported modules, if enabled."""
+    if enabled:
+        with tracing.phase('save_import_index') as trace_args:
+            trace_args['hits'] = import_index.install().hits
+            import_index.save()
 
 
 def main(
     main_module_name: str, main_func_name: str,
-    min_py_ver: Iterable, requirements: Iterable
+    min_py_ver: Iterable, requirements: Iterable,
+    preload: Iterable[str] = (), use_import_index: bool = False,
+    startup_tasks: Iterable[tuple] = ()
 ):
     """
     Check & install packages, and run main function.
@@ -211,18 +224,42 @@ def main(
             The minimum requirement of python version.
         requirements (Iterable):
             PIP names of required package.
+        preload (Iterable[str], optional):
+            The modules imported in thread pool, while checking packages.
+        use_import_index (bool, optional):
+            Whether to use cached index of top-level module locations.
+        startup_tasks (Iterable[tuple], optional):
+            The (name, function, names of dependencies,
+            whether to run in worker process) of tasks,
+            run in thread pool before main function.
+            If given, the task name -> return value mapping is passed
+                as argument of main function.
     """
-    if _check_py_ver(min_py_ver):
-        return 1
-
-    if IS_ZIPFILE:
-        return_code = _zipapp_package_installer(requirements)
-    else:
-        return_code = _normal_package_checker(requirements)
-
+    with tracing.phase('check_py_ver'):
+        if _check_py_ver(min_py_ver):
+            return 1
+
+    _install_import_index(use_import_index)
+    preloader = start_preload(preload)
+    requirements = list(requirements)
+    startup_tasks = tuple(startup_tasks)
+    return_code = _install_requirements(requirements)
     if return_code == 0:
-        main_module = import_module(main_module_name)
-        return getattr(main_module, main_func_name)()
+        with tracing.phase('import_main_module', module=main_module_name):
+            main_module = import_module(main_module_name)
+        try:
+            args = (TaskGraph(startup_tasks, main_module).run(),) \
+                if startup_tasks else ()
+        finally:
+            process_tasks.shutdown()
+        preload_ms = preloader.wait()
+        _save_import_index(use_import_index)
+        tracing.flush()
+        metrics.record_launch(len(requirements), main_module_name, preload_ms)
+        updates.start_check()
+        return getattr(main_module, main_func_name)(*args)
+    preloader.wait()
+    tracing.flush()
     return return_code
 
 
@@ -238,6 +275,7 @@ def _check_imports() -> bool:
         `PySide6.QtWidgets.QVBoxLayout`
         `PySide6.QtWidgets.QLabel`
         `PySide6.QtWidgets.QSplashScreen`
+        `PySide6.QtWidgets.QProgressBar`
 
     And will define class `_Splash`.
 
@@ -256,6 +294,7 @@ def _check_imports() -> bool:
         global QVBoxLayout
         global QLabel
         global QSplashScreen
+        global QProgressBar
         if Qt is None:
             from PySide6.QtCore import Qt
         if QIcon is None:
@@ -270,6 +309,8 @@ def _check_imports() -> bool:
             from PySide6.QtWidgets import QLabel
         if QSplashScreen is None:
             from PySide6.QtWidgets import QSplashScreen
+        if QProgressBar is None:
+            from PySide6.QtWidgets import QProgressBar
     except (ModuleNotFoundError, ImportError):
         return True
 
@@ -291,18 +332,246 @@ def _check_imports() -> bool:
                 self.lb.setStyleSheet("font-size: 30px")
                 self.vl.addWidget(self.lb)
 
+                self.pb = QProgressBar(self)
+                self.pb.hide()
+                self.vl.addWidget(self.pb)
+
+            def set_text(self, text):
+                self.lb.setText(text)
+
+            def set_progress(self, value, maximum):
+                self.pb.setMaximum(maximum)
+                self.pb.setValue(value)
+                self.pb.show()
+
     return False
 
 
+class SplashProgress:
+    """
+    Report progress of initialization to the splash screen.
+
+    The methods can be called from any thread.
+    The splash is updated by GUI thread.
+    """
+
+    def __init__(self):
+        self.__updates = queue.SimpleQueue()
+
+    def set_text(self, text: str):
+        """
+        Change text of the splash.
+
+        Args:
+            text (str): The text to display.
+        """
+        self.__updates.put(('set_text', (text,)))
+
+    def set_progress(self, value: int, maximum: int = 100):
+        """
+        Show progress bar on the splash.
+
+        Args:
+            value (int): The current progress.
+            maximum (int, optional): The maximum progress. Default is 100.
+        """
+        self.__updates.put(('set_progress', (value, maximum)))
+
+    def apply(self, splash: '_Splash'):
+        """
+        Apply reported updates to the splash. (Must be called by GUI thread.)
+
+        Args:
+            splash (_Splash): The splash screen.
+        """
+        while True:
+            try:
+                method, args = self.__updates.get_nowait()
+            except queue.Empty:
+                return
+            getattr(splash, method)(*args)
+
+
+def _run_in_worker(
+    splash: '_Splash', progress: SplashProgress, func, *args
+):
+    """
+    Run function in worker thread, while processing Qt events.
+
+    Args:
+        splash (_Splash): The splash screen, to apply progress.
+        progress (SplashProgress): The progress reporter.
+        func (Callable): The function to run.
+        *args: The arguments of the function.
+
+    Returns:
+        Any: The return value of the function.
+
+    Raises:
+        BaseException: The exception raised by the function.
+    """
+    call = _BackgroundCall(func, *args)
+    while call.is_alive():
+        QApplication.processEvents()
+        progress.apply(splash)
+        call.join(_EVENT_INTERVAL)
+    progress.apply(splash)
+    QApplication.processEvents()
+    return call.result()
+
+
+def _accepts_progress(pre_main) -> bool:
+    """
+    Check pre_main function accepts progress reporter.
+
+    Args:
+        pre_main (Callable): The pre_main function.
+
+    Returns:
+        bool: If it accepts an argument, return True.
+    """
+    import inspect  # pylint: disable = import-outside-toplevel
+    try:
+        inspect.signature(pre_main).bind(None)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _call_pre_main(pre_main, progress: SplashProgress):
+    """
+    Call pre_main function, with progress reporter if it accepts.
+
+    Args:
+        pre_main (Callable): The pre_main function.
+        progress (SplashProgress): The progress reporter.
+
+    Returns:
+        Any: The return value of pre_main.
+    """
+    if _accepts_progress(pre_main):
+        return pre_main(progress)
+    return pre_main()
+
+
+def _prepare_main(
+    requirements: List[str], wait_missing, main_module_name: str,
+    pre_main_name: Optional[str], pre_main_process: bool,
+    pre_main_worker: bool, startup_tasks: tuple, progress: SplashProgress
+) -> tuple:
+    """
+    Install packages, import main module, run startup tasks
+    and pre_main. (worker thread)
+
+    Args:
+        requirements (List[str]): The requirement strings.
+        wait_missing (Callable[[], List[str]]):
+            Wait & get the requirement strings which is not satisfied.
+        main_module_name (str): The module that main function exists.
+        pre_main_name (Optional[str]): The name of pre_main function.
+        pre_main_process (bool): Whether to run pre_main in worker process.
+        pre_main_worker (bool):
+            Whether to run pre_main without argument in this thread.
+            (otherwise, it is returned to be called by GUI thread)
+        startup_tasks (tuple):
+            The (name, function, names of dependencies,
+            whether to run in worker process) of tasks.
+        progress (SplashProgress): The progress reporter.
+
+    Returns:
+        Tuple[int, Optional[module], tuple, Optional[Callable]]:
+            The return code of installer, main module,
+            additional arguments of main function
+            (return value of pre_main & results of startup tasks),
+            and pre_main to be called by GUI thread. (if not called)
+    """
+    return_code = _install_found(requirements, wait_missing)
+    if return_code != 0:
+        return return_code, None, (), None
+
+    with tracing.phase('import_main_module', module=main_module_name):
+        main_module = import_module(main_module_name)
+
+    args = ()
+    gui_pre_main = None
+    try:
+        task_results = TaskGraph(startup_tasks, main_module).run(progress)
+        if pre_main_name is not None:
+            pre_main = getattr(main_module, pre_main_name)
+            if not (pre_main_process or pre_main_worker
+                    or _accepts_progress(pre_main)):
+                # May create widgets, like before it ran in worker
+                gui_pre_main = pre_main
+            else:
+                with tracing.phase(
+                    'pre_main', function=pre_main_name,
+                    process=pre_main_process
+                ):
+                    if pre_main_process:
+                        res = process_tasks.call_in_process(pre_main)
+                    else:
+                        res = _call_pre_main(pre_main, progress)
+                args += (res,)
+    finally:
+        process_tasks.shutdown()
+    if startup_tasks:
+        args += (task_results,)
+    return 0, main_module, args, gui_pre_main
+
+
+def _traced_check_imports() -> bool:
+    """
+    Call `_check_imports` with tracing.
+
+    Returns:
+        bool: If import failed, return True. Otherwise, return False.
+    """
+    with tracing.phase('check_imports'):
+        return _check_imports()
+
+
+def _show_splash(splash_text: str) -> tuple:
+    """
+    Create Qt application & Show splash.
+
+    Args:
+        splash_text (str): The text displayed to splash screen.
+
+    Returns:
+        Tuple[QApplication, _Splash]: The created application & splash.
+    """
+    # pylint: disable = not-callable
+    with tracing.phase('create_application'):
+        app = QApplication()
+    with tracing.phase('show_splash'):
+        icon = get_icon()
+        if icon is not None:
+            app.setWindowIcon(icon)
+
+        splash = _Splash(app, splash_text)
+        splash.show()
+        QApplication.processEvents()
+    return app, splash
+
+
 def pyside6_splash_main(
     main_module_name: str, main_func_name: str,
     min_py_ver: Iterable, requirements: Iterable,
-    splash_text: str, pre_main_name: Optional[str] = None
+    splash_text: str, pre_main_name: Optional[str] = None,
+    preload: Iterable[str] = (), use_import_index: bool = False,
+    early_splash: bool = False, startup_tasks: Iterable[tuple] = (),
+    pre_main_process: bool = False, pre_main_worker: bool = False
 ):
     """
     Splash screen & intall packages.
-    1. Show PySide6 splash
-    2. Check & install packages
+    1. Import PySide6 (while checking packages in background)
+       and show PySide6 splash
+       (If early_splash is true, tkinter splash is shown until then)
+    2. Install packages, import main module, run startup tasks
+       and pre_main
+       (in worker thread, while GUI thread processes Qt events;
+       pre_main without argument runs in GUI thread after them,
+       unless pre_main_worker is true)
     3. Hide splash
     4. Then run the main function.
 
@@ -323,58 +592,117 @@ def pyside6_splash_main(
             The text displayed to splash screen.
         pre_main_name (str, optional):
             Function that must be called before main function run.
+            If it accepts an argument, `SplashProgress` is passed
+                to update the splash, and it runs in worker thread,
+                so it must not create widgets.
+            Otherwise, it runs in GUI thread (unless pre_main_worker).
             Return value of function will be used
                 as second argument of main function.
+            Large bytes-like object or NumPy array returned from worker
+                process is shared. (see `process_tasks`)
+        preload (Iterable[str], optional):
+            The modules imported in thread pool,
+            while checking packages & showing splash.
+        use_import_index (bool, optional):
+            Whether to use cached index of top-level module locations.
+        early_splash (bool, optional):
+            Whether to show tkinter splash until PySide6 splash is shown.
+        startup_tasks (Iterable[tuple], optional):
+            The (name, function, names of dependencies,
+            whether to run in worker process) of tasks,
+            run in thread pool before pre_main.
+            If given, the task name -> return value mapping is passed
+                as last argument of main function.
+        pre_main_process (bool, optional):
+            Whether to run pre_main in worker process.
+            (then `SplashProgress` is not passed)
+        pre_main_worker (bool, optional):
+            Whether to run pre_main without argument in worker thread
+            too. (then it must not create widgets)
     """
-    if _check_py_ver(min_py_ver):
-        return 1
-
-    # pylint: disable = not-callable
-    if _check_imports():  # When PySide6 is not installed
-        # Check missing packages and install (with PySide6)
-        if IS_ZIPFILE:
-            return_code = _zipapp_package_installer(requirements)
-        else:
-            return_code = _normal_package_checker(requirements)
-        if return_code != 0:
-            return return_code
-
-        # Create Qt application & Show splash
-        app = QApplication()
-        icon = get_icon()
-        if icon is not None:
-            app.setWindowIcon(icon)
+    with tracing.phase('check_py_ver'):
+        if _check_py_ver(min_py_ver):
+            return 1
 
-        splash = _Splash(app, splash_text)
-        splash.show()
+    early = show_early_splash(splash_text) if early_splash else None
+    try:
+        _install_import_index(use_import_index)
+        preloader = start_preload(preload)
+
+        # Import PySide6 & check requirements concurrently.
+        # Splash is shown as soon as PySide6 is imported.
+        requirements = list(requirements)
+        wait_missing = _BackgroundCall(_find_missing, requirements).result
+        with tracing.phase('wait_qt'):
+            pyside6_missing = _BackgroundCall(_traced_check_imports)\
+                .result(early)
+
+        if pyside6_missing:
+            # Install missing packages (with PySide6)
+            if early is not None:
+                early.set_text('Installing packages...')
+            return_code = _BackgroundCall(
+                _install_found, requirements, wait_missing
+            ).result(early)
+            if return_code != 0:
+                preloader.wait()
+                tracing.flush()
+                return return_code
+            with tracing.phase('check_imports'):
+                pyside6_missing = _check_imports()
+            if pyside6_missing:  # PySide6 is not installed correctly
+                preloader.wait()
+                tracing.flush()
+                return 1
+            wait_missing = list  # Already installed
+
+        app, splash = _show_splash(splash_text)
+    finally:
+        if early is not None:  # Hand off to PySide6 splash
+            early.close()
+
+    # Check another missing packages, import main module,
+    # run startup tasks and pre_main
+    progress = SplashProgress()
+    return_code, main_module, args, gui_pre_main = _run_in_worker(
+        splash, progress, _prepare_main, requirements, wait_missing,
+        main_module_name, pre_main_name, pre_main_process, pre_main_worker,
+        tuple(startup_tasks), progress
+    )
+    if gui_pre_main is not None:
+        with tracing.phase('pre_main', function=pre_main_name):
+            args = (gui_pre_main(),) + args
         QApplication.processEvents()
-    else:  # When PySide6 is installed
-        # Create Qt application & Show splash
-        app = QApplication()
-        icon = get_icon()
-        if icon is not None:
-            app.setWindowIcon(icon)
+    splash.hide()
+    preload_ms = preloader.wait()
+    if return_code == 0:
+        _save_import_index(use_import_index)
+    tracing.flush()
+    if return_code != 0:
+        return return_code
+    metrics.record_launch(len(requirements), main_module_name, preload_ms)
+    updates.start_check()
+    return getattr(main_module, main_func_name)(app, *args)
 
-        splash = _Splash(app, splash_text)
-        splash.show()
-        QApplication.processEvents()
 
-        # Check another missing packages
-        if IS_ZIPFILE:
-            return_code = _zipapp_package_installer(requirements)
-        else:
-            return_code = _normal_package_checker(requirements)
-        if return_code != 0:
-            splash.hide()
-            return return_code
-    QApplication.processEvents()
+def warm_up(
+    main_module_name: str, show_splash: bool, preload: Iterable[str] = ()
+):
+    """
+    Import modules used by launch, without running anything.
+    Used by warm launcher daemon, before forking launches.
 
-    main_module = import_module(main_module_name)
-    QApplication.processEvents()
-    if pre_main_name is not None:
-        res = getattr(main_module, pre_main_name)()
-        QApplication.processEvents()
-        splash.hide()
-        return getattr(main_module, main_func_name)(app, res)
-    splash.hide()
-    return getattr(main_module, main_func_name)(app)
+    Args:
+        main_module_name (str):
+            The module that main function exists.
+        show_splash (bool):
+            Whether PySide6 splash is used. (then PySide6 is imported)
+        preload (Iterable[str], optional):
+            The modules imported in thread pool.
+    """
+    with tracing.phase('warm_up'):
+        preloader = start_preload(preload)
+        if show_splash:
+            _check_imports()
+        import_module(main_module_name)
+        preloader.wait()  # No thread is left before fork
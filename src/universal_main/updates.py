@@ -0,0 +1,259 @@
+"""Background update staging for program environments.
+
+If launch.json `update_source` is set (with `app_env`), a background
+thread checks the source after the main function started. The source is
+a local directory of wheels or a package index URL.
+
+If newer (or newly required) distributions are found, a copy of the
+program environment (hardlinked, see `app_env`) is updated and
+published as `site-packages.next`. The next launch swaps it in with
+renames, so installs never run on the launch critical path.
+"""
+
+import os
+import sys
+import atexit
+import json
+import time
+import shutil
+import tempfile
+import functools
+import threading
+import subprocess
+from typing import Dict, List, Optional
+
+from .universal_constants import IS_WINDOWS
+from .requirement_checker import (
+    Requirement, check_to_install, installed_distributions, normalize_name,
+    parse_version
+)
+from . import app_env, tracing, wheel_installer
+
+
+LAST_CHECK_FILE = '.last_update_check'
+# Maximum seconds to wait unfinished check at interpreter exit
+EXIT_TIMEOUT = 60.0
+
+_source = None
+_requirements = ()
+_interval = 0
+_thread = None
+
+
+def configure(
+    source: Optional[str], requirements, interval: float = 24 * 60 * 60
+):
+    """Set package source & requirements to check.
+
+    Args:
+        source (Optional[str]):
+            The directory of wheels, or package index URL.
+            If None, updates are not checked.
+        requirements (Iterable[str]): The requirement strings.
+        interval (float, optional):
+            The minimum seconds between checks. Default is a day.
+    """
+    # pylint: disable = global-statement
+    global _source, _requirements, _interval
+    _source = source
+    _requirements = tuple(requirements)
+    _interval = interval
+
+
+def _source_args(source: str) -> List[str]:
+    if os.path.isdir(source):
+        return ['--no-index', '--find-links', os.path.abspath(source)]
+    return ['--index-url', source]
+
+
+def _run_pip(args: List[str]) -> subprocess.CompletedProcess:
+    """Run pip quietly, without console window."""
+    kwargs = {'creationflags': subprocess.CREATE_NO_WINDOW} \
+        if IS_WINDOWS else {}
+    return subprocess.run(
+        [
+            sys.executable, '-m', 'pip', '--disable-pip-version-check',
+            '--no-input', *args
+        ],
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, check=False, **kwargs
+    )
+
+
+def _is_applicable(raw: str) -> bool:
+    try:
+        return Requirement(raw).is_applicable()
+    except ValueError:  # ex: URL or path, which pip only can parse
+        return True
+
+
+def find_updates(
+    source: str, requirements: List[str],
+    installed: Optional[Dict[str, str]] = None,
+    available: Optional[Dict[str, str]] = None
+) -> List[str]:
+    """Find distributions to install or upgrade, from the source.
+
+    Resolved by `pip install --dry-run --report`. (pip >= 22.2)
+
+    Args:
+        source (str): The directory of wheels, or package index URL.
+        requirements (List[str]): The requirement strings.
+        installed (Dict[str, str], optional):
+            The normalized name -> installed version, which resolved
+            version is compared with. (ex: of program environment)
+            Default is result of `installed_distributions()`.
+        available (Dict[str, str], optional):
+            The normalized name -> version of distributions on import
+            paths. (ex: interpreter's site-packages) Distributions not
+            in `installed` but here are not newly required.
+            Default is same as `installed`.
+
+    Returns:
+        List[str]:
+            The pinned requirement strings (ex: `numpy==1.26.4`)
+            which are newer than installed, or not available.
+            If installed or resolved version is not valid, it is skipped.
+    """
+    requirements = [raw for raw in requirements if _is_applicable(raw)]
+    if not requirements:
+        return []
+    result = _run_pip([
+        'install', '--dry-run', '--ignore-installed', '--quiet',
+        '--report', '-', *_source_args(source), *requirements
+    ])
+    if result.returncode != 0:
+        return []
+    try:
+        report = json.loads(result.stdout)
+        resolved = [
+            (item['metadata']['name'], item['metadata']['version'])
+            for item in report['install']
+        ]
+    except (ValueError, KeyError, TypeError):
+        return []
+
+    if installed is None:
+        installed = installed_distributions()
+    if available is None:
+        available = installed
+    to_install = []
+    for name, version in resolved:
+        name_key = normalize_name(name)
+        current = installed.get(name_key)
+        if current is None and name_key in available:
+            continue  # Satisfied out of program environment
+        if current is not None:
+            new_key, current_key = parse_version(version), \
+                parse_version(current)
+            if new_key is None or current_key is None \
+                    or new_key <= current_key:
+                continue
+        to_install.append(f'{name}=={version}')
+    return to_install
+
+
+def _install_quietly(source: str, to_install: List[str], target: str) -> int:
+    if os.path.isdir(source) \
+            and wheel_installer.install(to_install, target, source):
+        return 0
+    return _run_pip([
+        'install', '--quiet', '--target', target,
+        *_source_args(source), *to_install
+    ]).returncode
+
+
+def stage(
+    source: str, requirements: List[str], site_path: str
+) -> List[str]:
+    """Prepare updated copy of the program environment.
+
+    Args:
+        source (str): The directory of wheels, or package index URL.
+        requirements (List[str]): The requirement strings.
+        site_path (str): The site directory of program environment.
+            (it must be on `sys.path`)
+
+    Returns:
+        List[str]: The staged requirement strings. (empty if up to date)
+    """
+    # Newer than program environment, or missing on import paths
+    to_install = find_updates(
+        source, requirements, installed_distributions([site_path]),
+        installed_distributions()
+    )
+    pending = site_path + app_env.PENDING_SUFFIX
+    if os.path.isdir(pending):  # Already staged
+        to_install = check_to_install(
+            to_install, installed_distributions([pending])
+        )
+    if not to_install:
+        return []
+
+    tmp_dir = tempfile.mkdtemp(
+        prefix='.tmp-next-', dir=os.path.dirname(site_path)
+    )
+    try:
+        next_site = tmp_dir + '/site-packages'
+        app_env.clone(site_path, next_site)
+        return_code = app_env.install(
+            to_install, functools.partial(_install_quietly, source),
+            next_site
+        )
+        if return_code != 0:
+            return []
+        # Replace older pending one. (it is not used by anyone)
+        shutil.rmtree(pending, ignore_errors=True)
+        os.rename(next_site, pending)
+        return to_install
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _check(source: str, requirements: List[str], site_path: str):
+    marker = os.path.join(os.path.dirname(site_path), LAST_CHECK_FILE)
+    try:
+        if time.time() - os.stat(marker).st_mtime < _interval:
+            return
+    except OSError:
+        pass
+
+    app_env.cleanup_stale(site_path)
+    with tracing.phase('stage_updates') as trace_args:
+        trace_args['staged'] = stage(source, requirements, site_path)
+    # Only after finished, so interrupted check is retried at next launch
+    try:
+        with open(marker, 'w', encoding='utf-8'):
+            pass
+    except OSError:
+        pass
+
+
+def _wait_check():
+    """Wait started check at interpreter exit, at most `EXIT_TIMEOUT`."""
+    if _thread is not None:
+        _thread.join(EXIT_TIMEOUT)
+
+
+def start_check() -> Optional[threading.Thread]:
+    """Start checking updates in background, if configured.
+
+    Call this after startup work is done. (ex: before main function)
+    If the program exits earlier, exit waits the check at most
+    `EXIT_TIMEOUT` seconds.
+
+    Returns:
+        Optional[threading.Thread]:
+            The started thread, or None if not configured.
+    """
+    global _thread  # pylint: disable = global-statement
+    site_path = app_env.active_site_dir()
+    if _source is None or site_path is None or _thread is not None:
+        return None
+    _thread = threading.Thread(
+        target=_check, args=(_source, list(_requirements), site_path),
+        name='universal_main-updates', daemon=True
+    )
+    _thread.start()
+    atexit.register(_wait_check)
+    return _thread
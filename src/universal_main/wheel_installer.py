@@ -0,0 +1,596 @@
+"""In-process installer of local wheels.
+
+If launch.json `wheel_dir` is set, missing requirements are installed
+from wheels in that directory without pip: compatible wheels are picked
+for the requirements & their dependencies, then extracted directly
+(one thread per wheel) with `RECORD` & `INSTALLER` metadata.
+
+Wheels are extracted & verified (sha256 of `RECORD`, which must list
+every file) in a staging directory next to the site directory first.
+The site directory is not touched if any wheel is invalid. Then files
+are moved into it with renames; if an error occurs while moving
+(ex: disk full), moved files are moved back. (See `app_env.merge`)
+
+pip is still used (by caller) if dependencies cannot be resolved from
+the directory with simple rules (newest compatible wheel, no
+backtracking), or a wheel needs install schemes other than
+site-packages. (ex: `.data/scripts`) Console scripts are not generated.
+"""
+
+import os
+import csv
+import sys
+import time
+import base64
+import shutil
+import hashlib
+import platform
+import sysconfig
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .requirement_checker import (
+    Requirement, installed_distributions, normalize_name, parse_version
+)
+from . import app_env, tracing, universal_constants
+
+
+INSTALLER_NAME = 'universal_main'
+MAX_WORKERS = 8
+STAGING_PREFIX = '.tmp-install-'
+# Oldest glibc of manylinux tags (manylinux1 = glibc 2.5)
+_MIN_GLIBC = {'x86_64': 5, 'i686': 5}
+_LEGACY_MANYLINUX = {
+    17: 'manylinux2014', 12: 'manylinux2010', 5: 'manylinux1'
+}
+
+_wheel_dir = None
+_supported_tags = None
+
+
+def configure(wheel_dir: Optional[str]):
+    """Set directory of local wheels.
+
+    Args:
+        wheel_dir (Optional[str]):
+            The directory. (relative to the program directory)
+            If None, the in-process installer is not used.
+    """
+    global _wheel_dir  # pylint: disable = global-statement
+    _wheel_dir = None if wheel_dir is None \
+        else os.path.join(universal_constants.PROGRAM_DIR, wheel_dir)
+
+
+def get_wheel_dir() -> Optional[str]:
+    """Get the configured directory of wheels.
+
+    Returns:
+        Optional[str]: The directory, or None if not configured.
+    """
+    return _wheel_dir
+
+
+def _interpreter() -> Tuple[str, str]:
+    """Get (interpreter tag, ABI tag). (ex: `cp311`, `cp311`)"""
+    major, minor = sys.version_info[:2]
+    if sys.implementation.name != 'cpython':
+        soabi = (sysconfig.get_config_var('SOABI') or '').split('-')
+        return (
+            f'{sys.implementation.name[:2]}{major}{minor}',
+            '_'.join(soabi[:2]) if len(soabi) > 1 else 'none'
+        )
+    abi = f'cp{major}{minor}'
+    if sysconfig.get_config_var('Py_GIL_DISABLED'):
+        abi += 't'
+    if sysconfig.get_config_var('Py_DEBUG'):
+        abi += 'd'
+    return f'cp{major}{minor}', abi
+
+
+def _glibc_minor() -> Optional[int]:
+    try:
+        name, version = os.confstr('CS_GNU_LIBC_VERSION').split()
+        major, minor = version.split('.')[:2]
+    except (AttributeError, OSError, TypeError, ValueError):
+        return None
+    return int(minor) if name == 'glibc' and major == '2' else None
+
+
+def _platform_tags() -> List[str]:
+    """Get compatible platform tags, from most specific one."""
+    base = sysconfig.get_platform().replace('-', '_').replace('.', '_')
+    if base.startswith('linux_'):
+        arch = base[6:]
+        if arch == 'x86_64' and sys.maxsize <= 2 ** 32:  # 32-bit Python
+            arch = 'i686'
+        tags = []
+        glibc = _glibc_minor()
+        if glibc is not None:
+            for minor in range(glibc, _MIN_GLIBC.get(arch, 17) - 1, -1):
+                tags.append(f'manylinux_2_{minor}_{arch}')
+                legacy = _LEGACY_MANYLINUX.get(minor)
+                if legacy is not None and (
+                    minor == 17 or arch in ('x86_64', 'i686')
+                ):
+                    tags.append(f'{legacy}_{arch}')
+        return tags + [f'linux_{arch}']
+    if base.startswith('macosx_'):
+        arch = platform.machine()
+        try:
+            major, minor = map(int, platform.mac_ver()[0].split('.')[:2])
+        except ValueError:
+            return [base]
+        versions = [(version, 0) for version in range(major, 10, -1)]
+        if arch == 'x86_64':
+            versions += [
+                (10, version)
+                for version in range(minor if major == 10 else 16, 3, -1)
+            ]
+        formats = [arch, 'universal2'] + (
+            ['intel', 'fat64', 'fat3', 'universal']
+            if arch == 'x86_64' else []
+        )
+        return [
+            f'macosx_{version_major}_{version_minor}_{binary_format}'
+            for version_major, version_minor in versions
+            for binary_format in formats
+        ]
+    return [base]
+
+
+def compatible_tags(
+    interpreter: Optional[str] = None, platforms: Optional[List[str]] = None
+) -> List[Tuple[str, str, str]]:
+    """Get wheel tags compatible with an interpreter, from most preferred.
+
+    Args:
+        interpreter (str, optional):
+            The interpreter tag. (ex: `cp311`) Default is running one.
+        platforms (List[str], optional):
+            The platform tags, from most specific one.
+            (ex: `manylinux_2_17_x86_64`) Default is running platform.
+
+    Returns:
+        List[Tuple[str, str, str]]:
+            The (python tag, ABI tag, platform tag) tuples.
+    """
+    if interpreter is None:
+        interpreter, abi = _interpreter()
+    else:
+        abi = interpreter if interpreter.startswith('cp') else 'none'
+    platforms = platforms or _platform_tags()
+    major, minor = interpreter[2], int(interpreter[3:] or 0)
+    stable_abi = interpreter.startswith('cp') and not abi.endswith('t')
+
+    tags = [(interpreter, abi, plat) for plat in platforms]
+    if stable_abi:
+        tags += [(interpreter, 'abi3', plat) for plat in platforms]
+    if abi != 'none':
+        tags += [(interpreter, 'none', plat) for plat in platforms]
+    if stable_abi:
+        tags += [
+            (f'cp{major}{version}', 'abi3', plat)
+            for version in range(minor - 1, 1, -1) for plat in platforms
+        ]
+    py_versions = [f'py{major}{version}' for version in range(minor, -1, -1)]
+    py_versions.insert(1, f'py{major}')
+    tags += [
+        (python, 'none', plat) for python in py_versions for plat in platforms
+    ]
+    tags.append((interpreter, 'none', 'any'))
+    tags += [(python, 'none', 'any') for python in py_versions]
+    return tags
+
+
+def supported_tags() -> List[Tuple[str, str, str]]:
+    """Get wheel tags supported by running interpreter, from most preferred.
+
+    Returns:
+        List[Tuple[str, str, str]]:
+            The (python tag, ABI tag, platform tag) tuples.
+    """
+    global _supported_tags  # pylint: disable = global-statement
+    if _supported_tags is None:
+        _supported_tags = compatible_tags()
+    return _supported_tags
+
+
+class Wheel:
+    """The wheel file.
+
+    Attributes:
+        path (str): The path of wheel file.
+        name (str): The normalized distribution name.
+        version (str): The version.
+        build (str): The build tag. (empty if absent)
+        tags (Set[Tuple[str, str, str]]):
+            The (python tag, ABI tag, platform tag) tuples.
+    """
+    __slots__ = ('path', 'name', 'version', 'build', 'tags')
+
+    def __init__(self, path: str):
+        """Parse file name of the wheel.
+
+        Args:
+            path (str): The path of wheel file.
+
+        Raises:
+            ValueError: If it is not valid wheel file name.
+        """
+        parts = os.path.basename(path)[:-4].split('-')
+        if not path.endswith('.whl') or len(parts) not in (5, 6) \
+                or parse_version(parts[1]) is None:
+            raise ValueError(f'Invalid wheel file name: {path!r}')
+        self.path = path
+        self.name = normalize_name(parts[0])
+        self.version = parts[1]
+        self.build = parts[2] if len(parts) == 6 else ''
+        python, abi, plat = parts[-3:]
+        self.tags = {
+            (python_tag, abi_tag, plat_tag)
+            for python_tag in python.split('.')
+            for abi_tag in abi.split('.')
+            for plat_tag in plat.split('.')
+        }
+
+    def __repr__(self) -> str:
+        return f'Wheel({os.path.basename(self.path)!r})'
+
+    def rank(self, tags: List[Tuple[str, str, str]]) -> Optional[int]:
+        """Get preference of the wheel. (lower is better)
+
+        Args:
+            tags (List[Tuple[str, str, str]]): The supported tags.
+
+        Returns:
+            Optional[int]: The index of best matching tag, or None
+                if the wheel is not compatible.
+        """
+        return min(
+            (index for index, tag in enumerate(tags) if tag in self.tags),
+            default=None
+        )
+
+    def requires(self, extras: Iterable[str] = ()) -> List[Requirement]:
+        """Read applicable `Requires-Dist` of the wheel.
+
+        Args:
+            extras (Iterable[str], optional): The requested extras.
+
+        Returns:
+            List[Requirement]: The dependencies.
+
+        Raises:
+            ValueError: If metadata is not found or not valid.
+        """
+        extras = tuple(extras)
+        with zipfile.ZipFile(self.path) as archive:
+            metadata = archive.read(_dist_info(archive) + '/METADATA')
+        requires = []
+        for line in metadata.decode('utf-8').splitlines():
+            if not line.strip():  # End of headers
+                break
+            if line.startswith('Requires-Dist:'):
+                requires.append(Requirement(line[14:].strip()))
+        return [
+            requirement for requirement in requires
+            if requirement.is_applicable()
+            or any(requirement.is_applicable(extra) for extra in extras)
+        ]
+
+
+def _dist_info(archive: zipfile.ZipFile) -> str:
+    """Get name of `.dist-info` directory in the wheel."""
+    for name in archive.namelist():
+        top = name.split('/', 1)[0]
+        if top.endswith('.dist-info'):
+            return top
+    raise ValueError(f'{archive.filename}: .dist-info is not found')
+
+
+def find_wheels(directory: str) -> Dict[str, List[Wheel]]:
+    """Find compatible wheels in the directory.
+
+    Args:
+        directory (str): The directory of wheels.
+
+    Returns:
+        Dict[str, List[Wheel]]:
+            The normalized name -> wheels, from most preferred one.
+            (newest version, then best matching tags)
+    """
+    tags = supported_tags()
+    wheels = {}
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return wheels
+    for name in names:
+        if not name.endswith('.whl'):
+            continue
+        try:
+            wheel = Wheel(os.path.join(directory, name))
+        except ValueError:
+            continue
+        rank = wheel.rank(tags)
+        if rank is not None:
+            wheels.setdefault(wheel.name, []).append((wheel, rank))
+    return {
+        name: [
+            wheel for wheel, _ in sorted(
+                candidates,
+                key=lambda item: (
+                    parse_version(item[0].version), item[0].build, -item[1]
+                ),
+                reverse=True
+            )
+        ]
+        for name, candidates in wheels.items()
+    }
+
+
+def resolve(
+    to_install: List[str], wheels: Dict[str, List[Wheel]],
+    installed: Optional[Dict[str, str]] = None
+) -> Optional[List[Wheel]]:
+    """Pick wheels of the requirements & their missing dependencies.
+
+    Args:
+        to_install (List[str]): The requirement strings to install.
+        wheels (Dict[str, List[Wheel]]): The result of `find_wheels`.
+        installed (Dict[str, str], optional):
+            The normalized name -> installed version.
+            Default is result of `installed_distributions()`.
+
+    Returns:
+        Optional[List[Wheel]]:
+            The wheels to install, or None if they cannot be resolved
+            with the wheels. (missing or conflicting)
+    """
+    if installed is None:
+        installed = installed_distributions()
+    chosen = {}
+    extras_done = {}
+    try:
+        pending = [Requirement(raw) for raw in to_install]
+        direct = {requirement.name for requirement in pending}
+        while pending:
+            requirement = pending.pop()
+            if not requirement.is_applicable():
+                continue
+            name = requirement.name
+            wheel = chosen.get(name)
+            if wheel is None:
+                version = installed.get(name)
+                if name not in direct and version is not None \
+                        and requirement.is_satisfied_by(version):
+                    continue
+                wheel = next((
+                    candidate for candidate in wheels.get(name, ())
+                    if requirement.is_satisfied_by(candidate.version)
+                ), None)
+                if wheel is None:
+                    return None
+                chosen[name] = wheel
+                extras_done[name] = set()
+                pending += wheel.requires()
+            elif not requirement.is_satisfied_by(wheel.version):
+                return None  # Conflict: pip can backtrack
+            new_extras = set(requirement.extras) - extras_done[name]
+            if new_extras:
+                extras_done[name] |= new_extras
+                pending += wheel.requires(new_extras)
+    except (OSError, ValueError, zipfile.BadZipFile):
+        return None  # Broken wheel, or requirement pip only can parse
+    return list(chosen.values())
+
+
+class UnsupportedWheel(Exception):
+    """The wheel needs features which are not supported."""
+
+
+def _record_hash(digest: bytes) -> str:
+    return 'sha256=' + base64.urlsafe_b64encode(digest).decode('ascii')\
+        .rstrip('=')
+
+
+def _expected_hashes(archive: zipfile.ZipFile, record: str) -> Dict[str, str]:
+    rows = csv.reader(archive.read(record).decode('utf-8').splitlines())
+    return {row[0]: row[1] for row in rows if len(row) > 1 and row[1]}
+
+
+def _extract(wheel: Wheel, staging: str, requested: bool):
+    """Extract a wheel into the staging directory & write metadata.
+
+    Raises:
+        UnsupportedWheel: If the wheel has files of other schemes.
+        ValueError: If the wheel is not valid.
+            (ex: hash mismatch, file not in `RECORD`)
+    """
+    with zipfile.ZipFile(wheel.path) as archive:
+        dist_info = _dist_info(archive)
+        data_dir = dist_info[:-10] + '.data'
+        record = dist_info + '/RECORD'
+        expected = _expected_hashes(archive, record)
+        # Signatures of RECORD are not listed in it
+        signatures = (record + '.jws', record + '.p7s')
+
+        rows = []
+        for info in archive.infolist():
+            if info.filename.endswith('/') or info.filename == record:
+                continue
+            if info.filename not in expected \
+                    and info.filename not in signatures:
+                raise ValueError(f'{wheel!r}: not in RECORD {info.filename}')
+            parts = info.filename.split('/')
+            if parts[0] == data_dir:
+                if len(parts) < 3 or parts[1] not in ('purelib', 'platlib'):
+                    raise UnsupportedWheel(f'{wheel!r}: {info.filename}')
+                parts = parts[2:]
+            if parts[0] in ('', os.pardir) or os.pardir in parts \
+                    or ':' in parts[0]:
+                raise ValueError(f'{wheel!r}: unsafe path {info.filename}')
+
+            relative = '/'.join(parts)
+            destination = os.path.join(staging, *parts)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            digest = hashlib.sha256()
+            with archive.open(info) as source, \
+                    open(destination, 'wb') as file:
+                for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                    digest.update(chunk)
+                    file.write(chunk)
+            hash_value = _record_hash(digest.digest())
+            if expected.get(info.filename, hash_value) != hash_value:
+                raise ValueError(f'{wheel!r}: hash mismatch {info.filename}')
+            if (info.external_attr >> 16) & 0o111:
+                os.chmod(destination, 0o755)
+            rows.append((relative, hash_value, str(info.file_size)))
+
+    metadata = {'INSTALLER': f'{INSTALLER_NAME}\n'.encode('utf-8')}
+    if requested:  # PEP 376: installed by user request (not dependency)
+        metadata['REQUESTED'] = b''
+    for name, content in metadata.items():
+        with open(os.path.join(staging, dist_info, name), 'wb') as file:
+            file.write(content)
+        rows.append((
+            f'{dist_info}/{name}',
+            _record_hash(hashlib.sha256(content).digest()), str(len(content))
+        ))
+    rows.append((record, '', ''))
+    with open(
+        os.path.join(staging, dist_info, 'RECORD'), 'w', encoding='utf-8',
+        newline=''
+    ) as file:
+        csv.writer(file, lineterminator='\n').writerows(rows)
+
+
+def _remove_stale(directory: str):
+    """Remove staging/backup directories left by crashed installs."""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    now = time.time()
+    for entry in entries:
+        try:
+            if entry.name.startswith(
+                (STAGING_PREFIX, app_env.BACKUP_PREFIX)
+            ) and now - entry.stat().st_mtime > app_env.STALE_TMP_SECONDS:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def _make_staging(target: str) -> str:
+    """Make staging directory on same file system as the site directory.
+
+    It is made next to the site directory, so it is never seen in the
+    site directory. If the parent is not writable, it is made in the
+    site directory.
+
+    Returns:
+        str: The staging directory.
+    """
+    parent = os.path.dirname(os.path.abspath(target))
+    _remove_stale(parent)
+    try:
+        return tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=parent)
+    except OSError:  # Ex: only site-packages is writable
+        pass
+    _remove_stale(target)
+    return tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=target)
+
+
+def install_wheels(
+    wheels: List[Wheel], target: str, requested: Set[str] = frozenset()
+) -> List[str]:
+    """Install wheels into the site directory.
+
+    All wheels are extracted & verified before the site directory is
+    changed. If moving files into it fails, it is restored.
+    (See `app_env.merge`)
+
+    Args:
+        wheels (List[Wheel]): The wheels.
+        target (str): The site directory.
+        requested (Set[str], optional):
+            The normalized names requested by user. (not dependencies)
+
+    Returns:
+        List[str]: The `.dist-info` paths of installed distributions.
+
+    Raises:
+        UnsupportedWheel: If a wheel needs features not supported.
+        ValueError: If a wheel is not valid.
+        OSError: If files cannot be written.
+    """
+    os.makedirs(target, exist_ok=True)
+    staging = _make_staging(target)
+    try:
+        with ThreadPoolExecutor(
+            min(len(wheels), MAX_WORKERS) or 1,
+            thread_name_prefix='universal_main-wheel'
+        ) as executor:
+            for future in [
+                executor.submit(
+                    _extract, wheel, staging, wheel.name in requested
+                )
+                for wheel in wheels
+            ]:
+                future.result()  # Raise error of extraction
+        return app_env.merge(staging, target)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def _default_target() -> Optional[str]:
+    """Get writable site-packages of the interpreter, if any."""
+    paths = sysconfig.get_paths()
+    if paths['purelib'] != paths['platlib']:  # Scheme split: leave to pip
+        return None
+    target = paths['purelib']
+    return target if os.access(target, os.W_OK) else None
+
+
+def install(
+    to_install: List[str], target: Optional[str] = None,
+    wheel_dir: Optional[str] = None
+) -> bool:
+    """Install requirements from local wheels, if possible.
+
+    Args:
+        to_install (List[str]): The requirement strings to install.
+        target (str, optional):
+            The site directory. Default is site-packages of interpreter.
+        wheel_dir (str, optional):
+            The directory of wheels. Default is configured one.
+
+    Returns:
+        bool:
+            If installed, return True. If not possible (then pip should
+            be used), return False. Nothing is installed then.
+    """
+    wheel_dir = wheel_dir or _wheel_dir
+    if wheel_dir is None or not to_install:
+        return False
+    with tracing.phase('install_wheels') as trace_args:
+        target = target or _default_target()
+        wheels = None if target is None \
+            else resolve(to_install, find_wheels(wheel_dir))
+        if wheels is None:
+            trace_args['error'] = 'not resolved'
+            return False
+        trace_args['wheels'] = len(wheels)
+        try:
+            install_wheels(
+                wheels, target,
+                {Requirement(raw).name for raw in to_install}
+            )
+        except (UnsupportedWheel, ValueError, OSError,
+                zipfile.BadZipFile) as exc:
+            trace_args['error'] = f'{type(exc).__name__}: {exc}'
+            return False
+    return True
@@ -0,0 +1,110 @@
+"""Offline wheelhouse bundled in the zipapp.
+
+`build` can pack pinned wheels of requirements into `wheelhouse/` of the
+zipapp, with their sha256 in `wheelhouse/hashes.json`:
+
+    {"version": 1, "wheels": {"<file name>.whl": "<sha256 hex>", ...}}
+
+On install, wheels compatible with the interpreter are extracted
+(& verified) once into the extraction cache, then requirements are
+installed from there first: in-process, then pip without index.
+So production boxes without (or with slow) network can launch.
+"""
+
+import json
+import hashlib
+from typing import Dict, Optional
+
+from .resources import get_zipapp, zipapp_index
+from .wheel_installer import Wheel, supported_tags
+from . import extract_cache, tracing
+
+
+WHEELHOUSE_DIR = 'wheelhouse/'
+HASHES_FILE = WHEELHOUSE_DIR + 'hashes.json'
+HASHES_VERSION = 1
+
+_path = None
+
+
+def read_hashes(data: bytes) -> Dict[str, str]:
+    """Parse `hashes.json`.
+
+    Args:
+        data (bytes): The contents of `hashes.json`.
+
+    Returns:
+        Dict[str, str]: The wheel file name -> sha256 in hex.
+
+    Raises:
+        ValueError: If it is not valid.
+    """
+    hashes = json.loads(data)
+    if not isinstance(hashes, dict) \
+            or hashes.get('version') != HASHES_VERSION \
+            or not isinstance(hashes.get('wheels'), dict):
+        raise ValueError(f'{HASHES_FILE}: not supported format')
+    return hashes['wheels']
+
+
+def _compatible(name: str) -> bool:
+    try:
+        return Wheel(name).rank(supported_tags()) is not None
+    except ValueError:
+        return False
+
+
+def _extract_verified(archive, names: Dict[str, str], tmp_dir: str):
+    """Extract wheels with verifying their hashes.
+
+    Raises:
+        ValueError: If hash of a wheel does not match.
+    """
+    for name, expected in names.items():
+        digest = hashlib.sha256()
+        with archive.open(WHEELHOUSE_DIR + name) as source, \
+                open(f'{tmp_dir}/{name}', 'wb') as file:
+            for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                digest.update(chunk)
+                file.write(chunk)
+        if digest.hexdigest() != expected.lower():
+            raise ValueError(f'{WHEELHOUSE_DIR}{name}: hash mismatch')
+
+
+def get_wheelhouse() -> Optional[str]:
+    """Get directory of verified wheels, extracted from the zipapp.
+
+    Only wheels compatible with the interpreter are extracted.
+
+    Returns:
+        Optional[str]: The directory (ends with `/`), or None if the
+            zipapp has no wheelhouse (or it is broken).
+    """
+    global _path  # pylint: disable = global-statement
+    if _path is not None:
+        return _path
+    archive = get_zipapp()
+    if archive is None or HASHES_FILE not in zipapp_index():
+        return None
+
+    with tracing.phase('extract_wheelhouse') as trace_args:
+        try:
+            hashes = read_hashes(archive.read(HASHES_FILE))
+            names = {
+                name: digest for name, digest in sorted(hashes.items())
+                if _compatible(name)
+                and WHEELHOUSE_DIR + name in zipapp_index()
+            }
+            key = extract_cache.member_fingerprint(
+                archive, [HASHES_FILE] + [
+                    WHEELHOUSE_DIR + name for name in names
+                ]
+            )
+            _path = extract_cache.get_directory(
+                key, lambda tmp_dir: _extract_verified(archive, names, tmp_dir)
+            )
+        except (OSError, ValueError) as exc:  # Broken wheelhouse
+            trace_args['error'] = f'{type(exc).__name__}: {exc}'
+            return None
+        trace_args['wheels'] = len(names)
+    return _path
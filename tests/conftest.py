@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The package is not installed; import it from `src`.
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+)
@@ -0,0 +1,106 @@
+import os
+
+import pytest
+
+from universal_main import app_env
+
+
+def _make_dist(site, name, version, files):
+    dist_info = f'{name}-{version}.dist-info'
+    records = []
+    for path, content in files.items():
+        os.makedirs(os.path.dirname(os.path.join(site, path)), exist_ok=True)
+        with open(os.path.join(site, path), 'w', encoding='utf-8') as file:
+            file.write(content)
+        records.append(f'{path},,\n')
+    os.makedirs(os.path.join(site, dist_info))
+    with open(
+        os.path.join(site, dist_info, 'RECORD'), 'w', encoding='utf-8'
+    ) as file:
+        file.writelines(records + [f'{dist_info}/RECORD,,\n'])
+
+
+def _snapshot(site):
+    files = {}
+    for root, dirs, names in os.walk(site):
+        for name in dirs + names:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, site)
+            if os.path.isdir(path):
+                files[relative] = None
+            else:
+                with open(path, 'r', encoding='utf-8') as file:
+                    files[relative] = file.read()
+    return files
+
+
+@pytest.fixture(name='dirs')
+def fixture_dirs(tmp_path):
+    site, staging = str(tmp_path / 'site'), str(tmp_path / 'staging')
+    _make_dist(site, 'pkg', '1.0', {
+        'pkg/__init__.py': 'old', 'pkg/old.py': 'old', 'pkg/sub/a.py': 'old'
+    })
+    _make_dist(site, 'other', '1.0', {'other.py': 'other'})
+    _make_dist(staging, 'pkg', '2.0', {
+        'pkg/__init__.py': 'new', 'pkg/new/b.py': 'new', 'extra/c.py': 'new'
+    })
+    return site, staging
+
+
+def test_merge(dirs):
+    site, staging = dirs
+    assert app_env.merge(staging, site) == [
+        os.path.join(site, 'pkg-2.0.dist-info')
+    ]
+    files = _snapshot(site)
+    assert files['pkg/__init__.py'] == 'new'
+    assert files['other.py'] == 'other'
+    assert 'pkg-1.0.dist-info' not in files
+    assert 'pkg/old.py' not in files and 'pkg/sub' not in files
+    assert files['pkg/new/b.py'] == files['extra/c.py'] == 'new'
+    # Backup directory is removed.
+    assert os.listdir(os.path.dirname(site)) == ['site', 'staging']
+
+
+def test_merge_failure_leaves_site_unchanged(dirs, monkeypatch):
+    site, staging = dirs
+    before = _snapshot(site)
+    replace = os.replace
+    calls = []
+
+    def failing_replace(source, destination):
+        calls.append(source)
+        if len(calls) == fail_at:
+            raise OSError('disk full')
+        replace(source, destination)
+
+    monkeypatch.setattr(app_env.os, 'replace', failing_replace)
+    # Fail at every rename, from first one to last one
+    fail_at = 1
+    while True:
+        calls.clear()
+        try:
+            app_env.merge(staging, site)
+        except OSError:
+            assert _snapshot(site) == before
+            assert sorted(os.listdir(os.path.dirname(site))) \
+                == ['site', 'staging']
+            fail_at += 1
+        else:
+            break
+    assert fail_at > 5
+    assert _snapshot(site)['pkg/__init__.py'] == 'new'
+
+
+def test_cleanup_store_checks_given_files(tmp_path, monkeypatch):
+    store = str(tmp_path / 'store') + '/'
+    monkeypatch.setattr(app_env, 'STORE_DIR', store)
+    for digest in ('aa01', 'bb02'):
+        os.makedirs(store + digest[:2])
+        with open(store + f'{digest[:2]}/{digest}', 'w', encoding='utf-8'):
+            pass
+    app_env.cleanup_store(['aa01', 'ffff'])
+    assert not os.path.exists(store + 'aa/aa01')
+    assert os.path.exists(store + 'bb/bb02')  # Not checked
+    app_env.cleanup_store()
+    assert not os.path.exists(store + 'bb/bb02')
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import signal
+import socket
+import types
+
+import pytest
+
+from universal_main import daemon
+
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, 'fork') or not hasattr(socket, 'AF_UNIX'),
+    reason='daemon is POSIX only'
+)
+
+
+def _serve(path: str, exit_code: int, reply_delay: float):
+    """Serve launches in forked process, replying pid after delay."""
+    pid = os.fork()
+    if pid:
+        return pid
+    try:
+        real_fork = os.fork
+
+        def slow_fork():  # Parent is slow to reply, child exits at once
+            child = real_fork()
+            if child:
+                time.sleep(reply_delay)
+            return child
+
+        os.fork = slow_fork
+        daemon.fingerprint = lambda: 'fingerprint'
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen(1)
+        listener.settimeout(0.1)
+        manifest = types.SimpleNamespace(daemon_idle_timeout=5, trace=None)
+        daemon._serve_forever(  # pylint: disable = protected-access
+            listener, 'fingerprint', manifest, lambda: exit_code
+        )
+    finally:
+        os._exit(0)  # pylint: disable = protected-access
+
+
+@pytest.fixture(name='client')
+def fixture_client(monkeypatch, tmp_path):
+    path = str(tmp_path / 'daemon.sock')
+    monkeypatch.setattr(daemon, 'socket_path', lambda: path)
+    devnull = open(os.devnull, 'r+', encoding='utf-8')
+    for name in ('stdin', 'stdout', 'stderr'):
+        monkeypatch.setattr(sys, name, devnull)
+    handlers = {
+        name: signal.getsignal(getattr(signal, name))
+        for name in daemon._FORWARDED_SIGNALS  # pylint: disable = W0212
+        if hasattr(signal, name)
+    }
+    yield path
+    for name, handler in handlers.items():
+        signal.signal(getattr(signal, name), handler)
+    devnull.close()
+
+
+def test_fast_exit_is_reported_once(client):
+    server = _serve(client, exit_code=7, reply_delay=0.3)
+    try:
+        for _ in range(100):  # Wait until listening
+            if os.path.exists(client):
+                break
+            time.sleep(0.01)
+        assert daemon.connect_and_run() == 7
+    finally:
+        os.kill(server, signal.SIGKILL)
+        os.waitpid(server, 0)
+
+
+def test_no_daemon(client):
+    assert not os.path.exists(client)
+    assert daemon.connect_and_run() is None
+
+
+def test_private_dir(tmp_path):
+    path = str(tmp_path / 'daemons')
+    os.mkdir(path, 0o777)
+    os.chmod(path, 0o777)
+    assert daemon._make_private_dir(path)  # pylint: disable = W0212
+    assert os.stat(path).st_mode & 0o777 == 0o700
+
+
+def test_private_dir_of_other_user(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, 'getuid', lambda: os.stat(tmp_path).st_uid + 1)
+    assert not daemon._make_private_dir(  # pylint: disable = W0212
+        str(tmp_path)
+    )
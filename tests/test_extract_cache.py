@@ -0,0 +1,36 @@
+import os
+import time
+
+import pytest
+
+from universal_main import extract_cache
+
+
+@pytest.fixture(name='cache_dir')
+def fixture_cache_dir(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path) + '/'
+    monkeypatch.setattr(extract_cache, 'CACHE_DIR', cache_dir)
+    return cache_dir
+
+
+def _make_entry(cache_dir, name, age):
+    path = cache_dir + name
+    os.mkdir(path)
+    used = time.time() - age
+    os.utime(path, (used, used))
+
+
+def test_cleanup_removes_least_recently_used(cache_dir):
+    day = extract_cache.IN_USE_SECONDS
+    for name, age in (('new', 2 * day), ('old', 3 * day), ('oldest', 4 * day)):
+        _make_entry(cache_dir, name, age)
+    extract_cache.cleanup(max_entries=1)
+    assert sorted(os.listdir(cache_dir)) == ['new']
+
+
+def test_cleanup_keeps_recently_used(cache_dir):
+    day = extract_cache.IN_USE_SECONDS
+    for name, age in (('running', 60), ('in_use', day / 2), ('old', 2 * day)):
+        _make_entry(cache_dir, name, age)
+    extract_cache.cleanup(max_entries=1)
+    assert sorted(os.listdir(cache_dir)) == ['in_use', 'running']
@@ -0,0 +1,44 @@
+import os
+import sys
+import json
+import subprocess
+
+from universal_main.benchmark import PACKAGE_DIR
+from universal_main.benchmark import check_budget, measure_import
+
+
+# Median is noisy on loaded (or single-core) machines.
+# The budget must be met by one of these measurements. (of 10 runs each)
+IMPORT_ATTEMPTS = 3
+
+# Loaded by the launcher only, never by `import universal_main`
+HEAVY_MODULES = (
+    'subprocess', 'concurrent.futures', 'multiprocessing',
+    'PySide6', 'universal_main.universal_main', 'universal_main.installers',
+    'universal_main.wheel_installer',
+)
+
+
+def test_import_time_within_budget():
+    for _ in range(IMPORT_ATTEMPTS):
+        failures = check_budget({
+            'import/universal_main': measure_import('universal_main', runs=10)
+        })
+        if not failures:
+            break
+    assert not failures
+
+
+def test_import_does_not_load_heavy_modules():
+    code = (
+        'import sys, json\n'
+        'import universal_main\n'
+        'print(json.dumps(sorted(sys.modules)))\n'
+    )
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(PACKAGE_DIR))
+    output = subprocess.run(
+        [sys.executable, '-c', code], env=env,
+        stdout=subprocess.PIPE, check=True
+    ).stdout
+    loaded = set(json.loads(output))
+    assert not loaded.intersection(HEAVY_MODULES)
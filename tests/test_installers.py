@@ -0,0 +1,66 @@
+import zipfile
+
+import pytest
+
+from universal_main import installers, universal_constants
+from universal_main.manifest import INSTALLER_NAMES
+
+
+def test_installer_names_match_backends():
+    assert sorted(backend.name for backend in installers.BACKENDS) \
+        == sorted(INSTALLER_NAMES)
+
+
+class FakeBackend(installers.Backend):
+    def __init__(self, name, return_code, calls):
+        self.name = name
+        self.return_code = return_code
+        self.calls = calls
+
+    def is_available(self):
+        return True
+
+    def install(self, to_install, target=None, interactive=True):
+        self.calls.append(self.name)
+        return self.return_code
+
+
+@pytest.mark.parametrize('codes, expected, tried', [
+    ((None, 2, 0), 0, ['a', 'b', 'c']),
+    ((0, 2, 0), 0, ['a']),
+    ((3, None, 2), 2, ['a', 'b', 'c']),
+    ((None, None, None), 1, ['a', 'b', 'c']),
+])
+def test_install_falls_through(monkeypatch, codes, expected, tried):
+    calls = []
+    backends = [
+        FakeBackend(name, code, calls) for name, code in zip('abc', codes)
+    ]
+    monkeypatch.setattr(installers, 'select', lambda: backends)
+    assert installers.install(['demo'], interactive=False) == expected
+    assert calls == tried
+
+
+def test_install_stops_if_canceled(monkeypatch):
+    calls = []
+    backends = [
+        FakeBackend('a', installers.CANCELED, calls),
+        FakeBackend('b', 0, calls),
+    ]
+    monkeypatch.setattr(installers, 'select', lambda: backends)
+    assert installers.install(['demo']) == installers.CANCELED
+    assert calls == ['a']
+
+
+def test_installer_dir_not_in_zipapp(tmp_path, monkeypatch):
+    path = str(tmp_path / 'app.pyz')
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('__main__.py', '')
+    monkeypatch.setattr(universal_constants, 'IS_ZIPFILE', True)
+    with zipfile.ZipFile(path) as archive:
+        monkeypatch.setattr(installers, 'get_zipapp', lambda: archive)
+        monkeypatch.setattr(
+            installers, 'zipapp_index', lambda: {'__main__.py': None}
+        )
+        with pytest.raises(FileNotFoundError):
+            installers._installer_dir()  # pylint: disable = W0212
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+
+from universal_main import launch_cache, universal_constants
+
+
+REQUIREMENTS = ['demo>=1.0']
+
+
+@pytest.fixture(name='site_dir')
+def fixture_site_dir(tmp_path, monkeypatch):
+    site_dir = tmp_path / 'site'
+    site_dir.mkdir()
+    monkeypatch.setattr(
+        universal_constants, 'DATADIR', str(tmp_path / 'data') + '/'
+    )
+    monkeypatch.setattr(sys, 'path', [str(site_dir)])
+    monkeypatch.setattr(launch_cache.site, 'getsitepackages', lambda: [])
+    monkeypatch.setattr(launch_cache.site, 'ENABLE_USER_SITE', False)
+    launch_cache.mark_satisfied(REQUIREMENTS)
+    assert launch_cache.is_satisfied(REQUIREMENTS)
+    return site_dir
+
+
+def _change(path, action):
+    """Do action, making sure mtime of path changes. (coarse timestamps)"""
+    before = os.stat(path).st_mtime_ns
+    action()
+    if os.stat(path).st_mtime_ns == before:
+        os.utime(path, ns=(before + 10 ** 9, before + 10 ** 9))
+
+
+def test_distribution_added(site_dir):
+    _change(site_dir, (site_dir / 'demo-1.0.dist-info').mkdir)
+    assert not launch_cache.is_satisfied(REQUIREMENTS)
+
+
+def test_distribution_removed(site_dir):
+    dist_info = site_dir / 'demo-1.0.dist-info'
+    dist_info.mkdir()
+    launch_cache.mark_satisfied(REQUIREMENTS)
+    _change(site_dir, dist_info.rmdir)
+    assert not launch_cache.is_satisfied(REQUIREMENTS)
+
+
+def test_requirements_changed(site_dir):  # pylint: disable = W0613
+    assert not launch_cache.is_satisfied(REQUIREMENTS + ['other'])
+    assert not launch_cache.is_satisfied(['demo>=2.0'])
+
+
+@pytest.mark.parametrize('name, value', [
+    ('executable', '/other/python'),
+    ('version', '0.0.0 (other)'),
+])
+def test_interpreter_changed(site_dir, monkeypatch, name, value):
+    # pylint: disable = W0613
+    monkeypatch.setattr(sys, name, value)
+    assert not launch_cache.is_satisfied(REQUIREMENTS)
+
+
+def test_import_paths_changed(site_dir, tmp_path):
+    other = tmp_path / 'other'
+    other.mkdir()
+    sys.path.append(str(other))
+    assert not launch_cache.is_satisfied(REQUIREMENTS)
+    sys.path.remove(str(other))
+    assert launch_cache.is_satisfied(REQUIREMENTS)
@@ -0,0 +1,12 @@
+from universal_main.manifest import LaunchManifest
+
+
+def test_requirement_only_pip_can_parse():
+    requirements = [
+        'git+https://example.com/demo.git', './wheels/foo.whl', 'numpy>=1.20'
+    ]
+    manifest = LaunchManifest({
+        'program_name': 'demo', 'main_module': 'demo', 'main_func': 'main',
+        'requirements': requirements,
+    }, None)
+    assert manifest.requirements == tuple(requirements)
@@ -0,0 +1,67 @@
+from universal_main import metrics
+
+
+def _record(app='demo', total_ms=10.0, **phases):
+    return {'ts': 1000.0, 'app': app, 'total_ms': total_ms, 'phases': phases}
+
+
+def test_summarize():
+    records = [
+        _record(total_ms=value, load_manifest=value / 10)
+        for value in (10.0, 20.0, 30.0, 40.0)
+    ]
+    summary = metrics.summarize(records)
+    assert list(summary['demo']) == [metrics.TOTAL, 'load_manifest']
+    assert summary['demo'][metrics.TOTAL] == {
+        'count': 4, 'p50_ms': 20.0, 'p95_ms': 40.0, 'p99_ms': 40.0
+    }
+    assert summary['demo']['load_manifest']['p50_ms'] == 2.0
+
+
+def test_summarize_preload_timings():
+    records = [
+        dict(_record(), preload_ms={'numpy': 30.0, 'scipy': 50.0}),
+        dict(_record(), preload_ms={'numpy': 10.0}),
+        _record(),  # Recorded before preload timings
+    ]
+    summary = metrics.summarize(records)['demo']
+    assert summary['preload/numpy']['count'] == 2
+    assert summary['preload/numpy']['p50_ms'] == 10.0
+    assert summary['preload/scipy']['p50_ms'] == 50.0
+
+
+def test_summarize_skips_broken_records():
+    records = [
+        _record(total_ms=10.0, install=1.0),
+        _record(total_ms=20.0, install='fast'),
+        _record(total_ms=30.0, install=None),
+        _record(total_ms=40.0, install=[]),
+        {'ts': 'now', 'app': 'demo', 'total_ms': 50.0},
+        {'app': 'demo', 'total_ms': 60.0},
+        dict(_record(total_ms=70.0), phases=['install']),
+    ]
+    summary = metrics.summarize(records)
+    assert summary['demo'][metrics.TOTAL]['count'] == 1
+    assert summary['demo']['install']['count'] == 1
+
+
+def test_read_records_skips_broken_lines(tmp_path):
+    path = str(tmp_path / 'launches.jsonl')
+    metrics.append(_record(), path)
+    with open(path, 'a', encoding='utf-8') as file:
+        file.write('{"partial": \n[1, 2]\n')
+    metrics.append(_record(app='other'), path)
+    records = list(metrics.read_records(path))
+    assert [record['app'] for record in records] == ['demo', 'other']
+
+
+def test_rotate(tmp_path, monkeypatch):
+    path = str(tmp_path / 'launches.jsonl')
+    monkeypatch.setattr(metrics, 'MAX_BYTES', 200)
+    for num in range(50):
+        metrics.append(_record(total_ms=float(num)), path)
+    assert len(list(tmp_path.iterdir())) <= metrics.BACKUP_COUNT + 1
+    totals = [record['total_ms'] for record in metrics.read_records(path)]
+    assert totals[-1] == 49.0
+    assert totals == sorted(totals)  # Oldest first
+    assert len(totals) < 50  # Oldest ones are dropped
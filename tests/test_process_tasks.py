@@ -0,0 +1,57 @@
+import os
+import sys
+
+import pytest
+
+from universal_main import process_tasks
+from universal_main.startup_tasks import TaskGraph
+
+
+BLOB_SIZE = process_tasks.MIN_SHARED_BYTES + 100000
+
+
+def make_blob():
+    return bytes(BLOB_SIZE)
+
+
+def blob_size(deps):
+    return len(deps['blob'])
+
+
+def _shared_files():
+    shared_dir = process_tasks._shared_dir()  # pylint: disable = W0212
+    if shared_dir is None:
+        return set()
+    return {
+        name for name in os.listdir(shared_dir)
+        if name.startswith('universal_main-')
+    }
+
+
+@pytest.fixture(name='pool')
+def fixture_pool():
+    yield
+    process_tasks.shutdown()
+
+
+@pytest.mark.usefixtures('pool')
+def test_large_result_is_shared():
+    before = _shared_files()
+    result = process_tasks.call_in_process(make_blob)
+    assert isinstance(result, memoryview)
+    assert result.nbytes == BLOB_SIZE
+    assert _shared_files() == before
+
+
+@pytest.mark.usefixtures('pool')
+def test_shared_result_passed_to_process_task():
+    graph = TaskGraph(
+        [
+            ('blob', 'make_blob', (), True),
+            ('size', 'blob_size', ('blob',), True),
+        ],
+        sys.modules[__name__]
+    )
+    results = graph.run()
+    assert results['size'] == BLOB_SIZE
+    assert bytes(results['blob']) == bytes(BLOB_SIZE)
@@ -0,0 +1,64 @@
+import sys
+import types
+
+import pytest
+
+from universal_main import (
+    program_informations, resources, universal_constants
+)
+
+
+class FakePixmap:
+    def __init__(self):
+        self.data = None
+
+    def loadFromData(self, data):  # pylint: disable = invalid-name
+        self.data = data
+
+
+class FakeIcon:
+    def __init__(self, pixmap):
+        self.data = pixmap.data
+
+
+@pytest.fixture(name='program_dir')
+def fixture_program_dir(tmp_path, monkeypatch):
+    program_dir = tmp_path / 'program'
+    program_dir.mkdir()
+    qtgui = types.ModuleType('PySide6.QtGui')
+    qtgui.QIcon, qtgui.QPixmap = FakeIcon, FakePixmap
+    monkeypatch.setitem(sys.modules, 'PySide6', types.ModuleType('PySide6'))
+    monkeypatch.setitem(sys.modules, 'PySide6.QtGui', qtgui)
+    monkeypatch.setattr(program_informations, 'QIcon', None)
+    monkeypatch.setattr(program_informations, 'QPixmap', None)
+    monkeypatch.setattr(universal_constants, 'IS_ZIPFILE', False)
+    monkeypatch.setattr(
+        universal_constants, 'PROGRAM_DIR', str(program_dir) + '/'
+    )
+    resources.clear_cache()
+    yield program_dir
+    resources.clear_cache()
+
+
+@pytest.mark.parametrize('names, expected', [
+    (('logo.png', 'logo.jpg'), b'logo.png'),
+    (('logo.jpg',), b'logo.jpg'),
+    ((), None),
+])
+def test_icon_search_order(program_dir, names, expected):
+    # Logos of parent directory are never used.
+    for name in ('logo.png', 'logo.jpg'):
+        (program_dir.parent / name).write_bytes(b'parent/' + name.encode())
+    for name in names:
+        (program_dir / name).write_bytes(name.encode())
+
+    icon = program_informations.get_icon()
+    assert (icon and icon.data) == expected
+
+
+def test_license_falls_back_to_parent(program_dir):
+    (program_dir.parent / 'LICENSE').write_text('parent')
+    assert program_informations.get_license() == 'parent'
+    (program_dir / 'LICENSE').write_text('program')
+    resources.clear_cache()
+    assert program_informations.get_license() == 'program'
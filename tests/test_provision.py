@@ -0,0 +1,46 @@
+import sys
+import json
+
+import pytest
+
+from universal_main import provision
+
+
+PROVISION_ONLY = '/provision-only-path'
+
+
+@pytest.fixture(name='program')
+def fixture_program(tmp_path, monkeypatch):
+    (tmp_path / 'launch.json').write_text(json.dumps({
+        'program_name': 'demo', 'main_module': 'demo', 'main_func': 'main',
+        'requirements': ['universal-main-test-missing'],
+    }))
+    # Added to this process only, so not on import paths of the program.
+    monkeypatch.setattr(
+        sys, 'path', sys.path[:1] + [PROVISION_ONLY] + sys.path[1:]
+    )
+    return provision.Program(str(tmp_path))
+
+
+def test_sys_path_is_launch_time_path(program):
+    paths = program.sys_path()
+    assert paths[0] == program.path
+    assert PROVISION_ONLY not in paths
+    assert paths[1:] == provision.launch_paths()[1]
+
+
+def test_install_uses_launch_time_path(program, monkeypatch):
+    seen = []
+
+    def install(to_install, target=None, interactive=True):
+        seen.append((to_install, target, interactive, sys.path[:]))
+        return 1
+
+    monkeypatch.setattr(provision.installers, 'install', install)
+    result = provision.provision([program.path])
+    assert seen == [(
+        ['universal-main-test-missing'], None, False, program.env_paths()
+    )]
+    assert PROVISION_ONLY not in seen[0][3]
+    assert result['installs'][0]['returncode'] == 1
+    assert not result['ok']
@@ -0,0 +1,173 @@
+import pytest
+
+from universal_main import requirement_checker
+from universal_main.requirement_checker import (
+    Requirement, check_to_install, evaluate_marker, normalize_name,
+    parse_version
+)
+
+
+@pytest.fixture(name='environment')
+def fixture_environment(monkeypatch):
+    environment = dict(
+        requirement_checker.default_environment(),
+        os_name='posix', sys_platform='linux', platform_machine='x86_64',
+        python_version='3.8', python_full_version='3.8.9'
+    )
+    monkeypatch.setattr(requirement_checker, '_ENVIRONMENT', environment)
+    return environment
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Foo_Bar', 'foo-bar'),
+    ('foo.bar', 'foo-bar'),
+    ('FOO--bar__baz', 'foo-bar-baz'),
+    ('foo-._bar', 'foo-bar'),
+    ('numpy', 'numpy'),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
+
+
+@pytest.mark.parametrize('smaller, larger', [
+    ('1.0.dev1', '1.0a1'),
+    ('1.0a1', '1.0b1'),
+    ('1.0b1', '1.0rc1'),
+    ('1.0rc1', '1.0'),
+    ('1.0', '1.0.post1'),
+    ('1.0', '1.0+local'),
+    ('1.0.post1.dev1', '1.0.post1'),
+    ('1.9', '1.10'),
+    ('2.0', '1!1.0'),
+])
+def test_version_order(smaller, larger):
+    assert parse_version(smaller) < parse_version(larger)
+
+
+@pytest.mark.parametrize('same', [
+    ('1.0', '1.0.0', 'v1.0'),
+    ('1.0rc1', '1.0c1', '1.0-rc.1', '1.0.preview1'),
+    ('1.0.post1', '1.0-1', '1.0.rev1'),
+])
+def test_version_normalization(same):
+    assert len({parse_version(version) for version in same}) == 1
+
+
+def test_invalid_version():
+    assert parse_version('not-a-version') is None
+
+
+@pytest.mark.parametrize('specifier, version, expected', [
+    ('~=1.4.2', '1.4.5', True),
+    ('~=1.4.2', '1.5.0', False),
+    ('~=1.4.2', '1.4.1', False),
+    ('~=1.4', '1.9', True),
+    ('~=1.4', '2.0', False),
+    ('~=2.2.post3', '2.2.post4', True),
+    ('~=2.2.post3', '2.2', False),
+    ('===1.0+local', '1.0+local', True),
+    ('===1.0', '1.0.0', False),
+    ('===foobar', 'FooBar', True),
+    ('!=1.*', '1.5', False),
+    ('!=1.*', '1', False),
+    ('!=1.*', '2.0', True),
+    ('!=1.1.*', '1.10', True),
+    ('==1.*', '1.0rc1', True),
+    ('>=1.0', '2.0a1', True),
+    ('<2.0', '2.0rc1', False),
+    ('<2.0rc2', '2.0rc1', True),
+    ('<1.0', '1.0.dev1', False),
+    ('>=1.0.dev0', '1.0.dev1', True),
+    ('>1.7', '1.7.post1', False),
+    ('>1.7.post1', '1.7.post2', True),
+    ('==1.0', '1.0+abc', True),
+    ('==1.0+abc', '1.0+abc', True),
+    ('==1.0+abc', '1.0+abd', False),
+    ('==1.0+abc', '1.0', False),
+    ('<=1.0', '1.0+abc', True),
+    ('>1.0', '1.0+abc', False),
+    ('==1.0', '1.0.0', True),
+    ('==1!1.0', '1.0', False),
+    ('>=1.0,<2', '1.5', True),
+    ('>=1.0,<2', '2', False),
+    ('==1.0', 'not-a-version', False),
+])
+def test_specifier(specifier, version, expected):
+    assert Requirement('pkg' + specifier).is_satisfied_by(version) \
+        is expected
+
+
+def test_requirement_parts():
+    requirement = Requirement(
+        'Foo_Bar[Extra_One, two] (>=1.0, <2) ; python_version > "3"'
+    )
+    assert requirement.name == 'foo-bar'
+    assert requirement.extras == ('extra-one', 'two')
+    assert requirement.specifiers == (('>=', '1.0'), ('<', '2'))
+    assert requirement.marker == 'python_version > "3"'
+
+
+def test_direct_reference_checks_name_only():
+    requirement = Requirement('pkg @ https://example.com/pkg-1.0.whl')
+    assert requirement.specifiers == ()
+    assert requirement.is_satisfied_by('0.1')
+
+
+@pytest.mark.parametrize('raw', [
+    '', '-pkg', 'pkg >= ', 'pkg => 1.0', 'pkg >= abc', 'pkg >= 1.*'
+])
+def test_invalid_requirement(raw):
+    with pytest.raises(ValueError):
+        Requirement(raw)
+
+
+@pytest.mark.usefixtures('environment')
+@pytest.mark.parametrize('marker, extra, expected', [
+    ('extra == "test"', None, False),
+    ('extra == "test"', 'test', True),
+    ('extra == "test"', 'Test', True),
+    ('extra == "Foo_Bar"', 'foo-bar', True),
+    ('extra != "test"', 'doc', True),
+    # Compared as versions, not strings
+    ('python_full_version >= "3.8.10"', None, False),
+    ('python_full_version < "3.8.10"', None, True),
+    ('python_version > "3.10"', None, False),
+    ('python_version ~= "3.8"', None, True),
+    ('"3.9" > python_version', None, True),
+    # `and` binds tighter than `or`
+    ('os_name == "posix" or sys_platform == "win32"'
+     ' and python_version < "3.8"', None, True),
+    ('(os_name == "posix" or sys_platform == "win32")'
+     ' and python_version < "3.8"', None, False),
+    ('os_name == "nt" or sys_platform == "linux"'
+     ' and python_version < "3.8"', None, False),
+    ('"linux" in sys_platform', None, True),
+    ('"lin" not in sys_platform', None, False),
+    ("platform_machine != 'x86_64'", None, False),
+])
+def test_marker(marker, extra, expected):
+    assert evaluate_marker(marker, extra) is expected
+
+
+@pytest.mark.usefixtures('environment')
+@pytest.mark.parametrize('marker', [
+    'python_version', 'python_version >', 'unknown == "1"',
+    '(os_name == "posix"', 'os_name == "posix" or',
+])
+def test_invalid_marker(marker):
+    with pytest.raises(ValueError):
+        evaluate_marker(marker)
+
+
+@pytest.mark.usefixtures('environment')
+def test_check_to_install():
+    installed = {'foo-bar': '1.5', 'baz': '2.0rc1'}
+    requirements = [
+        'Foo.Bar>=1.0',  # Satisfied: name is normalized
+        'baz>=2.0',  # Pre-release is older than the release
+        'missing',
+        'win-only; sys_platform == "win32"',  # Not applicable
+        './wheels/foo.whl',  # Only pip can parse it
+    ]
+    assert check_to_install(requirements, installed) \
+        == ['baz>=2.0', 'missing', './wheels/foo.whl']
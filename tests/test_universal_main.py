@@ -0,0 +1,37 @@
+import sys
+import types
+
+import pytest
+
+from universal_main import universal_main
+
+
+@pytest.fixture(name='prepare')
+def fixture_prepare(monkeypatch):
+    module = types.ModuleType('demo_main')
+    module.no_argument = lambda: 'gui'
+    module.with_progress = lambda progress: 'worker'
+    monkeypatch.setitem(sys.modules, 'demo_main', module)
+
+    def prepare(pre_main_name, pre_main_worker=False):
+        return universal_main._prepare_main(  # pylint: disable = W0212
+            [], list, 'demo_main', pre_main_name, False, pre_main_worker,
+            (), universal_main.SplashProgress()
+        )
+    return prepare
+
+
+def test_pre_main_without_argument_runs_in_gui_thread(prepare):
+    return_code, _, args, gui_pre_main = prepare('no_argument')
+    assert return_code == 0
+    assert args == ()
+    assert gui_pre_main() == 'gui'
+
+
+@pytest.mark.parametrize('name, worker', [
+    ('with_progress', False), ('no_argument', True),
+])
+def test_pre_main_in_worker(prepare, name, worker):
+    _, _, args, gui_pre_main = prepare(name, worker)
+    assert gui_pre_main is None
+    assert args == ('worker' if name == 'with_progress' else 'gui',)
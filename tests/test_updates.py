@@ -0,0 +1,55 @@
+import json
+import subprocess
+
+import pytest
+
+from universal_main import updates
+
+
+@pytest.fixture(name='resolve')
+def fixture_resolve(monkeypatch):
+    def resolve(name, version):
+        report = {'install': [{'metadata': {'name': name, 'version': version}}]}
+        monkeypatch.setattr(
+            updates, '_run_pip',
+            lambda args: subprocess.CompletedProcess(
+                args, 0, json.dumps(report)
+            )
+        )
+    return resolve
+
+
+@pytest.mark.parametrize('installed, resolved, expected', [
+    ({}, '1.0', ['Demo==1.0']),
+    ({'demo': '1.0'}, '1.1', ['Demo==1.1']),
+    ({'demo': '2.0'}, '1.0', []),  # Downgrade
+    ({'demo': '1.0'}, '1.0.0', []),  # Same version
+    ({'demo': 'invalid'}, '1.0', []),
+])
+def test_find_updates(resolve, installed, resolved, expected):
+    resolve('Demo', resolved)
+    assert updates.find_updates('source', ['demo'], installed) == expected
+
+
+def test_find_updates_skips_available(resolve):
+    resolve('PySide6', '6.7.0')
+    assert updates.find_updates(
+        'source', ['pyside6'], {}, {'pyside6': '6.6.0'}
+    ) == []
+
+
+def test_check_marker_after_staged(tmp_path, monkeypatch):
+    site_path = str(tmp_path / 'site-packages')
+    marker = tmp_path / updates.LAST_CHECK_FILE
+
+    def interrupted(source, requirements, site_path):
+        raise SystemExit
+
+    monkeypatch.setattr(updates, 'stage', interrupted)
+    with pytest.raises(SystemExit):
+        updates._check('source', ['demo'], site_path)  # pylint: disable=W0212
+    assert not marker.exists()
+
+    monkeypatch.setattr(updates, 'stage', lambda *args: [])
+    updates._check('source', ['demo'], site_path)  # pylint: disable=W0212
+    assert marker.exists()
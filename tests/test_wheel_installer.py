@@ -0,0 +1,107 @@
+import os
+import time
+import base64
+import hashlib
+import zipfile
+
+import pytest
+
+from universal_main import wheel_installer
+from universal_main.wheel_installer import Wheel, install_wheels
+
+
+def _hash(data: bytes) -> str:
+    digest = hashlib.sha256(data).digest()
+    return 'sha256=' + base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+
+def make_wheel(directory, name='demo', version='1.0', files=None,
+               record=None):
+    """Write a wheel. `record` overrides RECORD rows of given files."""
+    files = files or {f'{name}/__init__.py': b'VALUE = 1\n'}
+    dist_info = f'{name}-{version}.dist-info'
+    files = dict(files, **{
+        f'{dist_info}/METADATA':
+            f'Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n'
+            .encode(),
+        f'{dist_info}/WHEEL': b'Wheel-Version: 1.0\nRoot-Is-Purelib: true\n'
+                              b'Tag: py3-none-any\n',
+    })
+    rows = {path: _hash(data) for path, data in files.items()}
+    rows.update(record or {})
+    path = os.path.join(directory, f'{name}-{version}-py3-none-any.whl')
+    with zipfile.ZipFile(path, 'w') as archive:
+        for member, data in files.items():
+            archive.writestr(member, data)
+        archive.writestr(f'{dist_info}/RECORD', ''.join(
+            f'{member},{digest},\n' for member, digest in rows.items()
+            if digest is not None
+        ) + f'{dist_info}/RECORD,,\n')
+    return Wheel(path)
+
+
+def test_install(tmp_path):
+    wheel = make_wheel(str(tmp_path))
+    target = str(tmp_path / 'site')
+    installed = install_wheels([wheel], target, {'demo'})
+    assert installed == [os.path.join(target, 'demo-1.0.dist-info')]
+    with open(os.path.join(target, 'demo', '__init__.py'), 'rb') as file:
+        assert file.read() == b'VALUE = 1\n'
+    dist_info = os.path.join(target, 'demo-1.0.dist-info')
+    assert {'INSTALLER', 'REQUESTED', 'RECORD'} <= set(os.listdir(dist_info))
+
+
+@pytest.mark.parametrize('record', [
+    {'demo/__init__.py': _hash(b'tampered')},  # Hash mismatch
+    {'demo/__init__.py': None},  # Not listed
+    {'demo/__init__.py': ''},  # Listed without hash
+])
+def test_invalid_wheel_leaves_site_unchanged(tmp_path, record):
+    wheel = make_wheel(str(tmp_path), record=record)
+    target = str(tmp_path / 'site')
+    with pytest.raises(ValueError):
+        install_wheels([wheel], target)
+    assert os.listdir(target) == []
+
+
+def test_staging_is_next_to_site(tmp_path, monkeypatch):
+    wheel = make_wheel(str(tmp_path))
+    target = str(tmp_path / 'site')
+    stale, recent = str(tmp_path / '.tmp-install-old'), \
+        str(tmp_path / '.tmp-install-running')
+    os.mkdir(stale)
+    os.mkdir(recent)
+    old = time.time() - 2 * wheel_installer.app_env.STALE_TMP_SECONDS
+    os.utime(stale, (old, old))
+    extract = wheel_installer._extract  # pylint: disable = protected-access
+    stagings = []
+
+    def spy(wheel, staging, requested):
+        stagings.append(staging)
+        assert os.listdir(target) == []
+        extract(wheel, staging, requested)
+
+    monkeypatch.setattr(wheel_installer, '_extract', spy)
+    install_wheels([wheel], target)
+    assert os.path.dirname(stagings[0]) == str(tmp_path)
+    assert sorted(os.listdir(target)) == ['demo', 'demo-1.0.dist-info']
+    assert not os.path.exists(stale) and os.path.exists(recent)
+
+
+def test_unsafe_path(tmp_path):
+    wheel = make_wheel(str(tmp_path), files={'../evil.py': b''})
+    with pytest.raises(ValueError):
+        install_wheels([wheel], str(tmp_path / 'site'))
+
+
+def test_resolve_dependencies(tmp_path):
+    make_wheel(str(tmp_path), 'demo', '1.0')
+    make_wheel(str(tmp_path), 'demo', '2.0')
+    wheels = wheel_installer.resolve(
+        ['demo<2'], wheel_installer.find_wheels(str(tmp_path))
+    )
+    assert [(wheel.name, wheel.version) for wheel in wheels] \
+        == [('demo', '1.0')]
+    assert wheel_installer.resolve(
+        ['missing'], wheel_installer.find_wheels(str(tmp_path))
+    ) is None